@@ -11,7 +11,10 @@ app_license = "mit"
 
 # include js, css files in header of desk.html
 # app_include_css = "/assets/steelforce_custom/css/steelforce_custom.css"
-# app_include_js = "/assets/steelforce_custom/js/steelforce_custom.js"
+app_include_js = "/assets/steelforce_custom/js/dcr.js"
+
+# desk boot info (flags read by dcr.js)
+boot_session = "steelforce_custom.steelforce_custom.dcr.compact.boot_session"
 
 # include js, css files in header of web template
 # web_include_css = "/assets/steelforce_custom/css/steelforce_custom.css"
@@ -68,7 +71,7 @@ app_license = "mit"
 # ------------
 
 # before_install = "steelforce_custom.install.before_install"
-# after_install = "steelforce_custom.install.after_install"
+after_install = "steelforce_custom.install.after_install"
 
 # Uninstallation
 # ------------
@@ -130,6 +133,65 @@ app_license = "mit"
 # 	}
 # }
 
+doc_events = {
+	"Sales Invoice": {
+		"before_submit": [
+			"steelforce_custom.steelforce_custom.dcr.business_date.set_business_date",
+			"steelforce_custom.steelforce_custom.dcr.sales_channel.set_sales_channel",
+			"steelforce_custom.steelforce_custom.dcr.realtime.snapshot_report_entries",
+		],
+		"before_cancel": "steelforce_custom.steelforce_custom.dcr.realtime.snapshot_report_entries",
+		"on_submit": [
+			"steelforce_custom.steelforce_custom.dcr.payment_facts.queue_payment_facts",
+			"steelforce_custom.steelforce_custom.dcr.advance_ledger.update_advance_ledger",
+			"steelforce_custom.steelforce_custom.dcr.realtime.publish_report_delta",
+			"steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+		],
+		"on_cancel": [
+			"steelforce_custom.steelforce_custom.dcr.payment_facts.queue_payment_facts",
+			"steelforce_custom.steelforce_custom.dcr.advance_ledger.update_advance_ledger",
+			"steelforce_custom.steelforce_custom.dcr.realtime.publish_report_delta",
+			"steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+		],
+	},
+	"Payment Entry": {
+		"before_submit": [
+			"steelforce_custom.steelforce_custom.dcr.business_date.set_business_date",
+			"steelforce_custom.steelforce_custom.dcr.realtime.snapshot_report_entries",
+		],
+		"before_cancel": "steelforce_custom.steelforce_custom.dcr.realtime.snapshot_report_entries",
+		"on_submit": [
+			"steelforce_custom.steelforce_custom.dcr.payment_facts.queue_payment_facts",
+			"steelforce_custom.steelforce_custom.dcr.advance_ledger.update_advance_ledger",
+			"steelforce_custom.steelforce_custom.dcr.realtime.publish_report_delta",
+			"steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+		],
+		"on_cancel": [
+			"steelforce_custom.steelforce_custom.dcr.payment_facts.queue_payment_facts",
+			"steelforce_custom.steelforce_custom.dcr.advance_ledger.update_advance_ledger",
+			"steelforce_custom.steelforce_custom.dcr.realtime.publish_report_delta",
+			"steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+		],
+		# Payment Reconciliation allocating to invoices
+		"on_update_after_submit": [
+			"steelforce_custom.steelforce_custom.dcr.payment_facts.queue_payment_facts",
+			"steelforce_custom.steelforce_custom.dcr.advance_ledger.update_advance_ledger",
+			"steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+		],
+	},
+	"Unreconcile Payment": {
+		"on_submit": "steelforce_custom.steelforce_custom.dcr.advance_ledger.update_unreconciled_advances",
+	},
+	"Sales Order": {
+		"on_submit": "steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+		"on_cancel": "steelforce_custom.steelforce_custom.dcr.cache.invalidate_report_cache",
+	},
+	"POS Profile": {
+		"on_update": "steelforce_custom.steelforce_custom.dcr.bootstrap.clear_user_pos_profiles",
+		"on_trash": "steelforce_custom.steelforce_custom.dcr.bootstrap.clear_user_pos_profiles",
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -151,6 +213,18 @@ app_license = "mit"
 # 	],
 # }
 
+scheduler_events = {
+	"all": [
+		"steelforce_custom.steelforce_custom.dcr.payment_facts.sync_payment_facts",
+	],
+	"cron": {
+		# shortly after each branch's business day cutoff
+		"*/15 * * * *": [
+			"steelforce_custom.steelforce_custom.dcr.prewarm.prewarm_closed_days",
+		],
+	},
+}
+
 # Testing
 # -------
 
@@ -163,6 +237,11 @@ app_license = "mit"
 # 	"frappe.desk.doctype.event.event.get_events": "steelforce_custom.event.get_events"
 # }
 #
+# the report view's run, compact for the DCR trees when dcr.js asks for it
+override_whitelisted_methods = {
+	"frappe.desk.query_report.run": "steelforce_custom.steelforce_custom.dcr.compact.run_report"
+}
+
 # each overriding function accepts a `data` argument;
 # generated from the base implementation of the doctype dashboard,
 # along with any modifications made in other Frappe apps
@@ -182,7 +261,7 @@ app_license = "mit"
 # Request Events
 # ----------------
 # before_request = ["steelforce_custom.utils.before_request"]
-# after_request = ["steelforce_custom.utils.after_request"]
+after_request = ["steelforce_custom.steelforce_custom.dcr.compact.compress_response"]
 
 # Job Events
 # ----------
@@ -227,3 +306,7 @@ app_license = "mit"
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
 
+default_log_clearing_doctypes = {
+	"Report Profile Log": 30,
+}
+
@@ -0,0 +1,87 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+from steelforce_custom.steelforce_custom.dcr.sales_channel import SALES_CHANNELS
+
+
+SALES_CHANNEL_OPTIONS = "\n".join(("", *SALES_CHANNELS))
+
+
+def after_install():
+    make_custom_fields()
+
+
+def make_custom_fields():
+    create_custom_fields(get_custom_fields(), update=True)
+
+
+def get_custom_fields():
+    return {
+        "POS Profile": [
+            {
+                "fieldname": "business_day_cutoff",
+                "label": "Business Day Cutoff",
+                "fieldtype": "Time",
+                "insert_after": "warehouse",
+                "default": "04:00:00",
+                "description": "Sales posted before this time belong to the previous business day",
+            },
+        ],
+        "Customer": [
+            {
+                "fieldname": "sales_channel",
+                "label": "Sales Channel",
+                "fieldtype": "Select",
+                "options": SALES_CHANNEL_OPTIONS,
+                "insert_after": "customer_group",
+                "description": "DCR channel of this customer's invoices; empty uses the Customer Group's",
+            },
+        ],
+        "Customer Group": [
+            {
+                "fieldname": "sales_channel",
+                "label": "Sales Channel",
+                "fieldtype": "Select",
+                "options": SALES_CHANNEL_OPTIONS,
+                "insert_after": "parent_customer_group",
+                "description": "DCR channel of the invoices of customers in this group",
+            },
+        ],
+        "Sales Invoice": [
+            {
+                "fieldname": "sales_channel",
+                "label": "Sales Channel",
+                "fieldtype": "Select",
+                "options": SALES_CHANNEL_OPTIONS,
+                "insert_after": "customer",
+                "read_only": 1,
+                "no_copy": 1,
+                "print_hide": 1,
+                "search_index": 1,
+            },
+            {
+                "fieldname": "business_date",
+                "label": "Business Date",
+                "fieldtype": "Date",
+                "insert_after": "posting_time",
+                "read_only": 1,
+                "no_copy": 1,
+                "print_hide": 1,
+                "search_index": 1,
+            },
+        ],
+        "Payment Entry": [
+            {
+                "fieldname": "business_date",
+                "label": "Business Date",
+                "fieldtype": "Date",
+                "insert_after": "posting_date",
+                "read_only": 1,
+                "no_copy": 1,
+                "print_hide": 1,
+                "search_index": 1,
+            },
+        ],
+    }
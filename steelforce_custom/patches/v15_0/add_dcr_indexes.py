@@ -0,0 +1,16 @@
+import frappe
+
+
+# (doctype, fields, index name) for the DCR report join and filter paths
+DCR_INDEXES = (
+    ("Sales Invoice", ["docstatus", "pos_profile", "business_date"], "dcr_docstatus_pos_profile_business_date"),
+    ("Sales Invoice Payment", ["parent", "mode_of_payment", "amount"], "dcr_parent_mode_of_payment_amount"),
+    ("Payment Entry Reference", ["reference_doctype", "reference_name"], "dcr_reference_doctype_reference_name"),
+    ("Payment Entry", ["docstatus", "payment_type", "business_date"], "dcr_docstatus_payment_type_business_date"),
+    ("Sales Order", ["set_warehouse"], "dcr_set_warehouse"),
+)
+
+
+def execute():
+    for doctype, fields, index_name in DCR_INDEXES:
+        frappe.db.add_index(doctype, fields, index_name)
@@ -0,0 +1,95 @@
+import frappe
+
+from steelforce_custom.install import make_custom_fields
+from steelforce_custom.steelforce_custom.dcr.business_date import (
+    get_business_date,
+    get_payment_entry_time,
+)
+
+
+CHUNK_SIZE = 5000
+
+
+def execute():
+    make_custom_fields()
+    frappe.clear_cache(doctype="POS Profile")
+
+    backfill("Sales Invoice", get_sales_invoices)
+    backfill("Payment Entry", get_payment_entries)
+
+
+def backfill(doctype, get_chunk):
+    last_name = ""
+
+    while True:
+        names = frappe.db.sql_list(f"""
+            SELECT name
+            FROM `tab{doctype}`
+            WHERE docstatus > 0
+              AND business_date IS NULL
+              AND name > %(last_name)s
+            ORDER BY name
+            LIMIT {CHUNK_SIZE}
+        """, {"last_name": last_name})
+
+        if not names:
+            break
+
+        # one UPDATE per business date in the chunk
+        by_date = {}
+        for name, business_date in get_chunk(names):
+            by_date.setdefault(business_date, []).append(name)
+
+        for business_date, date_names in by_date.items():
+            frappe.db.sql(f"""
+                UPDATE `tab{doctype}`
+                SET business_date = %(business_date)s
+                WHERE name IN %(names)s
+            """, {"business_date": business_date, "names": tuple(date_names)})
+
+        frappe.db.commit()
+        last_name = names[-1]
+
+
+def get_sales_invoices(names):
+    rows = frappe.db.sql("""
+        SELECT name, posting_date, posting_time, pos_profile
+        FROM `tabSales Invoice`
+        WHERE name IN %(names)s
+    """, {"names": tuple(names)}, as_dict=True)
+
+    for r in rows:
+        yield r.name, get_business_date(r.posting_date, r.posting_time, r.pos_profile)
+
+
+def get_payment_entries(names):
+    rows = frappe.db.sql("""
+        SELECT name, posting_date, creation
+        FROM `tabPayment Entry`
+        WHERE name IN %(names)s
+    """, {"names": tuple(names)}, as_dict=True)
+
+    # branch of each entry: invoice POS Profile, else Sales Order warehouse
+    pos_profiles = dict(frappe.db.sql("""
+        SELECT per.parent, MIN(pp.name)
+        FROM `tabPayment Entry Reference` per
+        JOIN `tabSales Order` so ON so.name = per.reference_name
+        JOIN `tabPOS Profile` pp ON pp.warehouse = so.set_warehouse
+        WHERE per.reference_doctype = 'Sales Order'
+          AND per.parent IN %(names)s
+        GROUP BY per.parent
+    """, {"names": tuple(names)}))
+
+    pos_profiles.update(frappe.db.sql("""
+        SELECT per.parent, MIN(si.pos_profile)
+        FROM `tabPayment Entry Reference` per
+        JOIN `tabSales Invoice` si ON si.name = per.reference_name
+        WHERE per.reference_doctype = 'Sales Invoice'
+          AND si.pos_profile IS NOT NULL
+          AND per.parent IN %(names)s
+        GROUP BY per.parent
+    """, {"names": tuple(names)}))
+
+    for r in rows:
+        posting_time = get_payment_entry_time(r.posting_date, r.creation)
+        yield r.name, get_business_date(r.posting_date, posting_time, pos_profiles.get(r.name))
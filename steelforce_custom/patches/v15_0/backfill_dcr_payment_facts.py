@@ -0,0 +1,41 @@
+import frappe
+
+from steelforce_custom.steelforce_custom.dcr.payment_facts import (
+    rebuild_advance_facts,
+    rebuild_invoice_facts,
+)
+
+
+CHUNK_SIZE = 2000
+
+
+def execute():
+    backfill(
+        "SELECT name FROM `tabSales Invoice` WHERE docstatus = 1 AND name > %(last_name)s",
+        rebuild_invoice_facts,
+    )
+    backfill(
+        """
+        SELECT DISTINCT pe.name
+        FROM `tabPayment Entry` pe
+        JOIN `tabPayment Entry Reference` per ON per.parent = pe.name
+        WHERE pe.docstatus = 1
+          AND pe.payment_type = 'Receive'
+          AND per.reference_doctype = 'Sales Order'
+          AND pe.name > %(last_name)s
+        """,
+        rebuild_advance_facts,
+    )
+
+
+def backfill(query, rebuild):
+    last_name = ""
+
+    while True:
+        names = frappe.db.sql_list(f"{query} ORDER BY name LIMIT {CHUNK_SIZE}", {"last_name": last_name})
+        if not names:
+            break
+
+        rebuild(names)
+        frappe.db.commit()
+        last_name = names[-1]
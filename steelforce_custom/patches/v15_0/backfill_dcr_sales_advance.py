@@ -0,0 +1,32 @@
+import frappe
+
+from steelforce_custom.steelforce_custom.dcr.advance_ledger import rebuild_advance_ledger
+from steelforce_custom.steelforce_custom.dcr.cache import clear_report_cache
+
+
+CHUNK_SIZE = 2000
+
+
+def execute():
+    last_name = ""
+
+    while True:
+        names = frappe.db.sql_list(f"""
+            SELECT DISTINCT pe.name
+            FROM `tabPayment Entry` pe
+            JOIN `tabPayment Entry Reference` per ON per.parent = pe.name
+            WHERE pe.docstatus = 1
+              AND pe.payment_type = 'Receive'
+              AND (per.reference_doctype = 'Sales Order' OR per.advance_voucher_type = 'Sales Order')
+              AND pe.name > %(last_name)s
+            ORDER BY pe.name
+            LIMIT {CHUNK_SIZE}
+        """, {"last_name": last_name})
+        if not names:
+            break
+
+        rebuild_advance_ledger(names)
+        frappe.db.commit()
+        last_name = names[-1]
+
+    clear_report_cache()
@@ -0,0 +1,45 @@
+import frappe
+
+
+# branch specific modes the DCR-Accounts Report used to hard-code
+BRANCH_MODES = (
+    ("Cash-Saihat", "Saihat", "Cash"),
+    ("Cash-FA", "Faisaliya", "Cash"),
+    ("Cash-Doha", "Doha", "Cash"),
+    ("Card-SA", "Saihat", "Card"),
+    ("Card-DO", "Doha", "Card"),
+)
+
+
+def execute():
+    if frappe.db.count("DCR Mode of Payment Map"):
+        return
+
+    mapped = set()
+    for mode_of_payment, pos_profile, category in BRANCH_MODES:
+        if frappe.db.exists("Mode of Payment", mode_of_payment) and frappe.db.exists("POS Profile", pos_profile):
+            make_map(mode_of_payment, pos_profile, category)
+            mapped.add(mode_of_payment)
+
+    # everything else keeps the old name matching, for all branches
+    for mode_of_payment in frappe.get_all("Mode of Payment", pluck="name"):
+        category = get_legacy_category(mode_of_payment)
+        if category and mode_of_payment not in mapped:
+            make_map(mode_of_payment, None, category)
+
+
+def get_legacy_category(mode_of_payment):
+    if mode_of_payment.startswith("Cash"):
+        return "Cash"
+    if mode_of_payment.startswith(("Card", "Mada", "Visa")):
+        return "Card"
+    return None
+
+
+def make_map(mode_of_payment, pos_profile, category):
+    frappe.get_doc({
+        "doctype": "DCR Mode of Payment Map",
+        "mode_of_payment": mode_of_payment,
+        "pos_profile": pos_profile,
+        "category": category,
+    }).insert(ignore_permissions=True)
@@ -0,0 +1,55 @@
+import frappe
+
+from steelforce_custom.install import make_custom_fields
+from steelforce_custom.steelforce_custom.dcr.cache import clear_report_cache
+from steelforce_custom.steelforce_custom.dcr.sales_channel import (
+    COUNTER_SALES,
+    HOME_SALES,
+    ONLINE_CUSTOMERS,
+    ONLINE_SALES,
+    WALK_IN_CUSTOMER,
+    get_sales_channel,
+)
+
+
+CHUNK_SIZE = 500
+
+# the customer rules the reports used to hard-code, now editable on Customer
+DEFAULT_CHANNELS = {
+    **{customer: ONLINE_SALES for customer in ONLINE_CUSTOMERS},
+    WALK_IN_CUSTOMER: COUNTER_SALES,
+    "Home Sales Customer": HOME_SALES,
+}
+
+
+def execute():
+    make_custom_fields()
+
+    for customer, channel in DEFAULT_CHANNELS.items():
+        if frappe.db.exists("Customer", customer) and not frappe.db.get_value("Customer", customer, "sales_channel"):
+            frappe.db.set_value("Customer", customer, "sales_channel", channel, update_modified=False)
+
+    customers = frappe.db.sql_list("""
+        SELECT DISTINCT customer
+        FROM `tabSales Invoice`
+        WHERE docstatus > 0
+          AND IFNULL(sales_channel, '') = ''
+    """)
+
+    by_channel = {}
+    for customer in customers:
+        by_channel.setdefault(get_sales_channel(customer), []).append(customer)
+
+    # one UPDATE per channel and chunk of customers
+    for channel, names in by_channel.items():
+        for i in range(0, len(names), CHUNK_SIZE):
+            frappe.db.sql("""
+                UPDATE `tabSales Invoice`
+                SET sales_channel = %(channel)s
+                WHERE docstatus > 0
+                  AND customer IN %(customers)s
+                  AND IFNULL(sales_channel, '') = ''
+            """, {"channel": channel, "customers": tuple(names[i:i + CHUNK_SIZE])})
+            frappe.db.commit()
+
+    clear_report_cache()
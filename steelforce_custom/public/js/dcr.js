@@ -0,0 +1,518 @@
+// Copyright (c) 2026, siva and contributors
+// For license information, please see license.txt
+
+frappe.provide("steelforce_custom.dcr");
+
+/* RUN IN BACKGROUND: branch × day chunks on the workers, merged into the report */
+steelforce_custom.dcr.add_background_button = function (report) {
+    report.page.add_inner_button(__("Run in Background"), function () {
+        steelforce_custom.dcr.run_in_background(report);
+    });
+};
+
+steelforce_custom.dcr.run_in_background = function (report) {
+    const filters = report.get_filter_values(true);
+    if (!filters) return;
+
+    frappe.call({
+        method: "steelforce_custom.steelforce_custom.dcr.background.start_report",
+        args: { report_name: report.report_name, filters: filters },
+        freeze: true
+    }).then((r) => {
+        const run = r.message;
+        if (!run.total) {
+            steelforce_custom.dcr.load_background_result(report, run.run_id);
+            return;
+        }
+
+        const title = __("Running {0}", [__(report.report_name)]);
+        frappe.show_progress(title, 0, run.total, __("Queued"));
+
+        const events = {
+            dcr_report_progress: (data) => {
+                if (data.run_id !== run.run_id) return;
+                frappe.show_progress(title, data.done, data.total,
+                    __("{0} of {1} chunks done", [data.done, data.total]));
+            },
+            dcr_report_ready: (data) => {
+                if (data.run_id !== run.run_id) return;
+                stop();
+                steelforce_custom.dcr.load_background_result(report, run.run_id);
+            },
+            dcr_report_failed: (data) => {
+                if (data.run_id !== run.run_id) return;
+                stop();
+                frappe.msgprint(__("{0} failed in background, see the Error Log", [__(report.report_name)]));
+            }
+        };
+
+        const stop = () => {
+            Object.entries(events).forEach(([event, handler]) => frappe.realtime.off(event, handler));
+            frappe.hide_progress();
+        };
+
+        Object.entries(events).forEach(([event, handler]) => frappe.realtime.on(event, handler));
+    });
+};
+
+steelforce_custom.dcr.load_background_result = function (report, run_id) {
+    frappe.call({
+        method: "steelforce_custom.steelforce_custom.dcr.background.get_result",
+        args: { run_id: run_id }
+    }).then((r) => {
+        report.render_report(r.message);
+    });
+};
+
+/* STREAMING EXPORT: rows written to a private file on the workers */
+steelforce_custom.dcr.add_export_button = function (report) {
+    report.page.add_inner_button(__("Export (Large Range)"), function () {
+        const filters = report.get_filter_values(true);
+        if (!filters) return;
+
+        frappe.prompt({
+            fieldname: "file_format",
+            label: __("File Format"),
+            fieldtype: "Select",
+            options: ["CSV", "Excel"],
+            default: "CSV",
+            reqd: 1
+        }, (values) => {
+            frappe.call({
+                method: "steelforce_custom.steelforce_custom.dcr.export.start_export",
+                args: { report_name: report.report_name, filters: filters, file_format: values.file_format }
+            }).then(() => {
+                frappe.show_alert({ message: __("Export queued, you will get the file link here"), indicator: "blue" });
+            });
+        }, __("Export {0}", [__(report.report_name)]), __("Export"));
+    });
+
+    if (steelforce_custom.dcr.export_listener) return;
+    steelforce_custom.dcr.export_listener = true;
+
+    frappe.realtime.on("dcr_export_ready", (data) => {
+        frappe.msgprint(__("{0} export is ready: {1}", [
+            __(data.report_name),
+            `<a href="${data.file_url}" target="_blank">${__("Download")}</a>`
+        ]));
+    });
+};
+
+/* PAGINATED VIEW: keyset pages with a Load More button, totals as summary cards */
+steelforce_custom.dcr.add_pagination = function (report) {
+    report.page.add_inner_button(__("Paged View"), function () {
+        const filters = report.get_filter_values(true);
+        if (!filters) return;
+
+        report.dcr_pages = { filters: filters, rows: [], cursor: null };
+        steelforce_custom.dcr.load_page(report);
+    });
+};
+
+steelforce_custom.dcr.load_page = function (report) {
+    const state = report.dcr_pages;
+
+    frappe.call({
+        method: "steelforce_custom.steelforce_custom.dcr.pagination.get_page",
+        args: { report_name: report.report_name, filters: state.filters, cursor: state.cursor },
+        freeze: true
+    }).then((r) => {
+        const page = r.message;
+        if (page.columns) {
+            state.columns = page.columns;
+            state.report_summary = page.report_summary;
+        }
+
+        state.rows = state.rows.concat(page.result);
+        state.cursor = page.cursor;
+
+        report.render_report({
+            columns: state.columns,
+            result: state.rows,
+            report_summary: state.report_summary
+        });
+
+        report.page.remove_inner_button(__("Load More"));
+        if (state.cursor) {
+            report.page.add_inner_button(__("Load More"), function () {
+                steelforce_custom.dcr.load_page(report);
+            });
+        }
+    });
+};
+
+/* ESC/POS SLIP: the 80mm summary rendered on the server, downloaded or sent raw to the printer */
+steelforce_custom.dcr.add_slip_buttons = function (report) {
+    report.page.add_inner_button(__("Download Slip"), function () {
+        const args = steelforce_custom.dcr.get_slip_args(report);
+        if (!args) return;
+
+        window.open(frappe.urllib.get_full_url(
+            "/api/method/steelforce_custom.steelforce_custom.dcr.escpos.download_slip?"
+            + $.param(args)
+        ));
+    }, __("ESC/POS"));
+
+    report.page.add_inner_button(__("Print Slip"), function () {
+        const args = steelforce_custom.dcr.get_slip_args(report);
+        if (!args) return;
+
+        frappe.call({
+            method: "steelforce_custom.steelforce_custom.dcr.escpos.get_raw_slip",
+            args: args,
+            freeze: true
+        }).then((r) => {
+            frappe.ui.form.qz_connect()
+                .then(() => qz.printers.getDefault())
+                .then((printer) => qz.print(qz.configs.create(printer), [
+                    { type: "raw", format: "base64", data: r.message }
+                ]))
+                .catch((error) => frappe.ui.form.qz_fail(error));
+        });
+    }, __("ESC/POS"));
+};
+
+steelforce_custom.dcr.get_slip_args = function (report) {
+    const filters = report.get_filter_values(true);
+    if (!filters) return;
+
+    const pos_profiles = [].concat(filters.pos_profile || []);
+    if (pos_profiles.length !== 1 || filters.from_date !== filters.to_date) {
+        frappe.msgprint(__("The slip is printed for one POS Profile and one business day"));
+        return;
+    }
+
+    return { report_name: report.report_name, pos_profile: pos_profiles[0], business_date: filters.to_date };
+};
+
+/* TREE FORMATTER: parent / summary markup of compact rows, lazy children links */
+steelforce_custom.dcr.tree_formatter = function (value, row, column, data, default_formatter) {
+    value = default_formatter(value, row, column, data);
+
+    if (column.fieldname === "name" && data && data.name_style) {
+        value = steelforce_custom.dcr.style_name(value, data.name_style);
+    }
+
+    if (column.fieldname === "name" && data && data.lazy_children) {
+        value += ` <a class="dcr-expand" data-lazy-key="${data.lazy_key}">(+${data.lazy_children})</a>`;
+    }
+    return value;
+};
+
+// the markup the server puts around the name, see dcr/compact.py
+steelforce_custom.dcr.style_name = function (name, name_style) {
+    if (!name_style) return name;
+
+    const [tag, style] = name_style;
+    return style ? `<${tag} style='${style}'>${name}</${tag}>` : `<${tag}>${name}</${tag}>`;
+};
+
+/* COMPACT RESULTS: column arrays and parent indexes instead of row dicts, rebuilt here */
+steelforce_custom.dcr.setup_compact = function (report) {
+    if (!frappe.boot.dcr_compact_results) return;
+
+    steelforce_custom.dcr.request_compact();
+
+    // Frappe's refresh and render_report both hand the run payload here
+    const prepare_report_data = report.prepare_report_data;
+    report.prepare_report_data = function (data) {
+        if (steelforce_custom.dcr.is_compact(data)) {
+            Object.assign(data, steelforce_custom.dcr.decode_compact(data.result[0]));
+        }
+        return prepare_report_data.call(this, data);
+    };
+};
+
+// ask the report view's run for compact results, see dcr/compact.py run_report
+steelforce_custom.dcr.request_compact = function () {
+    if (steelforce_custom.dcr.compact_prefilter) return;
+    steelforce_custom.dcr.compact_prefilter = true;
+
+    $.ajaxPrefilter((options, original_options, jqxhr) => {
+        if ((options.url || "").includes("frappe.desk.query_report.run")
+            || (original_options.data && original_options.data.cmd === "frappe.desk.query_report.run")) {
+            jqxhr.setRequestHeader("X-DCR-Compact", "1");
+        }
+    });
+};
+
+steelforce_custom.dcr.is_compact = function (data) {
+    return Boolean(data && data.result && data.result.length === 1 && data.result[0].compact);
+};
+
+// the rows of a compact result row `{compact: {parent_index, styles, values}}`
+steelforce_custom.dcr.decode_compact = function (data) {
+    const { parent_index, styles, values } = data.compact;
+    const fields = Object.keys(values);
+
+    const rows = [];
+    parent_index.forEach((parent, i) => {
+        const row = {};
+        fields.forEach((field) => {
+            if (values[field][i] != null) row[field] = values[field][i];
+        });
+
+        if (row.name_style != null) row.name_style = styles[row.name_style];
+        if (!("indent" in values)) row.indent = parent === -1 ? 0 : rows[parent].indent + 1;
+        if (!("parent" in values)) row.parent = parent === -1 ? null : rows[parent].name;
+        rows.push(row);
+    });
+
+    return { result: rows };
+};
+
+/* SUMMARY-FIRST TREE: parents arrive with a child count, their invoice rows load on expand */
+
+steelforce_custom.dcr.setup_lazy_tree = function (report) {
+    $(report.page.wrapper).on("click", ".dcr-expand", function (e) {
+        e.preventDefault();
+        e.stopPropagation();
+        steelforce_custom.dcr.load_children(report, cint($(this).attr("data-lazy-key")));
+    });
+};
+
+steelforce_custom.dcr.load_children = function (report, lazy_key) {
+    const raw = report.raw_data;
+    const index = raw.result.findIndex((row) => row.lazy_key === lazy_key);
+    if (index === -1) return;
+
+    const parent = raw.result[index];
+
+    frappe.call({
+        method: "steelforce_custom.steelforce_custom.dcr.tree.get_children",
+        args: {
+            report_name: report.report_name,
+            filters: report.get_filter_values(),
+            lazy_key: lazy_key,
+            lazy_tree: parent.lazy_tree,
+            parent_name: steelforce_custom.dcr.style_name(parent.name, parent.name_style)
+        },
+        freeze: true
+    }).then((r) => {
+        parent.lazy_children = 0;
+        raw.result.splice(index + 1, 0, ...r.message);
+
+        report.render_report(raw);
+        report.datatable.rowmanager.openSingleNode(index);
+    });
+};
+
+/* REALTIME DELTAS: submits and cancels patched into the open tree and totals without a re-run */
+steelforce_custom.dcr.setup_realtime = function (report) {
+    const route = `query-report/${report.report_name}`;
+    report.dcr_watch = { interval: null, request: null, branches: [] };
+    steelforce_custom.dcr.start_watch(report);
+
+    // the report page stays loaded when left: stop watching there, resume on return
+    frappe.router.on("change", () => {
+        if (frappe.get_route_str() === route) {
+            steelforce_custom.dcr.start_watch(report);
+        } else {
+            steelforce_custom.dcr.stop_watch(report);
+        }
+    });
+
+    if (steelforce_custom.dcr.delta_listener) return;
+    steelforce_custom.dcr.delta_listener = true;
+
+    frappe.realtime.on("dcr_delta", (data) => {
+        const report = frappe.query_report;
+        if (report && report.raw_data && report.raw_data.result) {
+            steelforce_custom.dcr.apply_delta(report, data);
+        }
+    });
+};
+
+steelforce_custom.dcr.WATCH_RENEW_MS = 5 * 60 * 1000;
+
+steelforce_custom.dcr.start_watch = function (report) {
+    if (report.dcr_watch.interval) return;
+
+    report.dcr_watch.interval = setInterval(() => {
+        steelforce_custom.dcr.watch_branches(report, true);
+    }, steelforce_custom.dcr.WATCH_RENEW_MS);
+
+    if (report.raw_data) steelforce_custom.dcr.watch_branches(report, true);
+};
+
+steelforce_custom.dcr.stop_watch = function (report) {
+    const watch = report.dcr_watch;
+    if (!watch.interval) return;
+
+    clearInterval(watch.interval);
+    watch.branches.forEach((p) => frappe.realtime.emit("doc_unsubscribe", "POS Profile", p));
+    Object.assign(watch, { interval: null, request: null, branches: [] });
+};
+
+// after_datatable_render of the realtime reports: watch the branches just shown
+steelforce_custom.dcr.watch_shown_branches = function () {
+    const report = frappe.query_report;
+    if (report && report.dcr_watch && report.dcr_watch.interval) {
+        steelforce_custom.dcr.watch_branches(report);
+    }
+};
+
+steelforce_custom.dcr.watch_branches = function (report, renew) {
+    const watch = report.dcr_watch;
+    const filters = report.get_filter_values() || {};
+    const pos_profiles = [].concat(filters.pos_profile || []).sort();
+    const request = pos_profiles.join("\n");
+    if (!renew && request === watch.request) return;
+    watch.request = request;
+
+    frappe.xcall("steelforce_custom.steelforce_custom.dcr.realtime.watch_branches", {
+        pos_profiles: pos_profiles.join(","),
+    }).then((allowed) => {
+        // left the report while the call was out
+        if (!watch.interval) return;
+
+        // the POS Profile rooms, joined once the socket server checks read permission;
+        // emitted directly as doc_subscribe is throttled to one document a second;
+        // a renewal joins again, in case the socket reconnected in between
+        watch.branches.filter((p) => !allowed.includes(p)).forEach((p) => {
+            frappe.realtime.emit("doc_unsubscribe", "POS Profile", p);
+        });
+        allowed.filter((p) => renew || !watch.branches.includes(p)).forEach((p) => {
+            frappe.realtime.emit("doc_subscribe", "POS Profile", p);
+        });
+        watch.branches = allowed.sort();
+    });
+};
+
+steelforce_custom.dcr.apply_delta = function (report, data) {
+    const filters = report.get_filter_values();
+    if (!filters || data.business_date < filters.from_date || data.business_date > filters.to_date) return;
+
+    const pos_profiles = [].concat(filters.pos_profile || []);
+    if (!pos_profiles.includes(data.pos_profile)) return;
+
+    const changes = data.changes.filter((c) => c.report_name === report.report_name);
+    if (!changes.length) return;
+
+    const rows = report.raw_data.result;
+    const label = (row) => strip_html(row.name || "").trim();
+
+    // several branches: each has a branch row over its own tree and summary
+    let start = 0, end = rows.length, indent = 0, branch = null;
+    if (pos_profiles.length > 1) {
+        start = rows.findIndex((row) => !row.indent && label(row) === data.pos_profile);
+        if (start === -1) return;
+
+        branch = rows[start];
+        start += 1;
+        end = rows.findIndex((row, i) => i >= start && !row.indent);
+        end = end === -1 ? rows.length : end;
+        indent = 1;
+    }
+
+    const is_summary = (row) => row.name_style ? row.name_style[0] === "b" : (row.name || "").startsWith("<b");
+    let totals = { total: 0, cash: 0, card: 0 };
+
+    changes.forEach((c) => {
+        let index = rows.findIndex((row, i) => i >= start && i < end && row.indent === indent
+            && !is_summary(row) && label(row) === c.parent);
+
+        if (index === -1) {
+            // a new parent row, in label order before the summary
+            index = rows.findIndex((row, i) => i >= start && i < end && row.indent === indent
+                && (is_summary(row) || label(row) > c.parent));
+            index = index === -1 ? end : index;
+
+            rows.splice(index, 0, { name: c.parent_name, parent: branch && data.pos_profile, amount: 0, indent: indent });
+            end += 1;
+        }
+
+        const parent = rows[index];
+        parent.amount = flt(parent.amount + c.amount, 2);
+
+        // collapsed summary-first parent: its children load on expand
+        if (!parent.lazy_children) {
+            let last = index;
+            while (last + 1 < end && rows[last + 1].indent > indent) last += 1;
+
+            const child = rows.findIndex((row, i) => i > index && i <= last && row.parent === c.parent
+                && row.name === c.name && (row.invoice || null) === (c.invoice || null));
+
+            if (child === -1) {
+                rows.splice(last + 1, 0, {
+                    name: c.name, invoice: c.invoice, parent: c.parent, amount: c.amount, indent: indent + 1
+                });
+                end += 1;
+            } else if (Math.abs(rows[child].amount + c.amount) < 0.005) {
+                rows.splice(child, 1);
+                end -= 1;
+
+                // its last child gone: a re-run would not show the parent either
+                if (last === index + 1 && Math.abs(parent.amount) < 0.005) {
+                    rows.splice(index, 1);
+                    end -= 1;
+                }
+            } else {
+                rows[child].amount = flt(rows[child].amount + c.amount, 2);
+            }
+        }
+
+        totals.total += c.amount;
+        if (["Counter Sales", "Home Sales"].includes(c.sales_type)) {
+            if (c.tender === "cash") totals.cash += c.amount;
+            else if (c.tender === "card") totals.card += c.amount;
+        }
+    });
+
+    steelforce_custom.dcr.update_summary(rows.slice(start, end).filter((row) => row.indent === indent), totals);
+    if (branch) {
+        branch.amount = flt(branch.amount + totals.total, 2);
+        steelforce_custom.dcr.update_summary(rows.filter((row) => !row.indent), totals);
+    }
+
+    report.render_report(report.raw_data);
+    frappe.show_alert({ message: __("{0} updated", [__(report.report_name)]), indicator: "green" }, 3);
+};
+
+steelforce_custom.dcr.update_summary = function (rows, totals) {
+    const summary = {};
+    rows.forEach((row) => { summary[strip_html(row.name || "").trim()] = row; });
+
+    const total = summary["TOTAL"];
+    if (!total) return;
+
+    total.amount = flt(total.amount + totals.total, 2);
+    [["Total Cash (Counter + Home)", totals.cash], ["Total Card (Counter + Home)", totals.card]].forEach(([name, amount]) => {
+        if (summary[name]) summary[name].amount = flt(summary[name].amount + amount, 2);
+    });
+
+    // same split as the server summary
+    const vat = flt(total.amount * 0.15 / 1.15, 2);
+    if (summary["Total VAT (15%)"]) summary["Total VAT (15%)"].amount = vat;
+    if (summary["Total W/O VAT"]) summary["Total W/O VAT"].amount = flt(total.amount - vat, 2);
+};
+
+/* BOOTSTRAP: the user's POS Profile and the first result in one request, no run with empty filters */
+steelforce_custom.dcr.bootstrap_report = function (report) {
+    return frappe.call({
+        method: "steelforce_custom.steelforce_custom.dcr.bootstrap.get_bootstrap",
+        args: { report_name: report.report_name, filters: report.get_filter_values() }
+    }).then((r) => {
+        const data = r.message;
+        if (!data.result) {
+            frappe.msgprint(__("No POS Profile linked to this user"));
+            return;
+        }
+
+        // set_input, not set_value: a filter change would run the report again
+        Object.entries(data.filters).forEach(([fieldname, value]) => {
+            const filter = report.get_filter(fieldname);
+            if (filter) filter.set_input(value);
+        });
+
+        report.render_report(data.result);
+
+        // the run the report view starts once onload resolves
+        const refresh = Object.prototype.hasOwnProperty.call(report, "refresh") && report.refresh;
+        report.refresh = function () {
+            if (refresh) report.refresh = refresh;
+            else delete report.refresh;
+            return Promise.resolve();
+        };
+    });
+};
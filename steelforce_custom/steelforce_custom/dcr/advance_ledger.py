@@ -0,0 +1,187 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+DCR Sales Advance ledger.
+
+One row per Payment Entry × Sales Order advance with the Sales Order's
+warehouse, the amount received, the part already allocated to invoices and
+the remaining balance. Submitting or cancelling a Payment Entry rewrites its
+rows; a Sales Invoice rewrites the rows of the advances it allocates, since
+ERPNext moves the allocation onto the Payment Entry references then. Payment
+Reconciliation saves the Payment Entry (`on_update_after_submit`), Unreconcile
+Payment edits its references directly and is hooked itself. The DCR reads
+its "Sales Advance" rows from the ledger by warehouse and date.
+"""
+
+import frappe
+from frappe.utils import now
+
+from steelforce_custom.steelforce_custom.dcr.cache import (
+    get_invoice_branch_days,
+    get_payment_entry_branch_days,
+    invalidate,
+)
+from steelforce_custom.steelforce_custom.dcr.payment_facts import queue_vouchers
+from steelforce_custom.steelforce_custom.dcr.sales_channel import get_sales_channel
+
+
+LEDGER_FIELDS = (
+    "payment_entry",
+    "sales_order",
+    "customer",
+    "channel",
+    "warehouse",
+    "business_date",
+    "mode_of_payment",
+    "tender",
+    "amount",
+    "allocated_amount",
+    "outstanding_amount",
+)
+
+
+# -------------------------------------------------
+# DOC EVENTS
+# -------------------------------------------------
+def update_advance_ledger(doc, method=None):
+    payment_entries = get_ledger_payment_entries(doc)
+    if payment_entries:
+        rebuild_advance_ledger(payment_entries)
+
+
+def update_unreconciled_advances(doc, method=None):
+    """
+    Unreconcile Payment on_submit: ERPNext unlinks the Payment Entry's
+    references without a Payment Entry event, so its ledger rows, the facts
+    of it and of the unlinked invoices, and their cached results are
+    refreshed here.
+    """
+    if doc.voucher_type != "Payment Entry":
+        return
+
+    payment_entry = frappe.get_doc("Payment Entry", doc.voucher_no)
+    invoices = {a.reference_name for a in doc.allocations if a.reference_doctype == "Sales Invoice"}
+    invoices.update(r.reference_name for r in payment_entry.references if r.reference_doctype == "Sales Invoice")
+
+    rebuild_advance_ledger([payment_entry.name])
+    queue_vouchers([f"Payment Entry::{payment_entry.name}", *(f"Sales Invoice::{name}" for name in invoices)])
+    invalidate(get_payment_entry_branch_days(payment_entry) | get_invoice_branch_days(list(invoices)))
+
+
+def get_ledger_payment_entries(doc):
+    """Payment Entries whose ledger rows a Payment Entry / Sales Invoice submit or cancel changes."""
+    if doc.doctype == "Payment Entry":
+        return [doc.name]
+
+    return [
+        adv.reference_name for adv in doc.get("advances") or []
+        if adv.reference_type == "Payment Entry" and adv.allocated_amount
+    ]
+
+
+def rebuild_advance_ledger(payment_entries):
+    """Rewrite the ledger rows of the given Payment Entries; cancelled ones just lose theirs."""
+    frappe.db.delete("DCR Sales Advance", {"payment_entry": ("in", payment_entries)})
+
+    rows = []
+    for adv in get_sales_order_advance_balances(payment_entries):
+        rows.append((
+            adv.payment_entry, adv.sales_order, adv.customer, get_sales_channel(adv.customer),
+            adv.warehouse, adv.business_date, adv.mode_of_payment,
+            "Cash" if adv.mode_type == "Cash" else "Card",
+            adv.allocated_amount + adv.outstanding_amount, adv.allocated_amount, adv.outstanding_amount,
+        ))
+
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+
+    frappe.db.bulk_insert(
+        "DCR Sales Advance",
+        ("name", "creation", "modified", "owner", "modified_by", *LEDGER_FIELDS),
+        [(frappe.generate_hash(length=12), timestamp, timestamp, user, user, *row) for row in rows],
+    )
+
+
+def get_sales_order_advance_balances(payment_entries):
+    """
+    Sales Order advances of the Payment Entries: references still on the Sales
+    Order are outstanding, references moved to an invoice are allocated.
+    """
+    return frappe.db.sql("""
+        SELECT
+            pe.name AS payment_entry,
+            so.name AS sales_order,
+            so.customer,
+            so.set_warehouse AS warehouse,
+            pe.business_date,
+            pe.mode_of_payment,
+            mop.type AS mode_type,
+            SUM(CASE WHEN per.reference_doctype = 'Sales Order' THEN per.allocated_amount ELSE 0 END)
+                AS outstanding_amount,
+            SUM(CASE WHEN per.reference_doctype = 'Sales Invoice' THEN per.allocated_amount ELSE 0 END)
+                AS allocated_amount
+        FROM `tabPayment Entry` pe
+        JOIN `tabPayment Entry Reference` per ON per.parent = pe.name
+        JOIN `tabSales Order` so ON so.name = IF(
+            per.reference_doctype = 'Sales Order', per.reference_name, per.advance_voucher_no
+        )
+        LEFT JOIN `tabMode of Payment` mop ON mop.name = pe.mode_of_payment
+        WHERE
+            pe.name IN %(payment_entries)s
+            AND pe.docstatus = 1
+            AND pe.payment_type = 'Receive'
+            AND (
+                per.reference_doctype = 'Sales Order'
+                OR (per.reference_doctype = 'Sales Invoice' AND per.advance_voucher_type = 'Sales Order')
+            )
+        GROUP BY pe.name, so.name, so.customer, so.set_warehouse, pe.business_date,
+            pe.mode_of_payment, mop.type
+    """, {"payment_entries": tuple(payment_entries)}, as_dict=True)
+
+
+# -------------------------------------------------
+# READ
+# -------------------------------------------------
+def get_sales_advance_rows(warehouses, from_date, to_date):
+    """Advances received for the warehouses in range with a balance not yet invoiced."""
+    if not warehouses:
+        return []
+
+    return frappe.db.sql("""
+        SELECT
+            payment_entry,
+            sales_order,
+            warehouse,
+            channel,
+            mode_of_payment,
+            tender,
+            outstanding_amount AS amount
+        FROM `tabDCR Sales Advance`
+        WHERE
+            warehouse IN %(warehouses)s
+            AND business_date BETWEEN %(from_date)s AND %(to_date)s
+            AND outstanding_amount != 0
+    """, {"warehouses": tuple(warehouses), "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+
+def get_payment_entry_advance_rows(payment_entries):
+    """The not yet invoiced balance of the given Payment Entries' advances, with their business day."""
+    return frappe.db.sql("""
+        SELECT
+            payment_entry,
+            sales_order,
+            warehouse,
+            business_date,
+            channel,
+            mode_of_payment,
+            tender,
+            outstanding_amount AS amount
+        FROM `tabDCR Sales Advance`
+        WHERE
+            payment_entry IN %(payment_entries)s
+            AND outstanding_amount != 0
+    """, {"payment_entries": tuple(payment_entries)}, as_dict=True)
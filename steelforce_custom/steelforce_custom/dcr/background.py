@@ -0,0 +1,175 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Background mode for the long range DCR reports.
+
+A request is split into branch × business-day chunks, each run by its own RQ
+job through the report's `get_chunk(filters)`. Chunk results are parked in
+Redis and the finished chunk indexes kept as a set, so a retried chunk counts
+once. The job completing the set takes a lock and calls the report's
+`merge_chunks(chunks)`, which returns the same `(columns, data)` as an
+interactive run, and stores it in the result cache as well. Progress goes to
+the user over realtime events.
+"""
+
+import frappe
+from frappe import _
+
+from steelforce_custom.steelforce_custom.dcr.cache import (
+    get_cache_key,
+    get_dates,
+    store_result,
+)
+from steelforce_custom.steelforce_custom.dcr.engine import get_report_module, parse_pos_profiles
+from steelforce_custom.steelforce_custom.dcr.replica import replica_reads
+
+
+BACKGROUND_REPORTS = ("DCR-All Branches", "DCR-Accounts Report")
+RUN_PREFIX = "dcr_background"
+RUN_TTL = 6 * 60 * 60
+
+
+@frappe.whitelist()
+def start_report(report_name, filters):
+    """Queue the chunks of a report run; returns the run id and the chunk count."""
+    if report_name not in BACKGROUND_REPORTS:
+        frappe.throw(_("{0} cannot run in background").format(report_name))
+
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("You don't have access to Report: {0}").format(report_name), frappe.PermissionError)
+
+    filters = frappe._dict(frappe.parse_json(filters))
+    if not filters.get("from_date") or not filters.get("to_date"):
+        frappe.throw(_("From Date and To Date are required"))
+
+    run_id = frappe.generate_hash(length=12)
+    run = {
+        "report_name": report_name,
+        "filters": filters,
+        "user": frappe.session.user,
+        "chunks": get_chunk_filters(filters),
+    }
+
+    set_run_value(run_id, "run", run)
+
+    # a cached result needs no chunk at all
+    result = frappe.cache.get_value(get_cache_key(report_name, filters))
+    if result is not None:
+        set_run_value(run_id, "result", result)
+        return {"run_id": run_id, "total": 0}
+
+    for index in range(len(run["chunks"])):
+        frappe.enqueue(
+            "steelforce_custom.steelforce_custom.dcr.background.run_chunk",
+            queue="long",
+            job_id=f"{RUN_PREFIX}::{run_id}::{index}",
+            deduplicate=True,
+            run_id=run_id,
+            index=index,
+        )
+
+    return {"run_id": run_id, "total": len(run["chunks"])}
+
+
+@frappe.whitelist()
+def get_result(run_id):
+    run = get_run_value(run_id, "run")
+    if not run or run["user"] != frappe.session.user:
+        frappe.throw(_("Background run {0} not found").format(run_id))
+
+    result = get_run_value(run_id, "result")
+    if result is None:
+        frappe.throw(_("Background run {0} is still running").format(run_id))
+
+    columns, data = result[:2]
+    return {"columns": columns, "result": data}
+
+
+def get_chunk_filters(filters):
+    """
+    One chunk per selected branch and business day.
+
+    Without a branch filter a chunk covers every branch of its day, so
+    invoices without a POS Profile are still counted once.
+    """
+    branches = parse_pos_profiles(filters.get("pos_profile")) or [None]
+
+    chunks = []
+    for business_date in get_dates(filters.from_date, filters.to_date):
+        for branch in branches:
+            chunk = dict(filters, from_date=str(business_date), to_date=str(business_date))
+            chunk["pos_profile"] = [branch] if branch else None
+            chunks.append(chunk)
+
+    return chunks
+
+
+# -------------------------------------------------
+# WORKER
+# -------------------------------------------------
+def run_chunk(run_id, index):
+    run = get_run_value(run_id, "run")
+    if not run:
+        return
+
+    module = get_report_module(run["report_name"])
+    try:
+        with replica_reads():
+            chunk = module.get_chunk(frappe._dict(run["chunks"][index]))
+    except Exception:
+        frappe.publish_realtime("dcr_report_failed", {"run_id": run_id}, user=run["user"])
+        raise
+
+    set_run_value(run_id, index, chunk)
+
+    # chunks done as a set: a retried or requeued chunk is counted once
+    done_key = get_run_key(run_id, "done")
+    frappe.cache.sadd(done_key, index)
+    frappe.cache.expire(frappe.cache.make_key(done_key), RUN_TTL)
+    done = frappe.cache.scard(frappe.cache.make_key(done_key))
+
+    total = len(run["chunks"])
+    frappe.publish_realtime(
+        "dcr_report_progress",
+        {"run_id": run_id, "done": done, "total": total},
+        user=run["user"],
+    )
+
+    # the last chunks can finish together, only one of them merges
+    merge_lock = frappe.cache.make_key(get_run_key(run_id, "merge"))
+    if done == total and frappe.cache.set(merge_lock, 1, nx=True, ex=RUN_TTL):
+        try:
+            merge_run(run_id, run, module)
+        except Exception:
+            frappe.cache.delete(merge_lock)
+            raise
+
+
+def merge_run(run_id, run, module):
+    total = len(run["chunks"])
+    chunks = [get_run_value(run_id, index) for index in range(total)]
+
+    result = module.merge_chunks(chunks)
+    set_run_value(run_id, "result", result)
+
+    filters = frappe._dict(run["filters"])
+    store_result(get_cache_key(run["report_name"], filters), filters, result)
+
+    frappe.cache.delete_value([get_run_key(run_id, index) for index in range(total)])
+    frappe.publish_realtime("dcr_report_ready", {"run_id": run_id}, user=run["user"])
+
+
+# -------------------------------------------------
+# RUN STATE
+# -------------------------------------------------
+def get_run_key(run_id, part):
+    return f"{RUN_PREFIX}::{run_id}::{part}"
+
+
+def get_run_value(run_id, part):
+    return frappe.cache.get_value(get_run_key(run_id, part))
+
+
+def set_run_value(run_id, part, value):
+    frappe.cache.set_value(get_run_key(run_id, part), value, expires_in_sec=RUN_TTL)
@@ -0,0 +1,121 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Benchmark of the six DCR reports.
+
+Runs every report's execute (bypassing the result cache) for 1, 7 and 31
+day windows ending on the latest business date and records wall time, SQL
+count, rows read by the storage engine (Handler_read_* deltas) and Python
+peak memory. Results are written to a JSON file; passing a previous file as
+`baseline` prints the ratio against it and flags regressions, e.g.
+
+    bench --site test.local execute \\
+        steelforce_custom.steelforce_custom.dcr.benchmark.run \\
+        --kwargs "{'save': 'dcr-after.json', 'baseline': 'dcr-before.json'}"
+
+Fill the site with `dcr.generator.generate` first.
+"""
+
+import json
+import time
+import tracemalloc
+
+import frappe
+from frappe.utils import add_days
+
+from steelforce_custom.steelforce_custom.dcr.engine import DCR_REPORTS
+from steelforce_custom.steelforce_custom.dcr.explain import (
+    capture_queries,
+    get_default_filters,
+    get_uncached_execute,
+)
+
+
+WINDOWS = (1, 7, 31)
+METRICS = ("seconds", "queries", "rows_read", "peak_kb")
+REGRESSION_RATIO = 1.2
+
+
+def run(save=None, baseline=None, reports=DCR_REPORTS, windows=WINDOWS, pos_profile=None):
+    """Benchmark `reports`; paths are relative to the site folder."""
+    defaults = get_default_filters()
+    pos_profile = pos_profile or defaults["pos_profile"]
+
+    results = {}
+    for report_name in reports:
+        for days in windows:
+            filters = frappe._dict(
+                from_date=add_days(defaults["to_date"], 1 - days),
+                to_date=defaults["to_date"],
+                pos_profile=pos_profile,
+            )
+            results[f"{report_name} / {days}d"] = measure(report_name, filters)
+
+    if save:
+        with open(frappe.get_site_path(save), "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    print_results(results, load_baseline(baseline) if baseline else {})
+    return results
+
+
+def measure(report_name, filters):
+    execute = get_uncached_execute(report_name)
+
+    handler_reads = get_handler_reads()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    with capture_queries() as queries:
+        _columns, data = execute(filters)[:2]
+
+    seconds = time.perf_counter() - start
+    _size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": round(seconds, 4),
+        "queries": len(queries),
+        "rows_read": get_handler_reads() - handler_reads,
+        "peak_kb": round(peak / 1024),
+        "rows": len(data),
+    }
+
+
+def get_handler_reads():
+    """Rows read by the storage engine in this session so far."""
+    return sum(
+        int(value)
+        for _name, value in frappe.db.sql("SHOW SESSION STATUS LIKE 'Handler_read%%'")
+    )
+
+
+# -------------------------------------------------
+# BASELINE
+# -------------------------------------------------
+def load_baseline(path):
+    with open(frappe.get_site_path(path)) as f:
+        return json.load(f)
+
+
+def print_results(results, baseline):
+    regressions = []
+
+    for key, result in results.items():
+        line = [f"{key:<32}"]
+        for metric in METRICS:
+            value = result[metric]
+            old = (baseline.get(key) or {}).get(metric)
+            if old:
+                ratio = value / old
+                line.append(f"{metric} {value} ({ratio:.2f}x)")
+                # wall time is noisy, only the deterministic counters flag a regression
+                if ratio > REGRESSION_RATIO and metric != "seconds":
+                    regressions.append(f"{key}: {metric} {old} -> {value}")
+            else:
+                line.append(f"{metric} {value}")
+        print("  ".join(line))
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
@@ -0,0 +1,74 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+One-request load of the branch DCR reports.
+
+Opening a report used to run it with the default (empty) filters, look up
+the user's POS Profile from the browser, set it and run the report again.
+`get_bootstrap` resolves the POS Profile from a cached user → POS Profiles
+map and returns the filters together with the first result, so the report
+script renders it directly and the load-time run is skipped.
+"""
+
+import frappe
+from frappe import _
+from frappe.desk.query_report import run
+
+
+CACHE_KEY = "dcr_user_pos_profiles"
+
+# report: whether its POS Profile filter is a MultiSelectList
+BOOTSTRAP_REPORTS = {
+    "DCR-Report": True,
+    "New DCR-Report": False,
+    "Test1": False,
+}
+
+
+@frappe.whitelist()
+def get_bootstrap(report_name, filters=None):
+    """`{"filters", "pos_profiles", "result"}`; no result when the user has no POS Profile."""
+    if report_name not in BOOTSTRAP_REPORTS:
+        frappe.throw(_("{0} has no bootstrap").format(report_name))
+
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    pos_profiles = get_user_pos_profiles(frappe.session.user)
+    if not pos_profiles:
+        return {"filters": filters, "pos_profiles": [], "result": None}
+
+    filters.pos_profile = [pos_profiles[0]] if BOOTSTRAP_REPORTS[report_name] else pos_profiles[0]
+
+    # the same payload (and permission checks) as the report view's own run
+    result = run(report_name, filters, is_tree=True, parent_field="parent")
+
+    return {"filters": filters, "pos_profiles": pos_profiles, "result": result}
+
+
+def get_user_pos_profiles(user):
+    return get_user_pos_profile_map().get(user, [])
+
+
+def get_user_pos_profile_map():
+    """{user: [POS Profile, ...]}, most recently modified first."""
+    return frappe.cache.get_value(CACHE_KEY, build_user_pos_profile_map)
+
+
+def build_user_pos_profile_map():
+    user_map = {}
+    for user, pos_profile in frappe.db.sql("""
+        SELECT ppu.user, pp.name
+        FROM `tabPOS Profile User` ppu
+        JOIN `tabPOS Profile` pp ON pp.name = ppu.parent
+        ORDER BY pp.modified DESC, ppu.idx
+    """):
+        user_map.setdefault(user, [])
+        if pos_profile not in user_map[user]:
+            user_map[user].append(pos_profile)
+
+    return user_map
+
+
+def clear_user_pos_profiles(doc=None, method=None):
+    """doc_events hook for POS Profile update / delete."""
+    frappe.cache.delete_value(CACHE_KEY)
@@ -0,0 +1,70 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Business day of Sales Invoices and Payment Entries.
+
+A branch's day runs from its POS Profile `business_day_cutoff` to the same
+time on the next calendar day, so a sale at 01:30 belongs to the previous
+day. The date is stored on submit in the indexed `business_date` column and
+every DCR report filters on that column instead of a TIMESTAMP() expression.
+"""
+
+import frappe
+from frappe.utils import add_days, get_time, getdate
+
+
+DEFAULT_CUTOFF = "04:00:00"
+
+
+def get_cutoff(pos_profile=None):
+    cutoff = None
+    if pos_profile:
+        cutoff = frappe.get_cached_value("POS Profile", pos_profile, "business_day_cutoff")
+
+    return get_time(cutoff or DEFAULT_CUTOFF)
+
+
+def get_business_date(posting_date, posting_time, pos_profile=None):
+    posting_date = getdate(posting_date)
+    if posting_time is not None and get_time(posting_time) < get_cutoff(pos_profile):
+        return add_days(posting_date, -1)
+    return posting_date
+
+
+# -------------------------------------------------
+# DOC EVENTS
+# -------------------------------------------------
+def set_business_date(doc, method=None):
+    if doc.doctype == "Payment Entry":
+        doc.business_date = get_business_date(
+            doc.posting_date,
+            get_payment_entry_time(doc.posting_date, doc.creation),
+            get_payment_entry_pos_profile(doc),
+        )
+    else:
+        doc.business_date = get_business_date(doc.posting_date, doc.posting_time, doc.pos_profile)
+
+
+def get_payment_entry_time(posting_date, creation):
+    """Payment Entry has no posting time; a same-day entry uses its creation time."""
+    if creation and getdate(creation) == getdate(posting_date):
+        return get_time(creation)
+    return None
+
+
+def get_payment_entry_pos_profile(doc):
+    """The branch of a Payment Entry is the POS Profile of what it pays for."""
+    for ref in doc.get("references") or []:
+        if ref.reference_doctype == "Sales Invoice":
+            pos_profile = frappe.db.get_value("Sales Invoice", ref.reference_name, "pos_profile")
+            if pos_profile:
+                return pos_profile
+
+        if ref.reference_doctype == "Sales Order":
+            warehouse = frappe.db.get_value("Sales Order", ref.reference_name, "set_warehouse")
+            pos_profile = warehouse and frappe.db.get_value("POS Profile", {"warehouse": warehouse}, "name")
+            if pos_profile:
+                return pos_profile
+
+    return None
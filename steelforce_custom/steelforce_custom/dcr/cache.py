@@ -0,0 +1,257 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Redis result cache for the DCR reports.
+
+`execute(filters)` results are stored in Frappe's Redis cache under the
+report name and the normalized filters (dates, sorted POS profiles). Each
+key is also indexed by every (branch, business day) it covers, so a submit
+or cancel only drops the results of the branch and day it touches; a closed
+day keeps being served from one cache hit.
+
+Identical requests missing the cache together (everyone opening the closing
+at once) are coalesced: the first takes a Redis lock on the key and runs the
+report, the others wait for its result and only run it themselves if the
+lock goes away without a result (the leader failed) or `dcr_single_flight_wait`
+seconds (default 30) pass.
+"""
+
+import functools
+import hashlib
+import json
+import time
+
+import frappe
+from frappe.utils import add_days, cint, date_diff, getdate
+
+from steelforce_custom.steelforce_custom.dcr.engine import parse_pos_profiles
+from steelforce_custom.steelforce_custom.dcr.profiler import is_profiling, profile_report
+from steelforce_custom.steelforce_custom.dcr.replica import replica_reads
+
+
+CACHE_PREFIX = "dcr_report_cache"
+INDEX_PREFIX = "dcr_report_cache_index"
+VERSION_PREFIX = "dcr_report_cache_version"
+LOCK_PREFIX = "dcr_report_cache_lock"
+ALL_BRANCHES = "*"
+DEFAULT_TTL = 24 * 60 * 60
+
+# single flight: a dead leader's lock expires, waiters give up before that
+LOCK_TTL = 60
+DEFAULT_WAIT = 30
+POLL_INTERVAL = 0.25
+
+# filters that change how a run is served, not its result
+RUN_ONLY_FILTERS = ("profile", "summary_only")
+
+
+def cached_report(report_name):
+    """Serve `execute(filters)` of a DCR report from the result cache, or profile it; misses read from the replica."""
+
+    def decorator(execute):
+        def run(filters):
+            with replica_reads():
+                return execute(filters)
+
+        @functools.wraps(execute)
+        def wrapper(filters=None):
+            filters = frappe._dict(filters or {})
+            # profiled runs stay on the primary, where the SQL recorder sits
+            if is_profiling(filters):
+                return profile_report(report_name, execute, filters)
+
+            if not filters.get("from_date") or not filters.get("to_date"):
+                return run(filters)
+
+            key = get_cache_key(report_name, filters)
+            result = frappe.cache.get_value(key)
+            if result is None:
+                result = run_once(key, filters, run)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def run_once(key, filters, run):
+    """Run and store the result of a cache miss, or wait for the identical run already under way."""
+    lock = frappe.cache.make_key(f"{LOCK_PREFIX}::{key}")
+    token = frappe.generate_hash(length=12)
+
+    if not frappe.cache.set(lock, token, nx=True, ex=LOCK_TTL):
+        result = wait_for_result(key, lock)
+        if result is not None:
+            return result
+
+    try:
+        result = run(filters)
+        store_result(key, filters, result)
+        return result
+    finally:
+        release_lock(lock, token)
+
+
+def wait_for_result(key, lock):
+    """The leader's result, or None when it failed or is too slow."""
+    deadline = time.monotonic() + (cint(frappe.conf.get("dcr_single_flight_wait")) or DEFAULT_WAIT)
+
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+
+        result = frappe.cache.get_value(key)
+        if result is not None:
+            return result
+
+        # no lock left: the leader stored its result just now, or failed
+        if frappe.cache.get(lock) is None:
+            return frappe.cache.get_value(key)
+
+    return None
+
+
+def release_lock(lock, token):
+    # only our own: after a timeout or expiry the lock may be another leader's
+    if frappe.safe_decode(frappe.cache.get(lock)) == token:
+        frappe.cache.delete(lock)
+
+
+def normalize_filters(filters):
+    normalized = {k: v for k, v in filters.items() if v not in (None, "", []) and k not in RUN_ONLY_FILTERS}
+    normalized["from_date"] = str(getdate(filters.from_date))
+    normalized["to_date"] = str(getdate(filters.to_date))
+
+    if filters.get("pos_profile"):
+        normalized["pos_profile"] = sorted(parse_pos_profiles(filters.pos_profile))
+
+    return normalized
+
+
+def get_cache_key(report_name, filters):
+    normalized = json.dumps(normalize_filters(filters), sort_keys=True, default=str)
+    return f"{CACHE_PREFIX}::{report_name}::{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+def store_result(key, filters, result):
+    ttl = cint(frappe.conf.get("dcr_report_cache_ttl")) or DEFAULT_TTL
+    frappe.cache.set_value(key, result, expires_in_sec=ttl)
+
+    branches = parse_pos_profiles(filters.get("pos_profile")) or [ALL_BRANCHES]
+    for business_date in get_dates(filters.from_date, filters.to_date):
+        for branch in branches:
+            index = get_index_key(branch, business_date)
+            frappe.cache.sadd(index, key)
+            frappe.cache.expire(frappe.cache.make_key(index), ttl)
+
+
+def get_dates(from_date, to_date):
+    from_date = getdate(from_date)
+    return [add_days(from_date, i) for i in range(date_diff(to_date, from_date) + 1)]
+
+
+def get_index_key(branch, business_date):
+    return f"{INDEX_PREFIX}::{branch}::{getdate(business_date)}"
+
+
+# -------------------------------------------------
+# INVALIDATION
+# -------------------------------------------------
+def invalidate(branch_days):
+    """Drop every cached result covering one of the (branch, business day) pairs and bump their data version."""
+    indexes = set()
+    for branch, business_date in branch_days:
+        if not business_date:
+            continue
+        indexes.add(get_index_key(branch or ALL_BRANCHES, business_date))
+        indexes.add(get_index_key(ALL_BRANCHES, business_date))
+        frappe.cache.incr(frappe.cache.make_key(get_version_key(branch or ALL_BRANCHES, business_date)))
+
+    for index in indexes:
+        members = frappe.cache.smembers(index)
+        if not members:
+            continue
+
+        # srem rather than delete, a result cached meanwhile keeps its index entry
+        frappe.cache.srem(index, *members)
+        frappe.cache.delete_value([frappe.safe_decode(k) for k in members])
+
+
+def clear_report_cache():
+    """Drop every cached result and index, e.g. when a mapping the reports read changes."""
+    frappe.cache.delete_keys(CACHE_PREFIX)
+
+
+def get_data_version(branch, business_date):
+    """Changes whenever a submit or cancel touches the branch's day, for caches keyed on content."""
+    versions = [
+        cint(frappe.cache.get(frappe.cache.make_key(get_version_key(b, business_date))))
+        for b in (branch, ALL_BRANCHES)
+    ]
+    return ".".join(str(v) for v in versions)
+
+
+def get_version_key(branch, business_date):
+    return f"{VERSION_PREFIX}::{branch}::{getdate(business_date)}"
+
+
+def invalidate_report_cache(doc, method=None):
+    """doc_events hook for Sales Invoice, Payment Entry and Sales Order submit / cancel."""
+    if doc.doctype == "Sales Invoice":
+        branch_days = {(doc.pos_profile, doc.business_date)}
+    elif doc.doctype == "Payment Entry":
+        branch_days = get_payment_entry_branch_days(doc)
+    else:
+        branch_days = get_sales_order_branch_days(doc)
+
+    invalidate(branch_days)
+
+
+def get_payment_entry_branch_days(doc):
+    """Days of the invoices it settles, and its own day for each advance branch."""
+    invoices = [r.reference_name for r in doc.references if r.reference_doctype == "Sales Invoice"]
+    sales_orders = [r.reference_name for r in doc.references if r.reference_doctype == "Sales Order"]
+
+    branch_days = get_invoice_branch_days(invoices)
+
+    if sales_orders:
+        for branch in get_warehouse_branches(sales_orders):
+            branch_days.add((branch, doc.business_date))
+
+    return branch_days
+
+
+def get_invoice_branch_days(invoices):
+    if not invoices:
+        return set()
+
+    return set(frappe.db.sql("""
+        SELECT pos_profile, business_date
+        FROM `tabSales Invoice`
+        WHERE name IN %(invoices)s
+    """, {"invoices": tuple(invoices)}))
+
+
+def get_sales_order_branch_days(doc):
+    """The Sales Order decides which branch its advances count for."""
+    branches = get_warehouse_branches([doc.name])
+    days = frappe.db.sql_list("""
+        SELECT DISTINCT pe.business_date
+        FROM `tabPayment Entry` pe
+        JOIN `tabPayment Entry Reference` per ON per.parent = pe.name
+        WHERE per.reference_doctype = 'Sales Order'
+          AND per.reference_name = %(sales_order)s
+          AND pe.docstatus = 1
+    """, {"sales_order": doc.name})
+
+    return {(branch, day) for branch in branches for day in days}
+
+
+def get_warehouse_branches(sales_orders):
+    return frappe.db.sql_list("""
+        SELECT DISTINCT pp.name
+        FROM `tabPOS Profile` pp
+        JOIN `tabSales Order` so ON so.set_warehouse = pp.warehouse
+        WHERE so.name IN %(sales_orders)s
+    """, {"sales_orders": tuple(sales_orders)})
@@ -0,0 +1,181 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Compact wire format of the DCR tree reports.
+
+A tree result is a list of row dicts, each repeating its keys, its parent's
+label and, on parents and summary rows, the `<span>` / `<b>` markup around
+its name. The report view's run (`run_report`, over Frappe's own) sends the
+same result as one array per field, a parent-index array (the row's parent
+label and indent follow from it) and the markup as an index into a small
+table of `(tag, style)`; dcr.js rebuilds the rows before the view prepares
+them and `tree_formatter` wraps the names again. `compress_response` gzips
+(or brotli-compresses, when installed) the large DCR responses for clients
+that accept it.
+
+Enabled with the `dcr_compact_results` site config; dcr.js reads it from the
+boot info and then asks for compact results with the `X-DCR-Compact` header.
+Other callers of the run keep the standard rows.
+"""
+
+import gzip
+import re
+
+import frappe
+from frappe.desk.query_report import run
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPACT_REPORTS = ("DCR-Report", "New DCR-Report", "DCR-All Branches", "Test1")
+COMPACT_HEADER = "X-DCR-Compact"
+
+# whitelisted methods whose responses are compressed
+COMPRESSED_METHODS = (
+    "frappe.desk.query_report.run",
+    "steelforce_custom.steelforce_custom.dcr.bootstrap.get_bootstrap",
+    "steelforce_custom.steelforce_custom.dcr.background.get_result",
+    "steelforce_custom.steelforce_custom.dcr.pagination.get_page",
+    "steelforce_custom.steelforce_custom.dcr.tree.get_children",
+)
+COMPRESS_MIN_BYTES = 16 * 1024
+
+STYLED_NAME = re.compile(r"^<(b|span)(?: style='([^']*)')?>(.*)</\1>$", re.S)
+
+
+def is_enabled():
+    return bool(frappe.conf.get("dcr_compact_results"))
+
+
+def boot_session(bootinfo):
+    bootinfo.dcr_compact_results = is_enabled()
+
+
+@frappe.whitelist()
+def run_report(
+    report_name,
+    filters=None,
+    user=None,
+    ignore_prepared_report=False,
+    custom_columns=None,
+    is_tree=False,
+    parent_field=None,
+    are_default_filters=True,
+):
+    """
+    `frappe.desk.query_report.run` (overridden in hooks). For a DCR tree run
+    by a view that asks for it, `result` is one row `{"compact": ...}` that
+    dcr.js decodes before the report view prepares the data.
+    """
+    result = run(
+        report_name,
+        filters,
+        user,
+        ignore_prepared_report,
+        custom_columns,
+        is_tree,
+        parent_field,
+        are_default_filters,
+    )
+
+    if wants_compact(report_name) and result.get("result"):
+        result["result"] = [{"compact": encode_rows(result["result"])}]
+
+    return result
+
+
+def wants_compact(report_name):
+    return is_enabled() and report_name in COMPACT_REPORTS and bool(frappe.get_request_header(COMPACT_HEADER))
+
+
+# -------------------------------------------------
+# ENCODE
+# -------------------------------------------------
+def encode_rows(rows):
+    """
+    `{"parent_index", "styles", "values"}` of the tree rows. `parent` and
+    `indent` are only sent as columns when the tree does not imply them.
+    """
+    names, name_styles, styles = [], [], {}
+    for row in rows:
+        name, style = split_name_style(row.get("name"))
+        names.append(name)
+        name_styles.append(style if style is None else styles.setdefault(style, len(styles)))
+
+    parent_index, depths = [], []
+    parent_implied = indent_implied = True
+    stack = []
+
+    for i, row in enumerate(rows):
+        indent = row.get("indent") or 0
+        while stack and (rows[stack[-1]].get("indent") or 0) >= indent:
+            stack.pop()
+
+        parent = stack[-1] if stack else -1
+        parent_index.append(parent)
+        depths.append(depths[parent] + 1 if parent >= 0 else 0)
+        stack.append(i)
+
+        parent_implied = parent_implied and row.get("parent") == (names[parent] if parent >= 0 else None)
+        indent_implied = indent_implied and indent == depths[i]
+
+    fields = {}
+    for row in rows:
+        fields.update(dict.fromkeys(row))
+
+    fields.pop("name", None)
+    if parent_implied:
+        fields.pop("parent", None)
+    if indent_implied:
+        fields.pop("indent", None)
+
+    values = {"name": names, "name_style": name_styles}
+    for field in fields:
+        values[field] = [row.get(field) for row in rows]
+
+    return {
+        "parent_index": parent_index,
+        "styles": [list(style) for style in styles],
+        "values": values,
+    }
+
+
+def split_name_style(name):
+    """`("Label", (tag, style))` of a name wrapped in one `<b>` / `<span>`, else `(name, None)`."""
+    match = STYLED_NAME.match(name) if isinstance(name, str) else None
+    if not match:
+        return name, None
+
+    tag, style, label = match.groups()
+    return label, (tag, style or "")
+
+
+# -------------------------------------------------
+# COMPRESSION
+# -------------------------------------------------
+def compress_response(response=None, request=None):
+    """after_request hook: compress the large DCR responses the client accepts compressed."""
+    if response is None or request is None or response.status_code != 200 or response.direct_passthrough:
+        return
+
+    if request.path.rsplit("/", 1)[-1] not in COMPRESSED_METHODS or response.headers.get("Content-Encoding"):
+        return
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return
+
+    if brotli and "br" in request.accept_encodings:
+        body, encoding = brotli.compress(body, quality=5), "br"
+    elif "gzip" in request.accept_encodings:
+        body, encoding = gzip.compress(body, compresslevel=6), "gzip"
+    else:
+        return
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
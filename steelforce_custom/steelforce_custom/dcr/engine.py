@@ -0,0 +1,469 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Shared single-pass engine for the DCR tree reports.
+
+The invoice, POS payment and Payment Entry facts for a request are fetched
+once (three queries, whatever the number of modes or invoices) and every
+report classifies them in Python into the parent / child tree it emits.
+"""
+
+from collections import namedtuple
+from itertools import groupby
+from operator import itemgetter
+
+import frappe
+from frappe.modules import get_report_module_dotted_path
+
+
+DCR_REPORTS = (
+    "DCR-Report",
+    "New DCR-Report",
+    "DCR-All Branches",
+    "DCR-Accounts",
+    "DCR-Accounts Report",
+    "Test1",
+)
+
+CREDIT_SALE = "Credit Sale"
+
+# row kinds of the invoice stream, in the order they arrive for an invoice
+STREAM_INVOICE, STREAM_REFERENCE, STREAM_POS = 0, 1, 2
+
+StreamInvoice = namedtuple(
+    "StreamInvoice",
+    "name business_date pos_profile sales_channel is_return grand_total change_amount",
+)
+StreamPayment = namedtuple(
+    "StreamPayment",
+    "mode_of_payment mode_type amount advance_voucher_type advance_voucher_no payment_entry "
+    "sales_order_warehouse",
+)
+
+
+def get_report_module(report_name):
+    return frappe.get_module(get_report_module_dotted_path("Steelforce Custom", report_name))
+
+
+def parse_pos_profiles(pos_profiles):
+    """Normalize a MultiSelectList / comma separated POS Profile filter to a list."""
+    if not pos_profiles:
+        return []
+
+    if isinstance(pos_profiles, str):
+        pos_profiles = pos_profiles.split(",")
+
+    return [p.strip() for p in pos_profiles if p and p.strip()]
+
+
+# -------------------------------------------------
+# FETCH
+# -------------------------------------------------
+def get_invoice_facts(conditions, values, payment_entries=True):
+    """
+    Fetch every fact the DCR tree needs for the invoices matching `conditions`.
+
+    `conditions` is a list of SQL snippets on the `si` alias; they are applied
+    to the invoice query and, as a join back to `tabSales Invoice`, to the
+    payment queries, so the payment side only reads rows of invoices in range.
+
+    Returns `(invoices, pos_map, ref_map)` where the maps are keyed by invoice;
+    reports that ignore Payment Entries pass `payment_entries=False` to skip
+    that query.
+    """
+    where = " AND ".join(["si.docstatus = 1", *conditions])
+
+    invoices = frappe.db.sql(f"""
+        SELECT
+            si.name,
+            si.customer,
+            si.sales_channel,
+            si.pos_profile,
+            si.business_date,
+            si.is_return,
+            si.grand_total,
+            IFNULL(si.paid_amount, 0) AS paid_amount,
+            IFNULL(si.change_amount, 0) AS change_amount
+        FROM `tabSales Invoice` si
+        WHERE {where}
+        ORDER BY si.name
+    """, values, as_dict=True)
+
+    pos_payments = frappe.db.sql(f"""
+        SELECT
+            sip.parent AS invoice,
+            sip.mode_of_payment,
+            mop.type AS mode_type,
+            SUM(sip.amount) AS amount
+        FROM `tabSales Invoice Payment` sip
+        JOIN `tabSales Invoice` si ON si.name = sip.parent
+        LEFT JOIN `tabMode of Payment` mop ON mop.name = sip.mode_of_payment
+        WHERE
+            sip.parenttype = 'Sales Invoice'
+            AND sip.parentfield = 'payments'
+            AND {where}
+        GROUP BY sip.parent, sip.mode_of_payment, mop.type
+        ORDER BY sip.parent, MIN(sip.idx)
+    """, values, as_dict=True)
+
+    refs = []
+    if payment_entries:
+        refs = frappe.db.sql(f"""
+            SELECT
+                per.reference_name AS invoice,
+                per.allocated_amount AS amount,
+                per.advance_voucher_type,
+                per.advance_voucher_no,
+                pe.name AS payment_entry,
+                pe.mode_of_payment,
+                mop.type AS mode_type
+            FROM `tabPayment Entry Reference` per
+            JOIN `tabPayment Entry` pe ON pe.name = per.parent
+            JOIN `tabSales Invoice` si ON si.name = per.reference_name
+            LEFT JOIN `tabMode of Payment` mop ON mop.name = pe.mode_of_payment
+            WHERE
+                pe.docstatus = 1
+                AND per.reference_doctype = 'Sales Invoice'
+                AND {where}
+        """, values, as_dict=True)
+
+    pos_map = {}
+    for p in pos_payments:
+        pos_map.setdefault(p.invoice, []).append(p)
+
+    ref_map = {}
+    for r in refs:
+        ref_map.setdefault(r.invoice, []).append(r)
+
+    return invoices, pos_map, ref_map
+
+
+def stream_invoice_facts(conditions, values):
+    """
+    `get_invoice_facts` as a stream of `(invoice, pos_rows, ref_rows)`, one
+    invoice at a time in business date order.
+
+    The invoices, their Payment Entry references (with the warehouse of an
+    advance's Sales Order) and their POS payments come from one UNION ALL
+    query read through an unbuffered cursor as plain tuples, so only the
+    current invoice is held in Python. No other query can run on the
+    connection until the stream is consumed.
+    """
+    where = " AND ".join(["si.docstatus = 1", *conditions])
+
+    query = f"""
+        SELECT
+            si.business_date,
+            si.name AS invoice,
+            {STREAM_INVOICE} AS kind,
+            0 AS seq,
+            si.pos_profile,
+            si.sales_channel,
+            si.is_return,
+            si.grand_total,
+            IFNULL(si.change_amount, 0),
+            NULL, NULL, NULL, NULL, NULL, NULL, NULL
+        FROM `tabSales Invoice` si
+        WHERE {where}
+
+        UNION ALL
+
+        SELECT
+            si.business_date,
+            per.reference_name,
+            {STREAM_REFERENCE},
+            per.idx,
+            NULL, NULL, NULL, NULL, NULL,
+            pe.mode_of_payment,
+            mop.type,
+            per.allocated_amount,
+            per.advance_voucher_type,
+            per.advance_voucher_no,
+            pe.name,
+            so.set_warehouse
+        FROM `tabPayment Entry Reference` per
+        JOIN `tabPayment Entry` pe ON pe.name = per.parent
+        JOIN `tabSales Invoice` si ON si.name = per.reference_name
+        LEFT JOIN `tabMode of Payment` mop ON mop.name = pe.mode_of_payment
+        LEFT JOIN `tabSales Order` so
+            ON per.advance_voucher_type = 'Sales Order' AND so.name = per.advance_voucher_no
+        WHERE
+            pe.docstatus = 1
+            AND per.reference_doctype = 'Sales Invoice'
+            AND {where}
+
+        UNION ALL
+
+        SELECT
+            si.business_date,
+            sip.parent,
+            {STREAM_POS},
+            MIN(sip.idx),
+            NULL, NULL, NULL, NULL, NULL,
+            sip.mode_of_payment,
+            mop.type,
+            SUM(sip.amount),
+            NULL, NULL, NULL, NULL
+        FROM `tabSales Invoice Payment` sip
+        JOIN `tabSales Invoice` si ON si.name = sip.parent
+        LEFT JOIN `tabMode of Payment` mop ON mop.name = sip.mode_of_payment
+        WHERE
+            sip.parenttype = 'Sales Invoice'
+            AND sip.parentfield = 'payments'
+            AND {where}
+        GROUP BY si.business_date, sip.parent, sip.mode_of_payment, mop.type
+
+        ORDER BY business_date, invoice, kind, seq
+    """
+
+    with frappe.db.unbuffered_cursor():
+        for _key, invoice_rows in groupby(frappe.db.sql(query, values, as_iterator=True), key=itemgetter(0, 1)):
+            inv, pos_rows, ref_rows = None, [], []
+            for row in invoice_rows:
+                if row[2] == STREAM_INVOICE:
+                    inv = StreamInvoice(row[1], row[0], *row[4:9])
+                elif row[2] == STREAM_REFERENCE:
+                    ref_rows.append(StreamPayment(*row[9:]))
+                else:
+                    pos_rows.append(StreamPayment(*row[9:]))
+
+            if inv:
+                yield inv, pos_rows, ref_rows
+
+
+def get_sales_order_advances(conditions, values):
+    """
+    Sales Order advances received through Payment Entry, one row per
+    Payment Entry × Sales Order. `conditions` use the `pe` / `so` aliases.
+    """
+    where = " AND ".join([
+        "pe.docstatus = 1",
+        "pe.payment_type = 'Receive'",
+        "per.reference_doctype = 'Sales Order'",
+        *conditions,
+    ])
+
+    return frappe.db.sql(f"""
+        SELECT
+            pe.name AS payment_entry,
+            per.reference_name AS sales_order,
+            SUM(per.allocated_amount) AS amount,
+            pe.mode_of_payment,
+            mop.type AS mode_type,
+            pe.business_date,
+            so.customer,
+            so.set_warehouse AS warehouse
+        FROM `tabPayment Entry` pe
+        JOIN `tabPayment Entry Reference` per ON per.parent = pe.name
+        JOIN `tabSales Order` so ON so.name = per.reference_name
+        LEFT JOIN `tabMode of Payment` mop ON mop.name = pe.mode_of_payment
+        WHERE {where}
+        GROUP BY pe.name, per.reference_name, pe.mode_of_payment, mop.type,
+            pe.business_date, so.customer, so.set_warehouse
+    """, values, as_dict=True)
+
+
+# -------------------------------------------------
+# CLASSIFY
+# -------------------------------------------------
+def get_entries(facts, classify):
+    """Run a report's `classify(invoice, pos_rows, ref_rows)` over every invoice."""
+    invoices, pos_map, ref_map = facts
+
+    entries = []
+    for inv in invoices:
+        entries.extend(classify(inv, pos_map.get(inv.name, []), ref_map.get(inv.name, [])))
+
+    return entries
+
+
+def split_pos_payments(inv, pos_rows, is_cash):
+    """
+    Net POS payments per mode of payment.
+
+    The invoice change is handed back in cash, so it is deducted once, from
+    the first cash mode, and never for returns.
+    """
+    change = 0 if inv.is_return else inv.change_amount
+    amounts = {}
+
+    for p in pos_rows:
+        amount = p.amount or 0
+        if change and is_cash(p):
+            amount -= change
+            change = 0
+        amounts[p.mode_of_payment] = amounts.get(p.mode_of_payment, 0) + amount
+
+    return amounts
+
+
+def sum_by_mode(rows):
+    amounts = {}
+    for r in rows:
+        amounts[r.mode_of_payment] = amounts.get(r.mode_of_payment, 0) + (r.amount or 0)
+    return amounts
+
+
+def get_payment_facts(inv, pos_rows, ref_rows, is_valid_advance):
+    """
+    Net settlement of one invoice, one fact per source × mode of payment.
+
+    Sources are "Advance" (Payment Entry allocated from a Sales Order advance
+    that `is_valid_advance` accepts), "Payment Entry", "POS" and "Credit" for
+    the unpaid balance. Cash (Mode of Payment type Cash) is netted of the
+    change once, POS cash first; returns are signed negative.
+    """
+    if inv.is_return:
+        multiplier = -1 if inv.grand_total > 0 else 1
+    else:
+        multiplier = 1
+
+    facts = []
+    advance_total = 0
+    cash = []
+    other = {}
+
+    # ---- PAYMENT ENTRY ----
+    for r in ref_rows:
+        if r.advance_voucher_type == "Sales Order" and is_valid_advance(r):
+            facts.append(make_fact("Advance", r, r.amount * multiplier, sales_order=r.advance_voucher_no))
+            advance_total += r.amount
+        elif r.mode_type == "Cash":
+            cash.append(["Payment Entry", r, r.amount])
+        else:
+            other.setdefault(("Payment Entry", r.mode_of_payment), [r, 0])[1] += r.amount
+
+    # ---- POS PAYMENTS ----
+    for p in pos_rows:
+        if p.mode_type == "Cash":
+            cash.append(["POS", p, p.amount])
+        else:
+            other.setdefault(("POS", p.mode_of_payment), [p, 0])[1] += p.amount
+
+    # ---- APPLY CHANGE (ONCE, CASH ONLY, NOT FOR RETURNS) ----
+    cash.sort(key=lambda c: c[0] != "POS")
+    cash_paid = sum(c[2] for c in cash)
+    if not inv.is_return and cash_paid > 0 and inv.change_amount:
+        change = inv.change_amount
+        for c in cash:
+            deduct = min(change, max(c[2], 0))
+            c[2] -= deduct
+            change -= deduct
+        cash_paid = max(cash_paid - inv.change_amount, 0)
+
+    if cash_paid > 0:
+        for source, row, amount in cash:
+            if amount:
+                facts.append(make_fact(source, row, amount * multiplier))
+
+    # ---- OTHER MODES (emitted when the mode nets positive) ----
+    mode_totals = {}
+    for (source, mode), (row, amount) in other.items():
+        mode_totals[mode] = mode_totals.get(mode, 0) + amount
+
+    for (source, mode), (row, amount) in other.items():
+        if mode_totals[mode] > 0:
+            facts.append(make_fact(source, row, amount * multiplier))
+
+    # ---- CREDIT ----
+    balance = inv.grand_total - advance_total - cash_paid - sum(mode_totals.values())
+    if balance > 0:
+        facts.append(frappe._dict(
+            source="Credit", mode_of_payment=None, tender=None, amount=balance * multiplier,
+            payment_entry=None, sales_order=None,
+        ))
+
+    return facts
+
+
+def make_fact(source, row, amount, sales_order=None):
+    return frappe._dict(
+        source=source,
+        mode_of_payment=row.mode_of_payment,
+        tender="Cash" if row.mode_type == "Cash" else "Card",
+        amount=amount,
+        payment_entry=getattr(row, "payment_entry", None),
+        sales_order=sales_order,
+    )
+
+
+def make_entry(parent, inv, amount, sales_type, tender):
+    """
+    One child contribution of an invoice to a parent row.
+
+    `tender` is "cash", "card" or None and feeds the Counter + Home totals.
+    """
+    return {
+        "parent": parent,
+        "name": inv.name,
+        "invoice": inv.name,
+        "amount": amount,
+        "sales_type": sales_type,
+        "tender": tender,
+    }
+
+
+# -------------------------------------------------
+# TREE
+# -------------------------------------------------
+def build_tree(entries, color_parent_name=None, sort_key=None):
+    """
+    Group entries into parent rows followed by their invoice children.
+
+    Returns `(data, totals)` where totals carries the grand total and the
+    Counter + Home cash / card totals used by the summary rows.
+    """
+    parents = {}
+    for e in entries:
+        parents.setdefault(e["parent"], []).append(e)
+
+    data = []
+    totals = frappe._dict(grand_total=0, total_cash=0, total_card=0)
+
+    for parent in sorted(parents, key=sort_key or str.casefold):
+        items = parents[parent]
+        amt = sum(i["amount"] or 0 for i in items)
+
+        data.append({
+            "name": color_parent_name(parent) if color_parent_name else parent,
+            "parent": None,
+            "amount": amt,
+            "indent": 0,
+        })
+
+        totals.grand_total += amt
+
+        first = items[0]
+        if first["sales_type"] in ("Counter Sales", "Home Sales"):
+            if first["tender"] == "cash":
+                totals.total_cash += amt
+            elif first["tender"] == "card":
+                totals.total_card += amt
+
+        for i in items:
+            if not i["amount"]:
+                continue
+
+            data.append({
+                "name": i["name"],
+                "invoice": i.get("invoice"),
+                "parent": parent,
+                "amount": i["amount"],
+                "indent": 1,
+            })
+
+    return data, totals
+
+
+def get_summary_rows(totals):
+    vat_amount = round(totals.grand_total * 0.15 / 1.15, 2)
+    total_wo_vat = round(totals.grand_total - vat_amount, 2)
+
+    return [
+        {"name": "<b>Total Cash (Counter + Home)</b>", "amount": totals.total_cash, "indent": 0},
+        {"name": "<b>Total Card (Counter + Home)</b>", "amount": totals.total_card, "indent": 0},
+        {"name": "<b>Total W/O VAT</b>", "amount": total_wo_vat, "indent": 0},
+        {"name": "<b>Total VAT (15%)</b>", "amount": vat_amount, "indent": 0},
+        {"name": "<b style='font-size:14px'>TOTAL</b>", "amount": totals.grand_total, "indent": 0},
+    ]
@@ -0,0 +1,186 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+ESC/POS rendering of the 80mm DCR slip.
+
+Turns the summary of DCR-Report / New DCR-Report for one branch and business
+day into the byte stream a thermal printer takes directly, the same slip as
+the report's HTML print format without a browser or PDF step. The logo is
+rasterized once and kept in Redis; the rendered slip is cached per
+(report, branch, business day, data version), so a reprint after closing is
+one cache hit and a late submit or cancel renders a fresh one.
+"""
+
+import base64
+import io
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, formatdate, getdate, strip_html
+from PIL import Image
+
+from steelforce_custom.steelforce_custom.dcr.cache import (
+    CACHE_PREFIX,
+    DEFAULT_TTL,
+    get_data_version,
+)
+from steelforce_custom.steelforce_custom.dcr.engine import get_report_module
+
+
+SLIP_REPORTS = ("DCR-Report", "New DCR-Report")
+LOGO_CACHE_PREFIX = "dcr_slip_logo"
+DEFAULT_LOGO = "/files/logo_Final_page-0001.jpg"
+
+# 80mm paper, font A: 48 characters and 576 dots a line; the logo keeps the
+# print format's 45mm x 18mm box at 8 dots/mm
+LINE_WIDTH = 48
+LOGO_SIZE = (360, 144)
+
+ESC = b"\x1b"
+GS = b"\x1d"
+INIT = ESC + b"@"
+ALIGN_LEFT = ESC + b"a\x00"
+ALIGN_CENTER = ESC + b"a\x01"
+BOLD_ON = ESC + b"E\x01"
+BOLD_OFF = ESC + b"E\x00"
+DOUBLE_HEIGHT = GS + b"!\x01"
+NORMAL_SIZE = GS + b"!\x00"
+FEED_AND_CUT = ESC + b"d\x04" + GS + b"V\x42\x00"
+
+
+@frappe.whitelist()
+def download_slip(report_name, pos_profile, business_date):
+    slip = get_slip(report_name, pos_profile, business_date)
+
+    frappe.response.filename = f"DCR-{pos_profile}-{getdate(business_date)}.bin"
+    frappe.response.filecontent = slip
+    frappe.response.type = "download"
+
+
+@frappe.whitelist()
+def get_raw_slip(report_name, pos_profile, business_date):
+    """The slip base64 encoded, for raw printing (e.g. QZ Tray) from the browser."""
+    return base64.b64encode(get_slip(report_name, pos_profile, business_date)).decode()
+
+
+def get_slip(report_name, pos_profile, business_date):
+    if report_name not in SLIP_REPORTS:
+        frappe.throw(_("{0} has no ESC/POS slip").format(report_name))
+
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("You don't have access to Report: {0}").format(report_name), frappe.PermissionError)
+
+    business_date = getdate(business_date)
+    key = "::".join((
+        CACHE_PREFIX, "slip", report_name, pos_profile, str(business_date),
+        get_data_version(pos_profile, business_date),
+    ))
+
+    slip = frappe.cache.get_value(key)
+    if slip is None:
+        filters = frappe._dict(from_date=business_date, to_date=business_date, pos_profile=pos_profile)
+        _columns, data = get_report_module(report_name).execute(filters)[:2]
+
+        slip = render_slip(filters, data)
+        ttl = cint(frappe.conf.get("dcr_report_cache_ttl")) or DEFAULT_TTL
+        frappe.cache.set_value(key, slip, expires_in_sec=ttl)
+
+    return slip
+
+
+# -------------------------------------------------
+# RENDER
+# -------------------------------------------------
+def render_slip(filters, data):
+    rows = [dict(row, name=strip_html(row.get("name") or "").strip()) for row in data]
+    totals = get_slip_totals(rows)
+
+    out = [INIT, ALIGN_CENTER, get_logo_raster()]
+    out += [BOLD_ON, DOUBLE_HEIGHT, text_line("POS SALES SUMMARY"), NORMAL_SIZE]
+    out.append(text_line(f"Branch : {filters.pos_profile}"))
+    out.append(text_line(f"{formatdate(filters.from_date)} TO {formatdate(filters.to_date)}"))
+
+    out += [ALIGN_LEFT, text_line("=" * LINE_WIDTH)]
+    out.append(amount_line("Total Sales (With VAT)", totals.total_sales))
+    out.append(amount_line("Total Cash", totals.total_cash))
+    out.append(amount_line("Total Card", totals.total_card))
+    out += [text_line("=" * LINE_WIDTH), amount_line("Sales Mode", "Amt"), BOLD_OFF]
+
+    # parent rows and the summary; invoice children stay on the screen report
+    parents = [r for r in rows if not r.get("indent") and not is_summary_row(r)]
+    summary = [r for r in rows if not r.get("indent") and is_summary_row(r)]
+
+    for row in parents:
+        out += [text_line("-" * LINE_WIDTH), amount_line(row["name"], row.get("amount"))]
+
+    out += [text_line("=" * LINE_WIDTH), BOLD_ON]
+    out += [amount_line(row["name"], row.get("amount")) for row in summary]
+    out.append(BOLD_OFF)
+
+    out.append(FEED_AND_CUT)
+    return b"".join(out)
+
+
+def is_summary_row(row):
+    return row["name"].upper().startswith("TOTAL")
+
+
+def get_slip_totals(rows):
+    """The top summary of the print format, read from the summary rows."""
+    totals = frappe._dict(total_sales=0, total_cash=0, total_card=0)
+    for row in rows:
+        if row["name"] == "TOTAL":
+            totals.total_sales = row.get("amount")
+        elif row["name"].startswith("Total Cash"):
+            totals.total_cash = row.get("amount")
+        elif row["name"].startswith("Total Card"):
+            totals.total_card = row.get("amount")
+
+    return totals
+
+
+def amount_line(label, amount):
+    amount = amount if isinstance(amount, str) else f"{flt(amount):.2f}"
+    label = label[:LINE_WIDTH - len(amount) - 1]
+    return text_line(f"{label}{amount:>{LINE_WIDTH - len(label)}}")
+
+
+def text_line(text):
+    return text.encode("cp437", "replace") + b"\n"
+
+
+# -------------------------------------------------
+# LOGO
+# -------------------------------------------------
+def get_logo_raster():
+    logo = frappe.conf.get("dcr_slip_logo") or DEFAULT_LOGO
+    return frappe.cache.get_value(f"{LOGO_CACHE_PREFIX}::{logo}", lambda: make_logo_raster(logo))
+
+
+def make_logo_raster(file_url):
+    """`GS v 0` raster of the logo; empty when the file is missing."""
+    file_name = frappe.db.get_value("File", {"file_url": file_url}, "name")
+    if not file_name:
+        return b""
+
+    image = Image.open(io.BytesIO(frappe.get_doc("File", file_name).get_content()))
+    image = image.convert("RGBA")
+    image.thumbnail(LOGO_SIZE)
+
+    # transparent areas print white; width padded to whole bytes with white too
+    canvas = Image.new("RGBA", ((image.width + 7) // 8 * 8, image.height), "white")
+    canvas.alpha_composite(image)
+    bitmap = canvas.convert("L").convert("1")
+
+    # mode "1" packs white as 1, the printer burns 1
+    data = bytes(b ^ 0xFF for b in bitmap.tobytes())
+    width_bytes = bitmap.width // 8
+
+    return (
+        GS + b"v0\x00"
+        + width_bytes.to_bytes(2, "little")
+        + bitmap.height.to_bytes(2, "little")
+        + data
+        + b"\n"
+    )
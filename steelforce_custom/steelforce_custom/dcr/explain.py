@@ -0,0 +1,118 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Query plan check for the DCR reports.
+
+Runs every DCR report once, EXPLAINs each SELECT it issued and fails if any
+of them reads a transaction table with a full table or full index scan.
+`test_explain` runs it in the test suite against data from `dcr.generator`;
+on a site filled with generated data it can also be run directly, e.g.
+
+    bench --site test.local execute \\
+        steelforce_custom.steelforce_custom.dcr.explain.check_query_plans
+"""
+
+import inspect
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import add_days, getdate
+
+from steelforce_custom.steelforce_custom.dcr.engine import DCR_REPORTS, get_report_module
+
+
+# master tables small enough that a scan is the right plan
+SCAN_ALLOWED = (
+    "mop",
+    "mop_doc",
+    "mop_map",
+    "tabMode of Payment",
+    "tabPOS Profile",
+    "tabSingles",
+)
+
+# EXPLAIN access types that read every row: a table scan, a full index scan
+FULL_SCAN_TYPES = ("ALL", "index")
+
+
+@contextmanager
+def capture_queries():
+    """Record every `frappe.db.sql` call made inside the block, with its time and row count."""
+    queries = []
+    sql = frappe.db.sql
+
+    def recorder(query, values=(), *args, **kwargs):
+        start = time.perf_counter()
+        result = sql(query, values, *args, **kwargs)
+        queries.append(frappe._dict(
+            query=query,
+            values=values,
+            seconds=time.perf_counter() - start,
+            rows=len(result) if isinstance(result, (list, tuple)) else None,
+        ))
+        return result
+
+    frappe.db.sql = recorder
+    try:
+        yield queries
+    finally:
+        frappe.db.sql = sql
+
+
+def get_uncached_execute(report_name):
+    """The report's execute without the result cache, a cache hit issues no queries."""
+    return inspect.unwrap(get_report_module(report_name).execute)
+
+
+def explain(query, values=()):
+    return frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+
+
+def get_full_scans(query, values=()):
+    """EXPLAIN rows reading a whole table, or the whole of one of its indexes."""
+    if not query.lstrip().upper().startswith("SELECT"):
+        return []
+
+    return [
+        row for row in explain(query, values)
+        if row.type in FULL_SCAN_TYPES
+        and not (row.table or "").startswith("<")
+        and row.table not in SCAN_ALLOWED
+    ]
+
+
+def check_query_plans(filters=None, reports=DCR_REPORTS):
+    failures = get_plan_failures(filters, reports)
+    if failures:
+        frappe.throw("<br>".join(failures), title="DCR query plan check failed")
+
+    print(f"DCR query plans OK for {', '.join(reports)}")
+
+
+def get_plan_failures(filters=None, reports=DCR_REPORTS):
+    """One message per full scan the reports' queries plan."""
+    filters = filters or get_default_filters()
+    failures = []
+
+    for report_name in reports:
+        with capture_queries() as queries:
+            get_uncached_execute(report_name)(frappe._dict(filters))
+
+        for q in queries:
+            for row in get_full_scans(q.query, q.values):
+                failures.append(f"{report_name}: full {row.type} scan of {row.table} ({row.rows} rows)")
+
+    return failures
+
+
+def get_default_filters():
+    to_date = frappe.db.sql("SELECT MAX(business_date) FROM `tabSales Invoice` WHERE docstatus = 1")[0][0]
+    to_date = getdate(to_date)
+
+    return {
+        "from_date": add_days(to_date, -6),
+        "to_date": to_date,
+        "pos_profile": frappe.db.get_value("POS Profile", {}, "name"),
+    }
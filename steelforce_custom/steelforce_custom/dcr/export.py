@@ -0,0 +1,104 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Streaming export of the row-level DCR-Accounts reports.
+
+The report's `get_query(filters)` is read through an unbuffered server-side
+cursor and every row is written straight to a CSV or write-only XLSX file
+in the private files folder, so memory stays flat whatever the date range.
+The export runs in the background and the file link is sent to the user
+when it is ready.
+"""
+
+import csv
+
+import frappe
+from frappe import _
+from frappe.utils import cstr
+from openpyxl import Workbook
+
+from steelforce_custom.steelforce_custom.dcr.engine import get_report_module
+from steelforce_custom.steelforce_custom.dcr.replica import replica_reads
+
+
+EXPORT_REPORTS = ("DCR-Accounts", "DCR-Accounts Report")
+FILE_FORMATS = ("CSV", "Excel")
+
+
+@frappe.whitelist()
+def start_export(report_name, filters, file_format="CSV"):
+    if report_name not in EXPORT_REPORTS:
+        frappe.throw(_("{0} has no streaming export").format(report_name))
+
+    if file_format not in FILE_FORMATS:
+        frappe.throw(_("File format must be one of {0}").format(", ".join(FILE_FORMATS)))
+
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("You don't have access to Report: {0}").format(report_name), frappe.PermissionError)
+
+    frappe.enqueue(
+        "steelforce_custom.steelforce_custom.dcr.export.export_report",
+        queue="long",
+        timeout=3600,
+        report_name=report_name,
+        filters=frappe.parse_json(filters),
+        file_format=file_format,
+        user=frappe.session.user,
+    )
+
+
+def export_report(report_name, filters, file_format="CSV", user=None):
+    """Write the report rows to a private File; returns its URL."""
+    module = get_report_module(report_name)
+    columns = module.get_columns()
+    query, values = module.get_query(frappe._dict(filters))
+
+    extension = "xlsx" if file_format == "Excel" else "csv"
+    file_name = f"{frappe.scrub(report_name)}-{frappe.generate_hash(length=8)}.{extension}"
+    path = frappe.get_site_path("private", "files", file_name)
+
+    with replica_reads(), frappe.db.unbuffered_cursor():
+        rows = frappe.db.sql(query, values, as_dict=True, as_iterator=True)
+        if file_format == "Excel":
+            write_xlsx(path, report_name, columns, rows)
+        else:
+            write_csv(path, columns, rows)
+
+    file_doc = frappe.get_doc({
+        "doctype": "File",
+        "file_name": file_name,
+        "file_url": f"/private/files/{file_name}",
+        "is_private": 1,
+    }).insert(ignore_permissions=True)
+
+    if user:
+        frappe.publish_realtime(
+            "dcr_export_ready",
+            {"report_name": report_name, "file_url": file_doc.file_url},
+            user=user,
+        )
+
+    return file_doc.file_url
+
+
+def write_csv(path, columns, rows):
+    fieldnames = [c["fieldname"] for c in columns]
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([c["label"] for c in columns])
+        for row in rows:
+            writer.writerow([cstr(row.get(fieldname)) for fieldname in fieldnames])
+
+
+def write_xlsx(path, sheet_name, columns, rows):
+    fieldnames = [c["fieldname"] for c in columns]
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name[:31])
+    ws.append([c["label"] for c in columns])
+    for row in rows:
+        ws.append([row.get(fieldname) for fieldname in fieldnames])
+
+    wb.save(path)
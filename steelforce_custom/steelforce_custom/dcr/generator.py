@@ -0,0 +1,294 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Synthetic DCR data for benchmark sites.
+
+Fills a test site with submitted Sales Invoices (mixed POS payments with
+change, returns, aggregator / walk-in / home customers), Payment Entries
+settling credit invoices and Sales Order advances, written with bulk SQL
+inserts in chunks so millions of invoices load in minutes. Only runs on
+sites with `allow_tests` set, e.g.
+
+    bench --site test.local execute \\
+        steelforce_custom.steelforce_custom.dcr.generator.generate \\
+        --kwargs "{'invoices': 100000, 'branches': 5, 'days': 90}"
+"""
+
+import random
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, getdate, now, nowdate
+
+from steelforce_custom.steelforce_custom.dcr.advance_ledger import rebuild_advance_ledger
+from steelforce_custom.steelforce_custom.dcr.business_date import get_business_date
+from steelforce_custom.steelforce_custom.dcr.cache import clear_report_cache
+from steelforce_custom.steelforce_custom.dcr.sales_channel import (
+    COUNTER_SALES,
+    HOME_SALES,
+    ONLINE_CUSTOMERS,
+    ONLINE_SALES,
+    WALK_IN_CUSTOMER,
+)
+
+
+CHUNK_SIZE = 5000
+PREFIX = "BENCH"
+HOME_CUSTOMERS = 200
+
+# share of invoices per channel, and of walk-in invoices paid cash / card / split
+CHANNEL_MIX = ((COUNTER_SALES, 0.6), (ONLINE_SALES, 0.15), (HOME_SALES, 0.25))
+TENDER_MIX = (("cash", 0.6), ("card", 0.3), ("split", 0.1))
+
+SI_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "company", "currency",
+    "customer", "customer_name", "sales_channel", "pos_profile", "set_warehouse", "is_pos",
+    "is_return", "posting_date", "posting_time", "business_date", "total", "net_total",
+    "grand_total", "rounded_total", "paid_amount", "change_amount", "outstanding_amount",
+)
+SIP_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "parent", "parenttype",
+    "parentfield", "idx", "mode_of_payment", "amount", "base_amount",
+)
+SO_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "company", "currency",
+    "customer", "customer_name", "transaction_date", "delivery_date", "set_warehouse", "grand_total",
+)
+PE_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "company",
+    "payment_type", "party_type", "party", "posting_date", "business_date", "mode_of_payment",
+    "paid_amount", "received_amount",
+)
+PER_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "parent", "parenttype",
+    "parentfield", "idx", "reference_doctype", "reference_name", "allocated_amount",
+    "advance_voucher_type", "advance_voucher_no",
+)
+
+
+def generate(
+    invoices=10000,
+    branches=3,
+    days=31,
+    to_date=None,
+    return_ratio=0.02,
+    payment_entry_ratio=0.3,
+    advance_ratio=0.1,
+    seed=42,
+):
+    """
+    Insert `invoices` invoices spread over `branches` branches and the `days`
+    days up to `to_date`. `payment_entry_ratio` / `advance_ratio` are the
+    shares of home credit invoices settled by a Payment Entry / by a Sales
+    Order advance (a fifth of the advances stay unallocated).
+    """
+    if not frappe.conf.get("allow_tests"):
+        frappe.throw(_("The DCR data generator only runs on sites with allow_tests enabled"))
+
+    rng = random.Random(seed)
+    company = frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {}, "name")
+    ctx = frappe._dict(
+        rng=rng,
+        company=company,
+        currency=frappe.get_cached_value("Company", company, "default_currency"),
+        stamp=now(),
+        user=frappe.session.user,
+        run=frappe.generate_hash(length=6).upper(),
+        to_date=getdate(to_date or nowdate()),
+        days=int(days),
+    )
+
+    ctx.branches = make_branches(ctx, int(branches))
+    ctx.home_customers = make_customers()
+
+    for start in range(0, int(invoices), CHUNK_SIZE):
+        count = min(CHUNK_SIZE, int(invoices) - start)
+        insert_chunk(ctx, start, count, flt(return_ratio), flt(payment_entry_ratio), flt(advance_ratio))
+        frappe.db.commit()
+        print(f"DCR generator: {start + count} / {invoices} invoices")
+
+    # bulk inserts skip doc events (the advance ledger is rebuilt per chunk),
+    # drop results cached before the load
+    clear_report_cache()
+
+
+# -------------------------------------------------
+# MASTERS
+# -------------------------------------------------
+def make_branches(ctx, count):
+    abbr = frappe.get_cached_value("Company", ctx.company, "abbr")
+    branches = []
+
+    for i in range(1, count + 1):
+        name = f"{PREFIX} Branch {i}"
+        warehouse = f"{name} - {abbr}"
+        if not frappe.db.exists("Warehouse", warehouse):
+            frappe.get_doc({"doctype": "Warehouse", "warehouse_name": name, "company": ctx.company}).insert()
+
+        cash, card = f"Cash-{PREFIX}{i}", f"Card-{PREFIX}{i}"
+        for mode, mode_type, category in ((cash, "Cash", "Cash"), (card, "Bank", "Card")):
+            if not frappe.db.exists("Mode of Payment", mode):
+                frappe.get_doc({"doctype": "Mode of Payment", "mode_of_payment": mode, "type": mode_type}).insert()
+            if not frappe.db.exists("DCR Mode of Payment Map", {"mode_of_payment": mode}):
+                frappe.get_doc({
+                    "doctype": "DCR Mode of Payment Map",
+                    "mode_of_payment": mode,
+                    "pos_profile": None,
+                    "category": category,
+                }).insert()
+
+        # POS Profile validation needs accounts a benchmark does not care about
+        if not frappe.db.exists("POS Profile", name):
+            frappe.db.bulk_insert(
+                "POS Profile",
+                ("name", "creation", "modified", "owner", "modified_by", "company", "currency",
+                 "warehouse", "business_day_cutoff"),
+                [(name, ctx.stamp, ctx.stamp, ctx.user, ctx.user, ctx.company, ctx.currency,
+                  warehouse, "04:00:00")],
+            )
+
+        branches.append(frappe._dict(pos_profile=name, warehouse=warehouse, cash=cash, card=card))
+
+    return branches
+
+
+def make_customers():
+    channels = {customer: ONLINE_SALES for customer in ONLINE_CUSTOMERS}
+    channels[WALK_IN_CUSTOMER] = COUNTER_SALES
+
+    home_customers = [f"{PREFIX} Customer {i}" for i in range(1, HOME_CUSTOMERS + 1)]
+    channels.update({customer: HOME_SALES for customer in home_customers})
+
+    for customer, channel in channels.items():
+        if not frappe.db.exists("Customer", customer):
+            frappe.get_doc({
+                "doctype": "Customer",
+                "customer_name": customer,
+                "customer_type": "Company" if channel == ONLINE_SALES else "Individual",
+                "sales_channel": channel,
+            }).insert()
+
+    return home_customers
+
+
+# -------------------------------------------------
+# TRANSACTIONS
+# -------------------------------------------------
+def insert_chunk(ctx, start, count, return_ratio, payment_entry_ratio, advance_ratio):
+    rows = frappe._dict(si=[], sip=[], so=[], pe=[], per=[])
+
+    for n in range(start, start + count):
+        make_invoice(ctx, rows, n, return_ratio, payment_entry_ratio, advance_ratio)
+
+    frappe.db.bulk_insert("Sales Invoice", SI_FIELDS, rows.si)
+    frappe.db.bulk_insert("Sales Invoice Payment", SIP_FIELDS, rows.sip)
+    frappe.db.bulk_insert("Sales Order", SO_FIELDS, rows.so)
+    frappe.db.bulk_insert("Payment Entry", PE_FIELDS, rows.pe)
+    frappe.db.bulk_insert("Payment Entry Reference", PER_FIELDS, rows.per)
+
+    if rows.pe:
+        rebuild_advance_ledger([pe[0] for pe in rows.pe])
+
+
+def make_invoice(ctx, rows, n, return_ratio, payment_entry_ratio, advance_ratio):
+    rng = ctx.rng
+    branch = rng.choice(ctx.branches)
+    channel = pick(rng, CHANNEL_MIX)
+    customer = {
+        COUNTER_SALES: WALK_IN_CUSTOMER,
+        ONLINE_SALES: rng.choice(ONLINE_CUSTOMERS),
+        HOME_SALES: rng.choice(ctx.home_customers),
+    }[channel]
+
+    # business hours 08:00 to 02:00, the late hours belong to the previous day
+    posting_date = add_days(ctx.to_date, -rng.randrange(ctx.days))
+    minutes = (8 * 60 + rng.randrange(18 * 60)) % (24 * 60)
+    posting_time = f"{minutes // 60:02d}:{minutes % 60:02d}:{rng.randrange(60):02d}"
+    business_date = get_business_date(posting_date, posting_time, branch.pos_profile)
+
+    is_return = rng.random() < return_ratio
+    sign = -1 if is_return else 1
+    grand_total = sign * round(rng.uniform(5, 400), 2)
+
+    name = f"{PREFIX}-{ctx.run}-SINV-{n:07d}"
+    payments, change_amount = [], 0
+
+    if channel == COUNTER_SALES or is_return:
+        tender = "cash" if is_return else pick(rng, TENDER_MIX)
+        if tender == "cash":
+            change_amount = 0 if is_return else round(rng.choice((0, 0, 0.5, 1, 5, 10)), 2)
+            payments = [(branch.cash, grand_total + change_amount), (branch.card, 0)]
+        elif tender == "card":
+            payments = [(branch.cash, 0), (branch.card, grand_total)]
+        else:
+            card = round(grand_total * rng.uniform(0.2, 0.8), 2)
+            payments = [(branch.cash, round(grand_total - card, 2)), (branch.card, card)]
+
+    paid_amount = round(sum(amount for _mode, amount in payments), 2)
+    outstanding = 0 if payments or channel == ONLINE_SALES else grand_total
+
+    rows.si.append((
+        name, ctx.stamp, ctx.stamp, ctx.user, ctx.user, 1, ctx.company, ctx.currency,
+        customer, customer, channel, branch.pos_profile, branch.warehouse, 1,
+        int(is_return), posting_date, posting_time, business_date, grand_total, grand_total,
+        grand_total, grand_total, paid_amount, change_amount, outstanding,
+    ))
+
+    for idx, (mode, amount) in enumerate(payments, 1):
+        rows.sip.append((
+            f"{name}-P{idx}", ctx.stamp, ctx.stamp, ctx.user, ctx.user, 1, name, "Sales Invoice",
+            "payments", idx, mode, amount, amount,
+        ))
+
+    if not outstanding:
+        return
+
+    # home credit invoices: some settled by a Payment Entry, some by a Sales Order advance
+    settle = rng.random()
+    if settle < advance_ratio:
+        make_advance(ctx, rows, branch, customer, business_date, name, grand_total)
+    elif settle < advance_ratio + payment_entry_ratio:
+        make_payment_entry(
+            ctx, rows, f"{name}-PE", branch, customer, business_date,
+            [("Sales Invoice", name, grand_total, None, None)],
+        )
+
+
+def make_advance(ctx, rows, branch, customer, business_date, invoice, amount):
+    """A Sales Order paid in advance; most are then allocated to the invoice in the same entry."""
+    rng = ctx.rng
+    sales_order = f"{invoice}-SO"
+    order_date = add_days(business_date, -rng.randrange(3))
+
+    rows.so.append((
+        sales_order, ctx.stamp, ctx.stamp, ctx.user, ctx.user, 1, ctx.company, ctx.currency,
+        customer, customer, order_date, business_date, branch.warehouse, amount,
+    ))
+
+    refs = [("Sales Order", sales_order, amount, None, None)]
+    if rng.random() < 0.8:
+        refs.append(("Sales Invoice", invoice, amount, "Sales Order", sales_order))
+
+    make_payment_entry(ctx, rows, f"{invoice}-PE", branch, customer, order_date, refs)
+
+
+def make_payment_entry(ctx, rows, name, branch, customer, business_date, refs):
+    """`refs` are (reference_doctype, reference_name, allocated, advance_voucher_type, advance_voucher_no)."""
+    mode = branch.cash if ctx.rng.random() < 0.5 else branch.card
+    amount = sum(r[2] for r in refs if not r[3])
+
+    rows.pe.append((
+        name, ctx.stamp, ctx.stamp, ctx.user, ctx.user, 1, ctx.company, "Receive", "Customer",
+        customer, business_date, business_date, mode, amount, amount,
+    ))
+
+    for idx, ref in enumerate(refs, 1):
+        rows.per.append((
+            f"{name}-R{idx}", ctx.stamp, ctx.stamp, ctx.user, ctx.user, 1, name, "Payment Entry",
+            "references", idx, *ref,
+        ))
+
+
+def pick(rng, weighted):
+    return rng.choices([v for v, _w in weighted], weights=[w for _v, w in weighted])[0]
@@ -0,0 +1,76 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Mode of Payment categories for the DCR reports.
+
+`DCR Mode of Payment Map` says whether a mode of payment counts as Cash or
+Card, for one branch (POS Profile) or for all of them. Aggregator sales are
+credit invoices billed to the aggregator's customer with no POS payment, so
+the reports keep splitting them by customer, not by mode of payment. Python
+code reads the map from the cache; the SQL reports join the table once per
+invoice through `get_payment_pivot()`, so opening a branch is a new map row
+rather than another correlated subquery.
+"""
+
+import frappe
+
+from steelforce_custom.steelforce_custom.dcr.cache import clear_report_cache
+
+
+CACHE_KEY = "dcr_mode_of_payment_map"
+CASH = "Cash"
+CARD = "Card"
+
+
+def get_mode_of_payment_map():
+    """{(mode_of_payment, pos_profile or ""): category}"""
+    return frappe.cache.get_value(CACHE_KEY, build_mode_of_payment_map)
+
+
+def build_mode_of_payment_map():
+    return {
+        (row.mode_of_payment, row.pos_profile or ""): row.category
+        for row in frappe.get_all(
+            "DCR Mode of Payment Map", fields=["mode_of_payment", "pos_profile", "category"]
+        )
+    }
+
+
+def clear_mode_of_payment_map():
+    frappe.cache.delete_value(CACHE_KEY)
+    clear_report_cache()
+
+
+def get_category(mode_of_payment, pos_profile=None):
+    """Branch mapping first, then the all-branches one; None when unmapped."""
+    mop_map = get_mode_of_payment_map()
+    return mop_map.get((mode_of_payment, pos_profile or "")) or mop_map.get((mode_of_payment, ""))
+
+
+# -------------------------------------------------
+# SQL
+# -------------------------------------------------
+def get_payment_pivot(where_clause=""):
+    """
+    Derived table with one row per invoice that has a mapped POS payment:
+    `has_cash` / `has_tender` flags and the `card_amount` of the invoice's branch.
+
+    `where_clause` is the outer report's " AND ..." on `si`, so only the
+    payments of the invoices in range are read and aggregated.
+    """
+    return f"""
+        SELECT
+            sip.parent,
+            MAX(mop_map.category = '{CASH}') AS has_cash,
+            MAX(mop_map.category IN ('{CASH}', '{CARD}')) AS has_tender,
+            SUM(CASE WHEN mop_map.category = '{CARD}' THEN sip.amount ELSE 0 END) AS card_amount
+        FROM `tabSales Invoice` si
+        JOIN `tabSales Invoice Payment` sip ON sip.parent = si.name
+        JOIN `tabDCR Mode of Payment Map` mop_map
+            ON mop_map.mode_of_payment = sip.mode_of_payment
+            AND (mop_map.pos_profile = si.pos_profile OR IFNULL(mop_map.pos_profile, '') = '')
+        WHERE si.docstatus = 1
+        {where_clause}
+        GROUP BY sip.parent
+    """
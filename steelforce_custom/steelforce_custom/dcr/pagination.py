@@ -0,0 +1,118 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Paginated mode of the row-level DCR-Accounts reports.
+
+Rows come newest first on (posting_date, posting_time, name). A page ends
+with an opaque cursor holding the key of its last row, and the next page
+starts from an expanded keyset predicate on that key instead of an OFFSET,
+so every page costs the same. Totals for the whole range come from one
+aggregate query on the first page.
+"""
+
+import base64
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from steelforce_custom.steelforce_custom.dcr.engine import get_report_module
+from steelforce_custom.steelforce_custom.dcr.replica import replica_reads
+
+
+PAGINATED_REPORTS = ("DCR-Accounts", "DCR-Accounts Report")
+PAGE_LENGTH = 500
+MAX_PAGE_LENGTH = 5000
+
+# expanded rather than a row constructor, so MariaDB can range-scan it
+KEYSET_CONDITION = """(
+    si.posting_date < %(after_date)s
+    OR (si.posting_date = %(after_date)s AND si.posting_time < %(after_time)s)
+    OR (si.posting_date = %(after_date)s AND si.posting_time = %(after_time)s AND si.name < %(after_name)s)
+)"""
+
+
+@frappe.whitelist()
+def get_page(report_name, filters, cursor=None, page_length=PAGE_LENGTH):
+    """
+    One page of rows and the cursor of the next one (None on the last page).
+
+    The first page (no cursor) also returns the columns and the range totals
+    as report summary cards.
+    """
+    if report_name not in PAGINATED_REPORTS:
+        frappe.throw(_("{0} has no paginated mode").format(report_name))
+
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("You don't have access to Report: {0}").format(report_name), frappe.PermissionError)
+
+    module = get_report_module(report_name)
+    filters = frappe._dict(frappe.parse_json(filters))
+    page_length = min(cint(page_length) or PAGE_LENGTH, MAX_PAGE_LENGTH)
+
+    with replica_reads():
+        # one extra row tells whether another page follows
+        query, values = module.get_query(filters, cursor=cursor, page_length=page_length + 1)
+        rows = frappe.db.sql(query, values, as_dict=True)
+
+        page = {"result": rows[:page_length], "cursor": None}
+        if len(rows) > page_length:
+            page["cursor"] = encode_cursor(rows[page_length - 1])
+
+        if not cursor:
+            columns = module.get_columns()
+            page["columns"] = columns
+            page["report_summary"] = get_report_summary(columns, get_totals(module, filters, columns))
+
+    return page
+
+
+def get_keyset_condition(cursor, values):
+    """Condition for the rows after `cursor`; its key is added to `values`."""
+    values.update(decode_cursor(cursor))
+    return KEYSET_CONDITION
+
+
+def encode_cursor(row):
+    key = [str(row.posting_date), str(row.posting_time), row.invoice]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        after_date, after_time, after_name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        frappe.throw(_("Invalid page cursor"))
+
+    return {"after_date": after_date, "after_time": after_time, "after_name": after_name}
+
+
+# -------------------------------------------------
+# TOTALS
+# -------------------------------------------------
+def get_totals(module, filters, columns):
+    """Sums of every currency column over the whole range, in one aggregate query."""
+    query, values = module.get_query(filters)
+    sums = ", ".join(
+        f"SUM(t.{c['fieldname']}) AS {c['fieldname']}" for c in columns if c["fieldtype"] == "Currency"
+    )
+
+    return frappe.db.sql(f"""
+        SELECT COUNT(*) AS invoices, {sums}
+        FROM ({query}) t
+    """, values, as_dict=True)[0]
+
+
+def get_report_summary(columns, totals):
+    summary = [{"value": cint(totals.invoices), "label": _("Invoices"), "datatype": "Int"}]
+    for c in columns:
+        if c["fieldtype"] == "Currency" and flt(totals.get(c["fieldname"])):
+            summary.append({
+                "value": flt(totals.get(c["fieldname"])),
+                "label": _(c["label"]),
+                "datatype": "Currency",
+            })
+
+    return summary
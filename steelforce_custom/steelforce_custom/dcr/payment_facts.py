@@ -0,0 +1,259 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+DCR Payment Fact maintenance.
+
+Submitting or cancelling a Sales Invoice or Payment Entry only queues the
+affected vouchers in Redis, once its transaction commits. One deduplicated
+background job drains the queue in batches and rewrites their facts with one
+DELETE and one bulk INSERT per batch, so an offline POS burst of thousands of
+invoices costs a handful of writes instead of thousands. A batch is claimed
+with SPOP, so concurrent drains never share a voucher, and goes back to the
+queue if it fails before its commit.
+"""
+
+from functools import partial
+
+import frappe
+from frappe.utils import now
+
+from steelforce_custom.steelforce_custom.dcr.engine import (
+    get_invoice_facts,
+    get_payment_facts,
+    get_sales_order_advances,
+    make_fact,
+)
+from steelforce_custom.steelforce_custom.dcr.sales_channel import get_sales_channel
+
+
+QUEUE_KEY = "dcr_payment_fact_queue"
+BATCH_SIZE = 500
+
+FACT_FIELDS = (
+    "invoice",
+    "payment_entry",
+    "sales_order",
+    "source",
+    "mode_of_payment",
+    "tender",
+    "pos_profile",
+    "warehouse",
+    "channel",
+    "business_date",
+    "is_return",
+    "amount",
+)
+
+
+# -------------------------------------------------
+# DOC EVENTS
+# -------------------------------------------------
+def queue_payment_facts(doc, method=None):
+    vouchers = [f"{doc.doctype}::{doc.name}"]
+
+    if doc.doctype == "Payment Entry":
+        vouchers += [
+            f"Sales Invoice::{ref.reference_name}"
+            for ref in doc.references
+            if ref.reference_doctype == "Sales Invoice"
+        ]
+
+    queue_vouchers(vouchers)
+
+
+def queue_vouchers(vouchers):
+    """Queue `Doctype::name` vouchers for a fact rebuild once the transaction commits."""
+    # a drain before the commit would read the pre-submit state
+    frappe.db.after_commit.add(partial(frappe.cache.sadd, QUEUE_KEY, *vouchers))
+    frappe.enqueue(
+        "steelforce_custom.steelforce_custom.dcr.payment_facts.sync_payment_facts",
+        queue="short",
+        job_id="dcr_payment_facts",
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+
+
+# -------------------------------------------------
+# BACKGROUND SYNC
+# -------------------------------------------------
+def sync_payment_facts():
+    """Drain the voucher queue; also scheduled as a safety net."""
+    while True:
+        members = claim_queued_vouchers(BATCH_SIZE)
+        if not members:
+            break
+
+        vouchers = [m.split("::", 1) for m in members]
+        invoices = [name for doctype, name in vouchers if doctype == "Sales Invoice"]
+        payment_entries = [name for doctype, name in vouchers if doctype == "Payment Entry"]
+
+        try:
+            if invoices:
+                rebuild_invoice_facts(invoices)
+            if payment_entries:
+                rebuild_advance_facts(payment_entries)
+
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            # back in the queue for the next drain
+            frappe.cache.sadd(QUEUE_KEY, *members)
+            raise
+
+
+def claim_queued_vouchers(count):
+    """Take up to `count` vouchers off the queue in one atomic SPOP."""
+    # RedisWrapper.spop pops a single member (and makes the key itself),
+    # a pipeline runs redis-py's own SPOP with a count
+    pipeline = frappe.cache.pipeline()
+    pipeline.spop(frappe.cache.make_key(QUEUE_KEY), count)
+    members = pipeline.execute()[0]
+    return [frappe.safe_decode(m) for m in members or []]
+
+
+def rebuild_invoice_facts(invoices):
+    """Rewrite the facts of the given invoices; cancelled ones just lose theirs."""
+    frappe.db.delete("DCR Payment Fact", {"invoice": ("in", invoices)})
+
+    invoice_rows, pos_map, ref_map = get_invoice_facts(
+        ["si.name IN %(invoices)s"], {"invoices": tuple(invoices)}
+    )
+
+    profile_warehouses = get_pos_profile_warehouses()
+    so_warehouses = get_sales_order_warehouses(ref_map)
+
+    rows = []
+    for inv in invoice_rows:
+        warehouse = profile_warehouses.get(inv.pos_profile)
+        facts = get_payment_facts(
+            inv,
+            pos_map.get(inv.name, []),
+            ref_map.get(inv.name, []),
+            lambda r, warehouse=warehouse: bool(warehouse)
+            and so_warehouses.get(r.advance_voucher_no) == warehouse,
+        )
+
+        for f in facts:
+            rows.append((
+                inv.name, f.payment_entry, f.sales_order, f.source, f.mode_of_payment, f.tender,
+                inv.pos_profile, warehouse, inv.sales_channel, inv.business_date,
+                inv.is_return, f.amount,
+            ))
+
+    insert_facts(rows)
+
+
+def rebuild_advance_facts(payment_entries):
+    """Sales Order advances of the given Payment Entries, not yet tied to an invoice."""
+    frappe.db.delete("DCR Payment Fact", {
+        "payment_entry": ("in", payment_entries),
+        "invoice": ("is", "not set"),
+    })
+
+    warehouse_profiles = {}
+    for pos_profile, warehouse in get_pos_profile_warehouses().items():
+        warehouse_profiles.setdefault(warehouse, pos_profile)
+
+    advances = get_sales_order_advances(
+        ["pe.name IN %(payment_entries)s"], {"payment_entries": tuple(payment_entries)}
+    )
+
+    rows = []
+    for adv in advances:
+        f = make_fact("Advance", adv, adv.amount, sales_order=adv.sales_order)
+        rows.append((
+            None, adv.payment_entry, f.sales_order, f.source, f.mode_of_payment, f.tender,
+            warehouse_profiles.get(adv.warehouse), adv.warehouse, get_sales_channel(adv.customer),
+            adv.business_date, 0, f.amount,
+        ))
+
+    insert_facts(rows)
+
+
+def insert_facts(rows):
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+
+    frappe.db.bulk_insert(
+        "DCR Payment Fact",
+        ("name", "creation", "modified", "owner", "modified_by", *FACT_FIELDS),
+        [(frappe.generate_hash(length=12), timestamp, timestamp, user, user, *row) for row in rows],
+    )
+
+
+def get_pos_profile_warehouses():
+    return dict(frappe.get_all("POS Profile", fields=["name", "warehouse"], as_list=True))
+
+
+def get_sales_order_warehouses(ref_map):
+    sales_orders = {
+        r.advance_voucher_no
+        for refs in ref_map.values()
+        for r in refs
+        if r.advance_voucher_type == "Sales Order" and r.advance_voucher_no
+    }
+    if not sales_orders:
+        return {}
+
+    return dict(frappe.db.sql("""
+        SELECT name, set_warehouse
+        FROM `tabSales Order`
+        WHERE name IN %(sales_orders)s
+    """, {"sales_orders": tuple(sales_orders)}))
+
+
+# -------------------------------------------------
+# READ
+# -------------------------------------------------
+def get_invoice_fact_rows(pos_profiles, from_date, to_date):
+    """Stored invoice facts of the branches, one row per invoice × source × mode."""
+    return frappe.db.sql("""
+        SELECT
+            invoice,
+            pos_profile,
+            channel,
+            is_return,
+            source,
+            mode_of_payment,
+            tender,
+            sales_order,
+            payment_entry,
+            SUM(amount) AS amount
+        FROM `tabDCR Payment Fact`
+        WHERE
+            pos_profile IN %(pos_profiles)s
+            AND business_date BETWEEN %(from_date)s AND %(to_date)s
+            AND IFNULL(invoice, '') != ''
+        GROUP BY invoice, pos_profile, channel, is_return, source, mode_of_payment, tender,
+            sales_order, payment_entry
+        ORDER BY invoice
+    """, {"pos_profiles": tuple(pos_profiles), "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+
+def get_advance_fact_rows(warehouses, from_date, to_date):
+    """Stored Sales Order advances received for the warehouses, per Payment Entry × Sales Order."""
+    if not warehouses:
+        return []
+
+    return frappe.db.sql("""
+        SELECT
+            payment_entry,
+            sales_order,
+            warehouse,
+            channel,
+            mode_of_payment,
+            tender,
+            SUM(amount) AS amount
+        FROM `tabDCR Payment Fact`
+        WHERE
+            warehouse IN %(warehouses)s
+            AND business_date BETWEEN %(from_date)s AND %(to_date)s
+            AND source = 'Advance'
+            AND IFNULL(invoice, '') = ''
+        GROUP BY payment_entry, sales_order, warehouse, channel, mode_of_payment, tender
+    """, {"warehouses": tuple(warehouses), "from_date": from_date, "to_date": to_date}, as_dict=True)
@@ -0,0 +1,96 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Pre-warm of the DCR result cache for the business day just closed.
+
+Every branch and head office open yesterday's DCR first thing in the
+morning. A scheduled job checks every 15 minutes which branches have passed
+their `business_day_cutoff` since it last ran and queues one job per branch
+that runs DCR-Report, New DCR-Report and DCR-All Branches for the closed day
+through the result cache, so the first views are cache hits. Once every
+branch has closed the same day, DCR-All Branches over all branches (head
+office's view) is warmed as well.
+
+A late submit or cancel for the day still invalidates its results as usual;
+the next view recomputes them. The result cache TTL (`dcr_report_cache_ttl`)
+has to outlive the morning for the warmed results to be used. Set
+`dcr_prewarm_reports` to 0 in the site config to turn it off.
+"""
+
+import frappe
+from frappe.utils import add_days, cint, now_datetime
+
+from steelforce_custom.steelforce_custom.dcr.business_date import get_business_date
+from steelforce_custom.steelforce_custom.dcr.cache import ALL_BRANCHES
+from steelforce_custom.steelforce_custom.dcr.engine import get_report_module
+from steelforce_custom.steelforce_custom.dcr.payment_facts import sync_payment_facts
+
+
+# report: whether its POS Profile filter is a MultiSelectList
+PREWARM_REPORTS = {
+    "DCR-Report": True,
+    "New DCR-Report": False,
+    "DCR-All Branches": True,
+}
+DONE_PREFIX = "dcr_prewarm_done"
+DONE_TTL = 3 * 24 * 60 * 60
+
+
+def is_enabled():
+    return bool(cint(frappe.conf.get("dcr_prewarm_reports", 1)))
+
+
+def prewarm_closed_days():
+    """Scheduled: queue the pre-warm of every branch day closed and not warmed yet."""
+    if not is_enabled():
+        return
+
+    now = now_datetime()
+    closed_days = {
+        pos_profile: add_days(get_business_date(now.date(), now.time(), pos_profile), -1)
+        for pos_profile in frappe.get_all("POS Profile", filters={"disabled": 0}, pluck="name")
+    }
+
+    for pos_profile, business_date in closed_days.items():
+        queue_prewarm(pos_profile, business_date)
+
+    # head office's view over all branches, once the last cutoff has passed
+    if len(set(closed_days.values())) == 1:
+        queue_prewarm(None, next(iter(closed_days.values())))
+
+
+def queue_prewarm(pos_profile, business_date):
+    if frappe.cache.get_value(get_done_key(pos_profile, business_date)):
+        return
+
+    frappe.enqueue(
+        "steelforce_custom.steelforce_custom.dcr.prewarm.prewarm_day",
+        queue="long",
+        job_id=get_done_key(pos_profile, business_date),
+        deduplicate=True,
+        pos_profile=pos_profile,
+        business_date=str(business_date),
+    )
+
+
+def prewarm_day(pos_profile, business_date):
+    """Run the DCR reports of one branch day, or DCR-All Branches over every branch, into the cache."""
+    if frappe.conf.get("dcr_read_payment_facts"):
+        # vouchers still queued would be missing from the stored facts
+        sync_payment_facts()
+
+    reports = PREWARM_REPORTS if pos_profile else {"DCR-All Branches": True}
+    for report_name, multiselect in reports.items():
+        filters = frappe._dict(from_date=business_date, to_date=business_date)
+        if pos_profile:
+            filters.pos_profile = [pos_profile] if multiselect else pos_profile
+
+        # a miss runs and stores the result, a hit (opened already) is kept
+        get_report_module(report_name).execute(filters)
+
+    frappe.cache.set_value(get_done_key(pos_profile, business_date), 1, expires_in_sec=DONE_TTL)
+
+
+def get_done_key(pos_profile, business_date):
+    return f"{DONE_PREFIX}::{pos_profile or ALL_BRANCHES}::{business_date}"
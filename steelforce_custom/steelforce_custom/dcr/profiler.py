@@ -0,0 +1,141 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Opt-in profiling of DCR report runs.
+
+A run is profiled when the site sets `dcr_profile_reports` or the request
+carries the hidden `profile` filter (e.g. `/app/query-report/DCR-Report?profile=1`).
+A profiled run bypasses the result cache and records every `frappe.db.sql`
+call (normalized text, time, rows and EXPLAIN plan) plus a cProfile of the
+Python work. It is saved as a `Report Profile Log` when it took longer than
+`dcr_profile_slow_seconds`, or always when asked for through the filter, in
+which case a summary is also returned in the report's message area.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import re
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, get_url_to_form
+
+from steelforce_custom.steelforce_custom.dcr.explain import capture_queries, explain
+
+
+DEFAULT_SLOW_SECONDS = 5
+MAX_EXPLAINED_QUERIES = 20
+PROFILE_LINES = 40
+
+
+def is_profiling(filters):
+    return bool(cint(filters.get("profile")) or frappe.conf.get("dcr_profile_reports"))
+
+
+def profile_report(report_name, execute, filters):
+    """Run `execute(filters)` under the SQL recorder and cProfile, and log the run."""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+
+    with capture_queries() as queries:
+        profiler.enable()
+        try:
+            result = execute(filters)
+        finally:
+            profiler.disable()
+
+    seconds = time.perf_counter() - start
+    requested = cint(filters.get("profile"))
+    slow_seconds = flt(frappe.conf.get("dcr_profile_slow_seconds")) or DEFAULT_SLOW_SECONDS
+    if seconds < slow_seconds and not requested:
+        return result
+
+    log = save_profile_log(report_name, filters, seconds, queries, profiler, seconds >= slow_seconds)
+    if requested:
+        result = add_message(result, get_message(log))
+
+    return result
+
+
+# -------------------------------------------------
+# LOG
+# -------------------------------------------------
+def save_profile_log(report_name, filters, seconds, queries, profiler, is_slow):
+    statements = get_statements(queries)
+
+    log = frappe.get_doc({
+        "doctype": "Report Profile Log",
+        "report_name": report_name,
+        "user": frappe.session.user,
+        "filters": json.dumps(filters, indent=1, sort_keys=True, default=str),
+        "duration": seconds,
+        "query_count": len(queries),
+        "query_duration": sum(q.seconds for q in queries),
+        "is_slow": is_slow,
+        "queries": json.dumps(statements, indent=1, default=str),
+        "python_profile": get_python_profile(profiler),
+    })
+    # report runs are read requests, the log is written on its own
+    log.insert(ignore_permissions=True)
+    frappe.db.commit()
+
+    return log
+
+
+def get_statements(queries):
+    """Calls grouped by normalized text, slowest first, with the plan of the slowest ones."""
+    statements = {}
+    for q in queries:
+        text = normalize_query(q.query)
+        statement = statements.setdefault(text, {
+            "query": text, "calls": 0, "seconds": 0, "rows": 0, "sample": q,
+        })
+        statement["calls"] += 1
+        statement["seconds"] += q.seconds
+        statement["rows"] += q.rows or 0
+
+    statements = sorted(statements.values(), key=lambda s: s["seconds"], reverse=True)
+    for i, statement in enumerate(statements):
+        sample = statement.pop("sample")
+        statement["seconds"] = round(statement["seconds"], 4)
+        if i < MAX_EXPLAINED_QUERIES and statement["query"].upper().startswith("SELECT"):
+            statement["explain"] = explain(sample.query, sample.values)
+
+    return statements
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def get_python_profile(profiler):
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return out.getvalue()
+
+
+# -------------------------------------------------
+# MESSAGE
+# -------------------------------------------------
+def get_message(log):
+    return _("Profiled in {0}s, {1} queries taking {2}s. <a href='{3}'>{4}</a>").format(
+        round(log.duration, 2),
+        log.query_count,
+        round(log.query_duration, 2),
+        get_url_to_form(log.doctype, log.name),
+        log.name,
+    )
+
+
+def add_message(result, message):
+    """`execute` returns (columns, data, message, ...); set or extend the message."""
+    result = list(result)
+    if len(result) < 3:
+        result.append(None)
+
+    result[2] = f"{result[2]}<br>{message}" if result[2] else message
+    return result
@@ -0,0 +1,225 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Realtime deltas for open DCR report views.
+
+An open DCR-Report / New DCR-Report view registers the branches it shows
+(`watch_branches`, permission checked, renewed while the view is open) and
+joins their POS Profile document rooms, which the socket server only lets
+users with read access to the POS Profile into.
+
+Submitting or cancelling a Sales Invoice or Payment Entry whose branches (its
+invoices', and those of the warehouses of the advances it settles) include a
+watched one snapshots the tree entries it can change (the children of its
+invoices and the Sales Order advances not yet invoiced). Once the transaction
+commits, a job takes the snapshot again and publishes the difference per
+branch and business day as a `dcr_delta` event to the branch's room. The
+views patch their rows and totals with it instead of re-running; the next
+run, from the invalidated cache, stays the reference. Nothing is computed
+while no view watches.
+
+Set `dcr_realtime_updates` to 0 in the site config to turn it off.
+"""
+
+import time
+
+import frappe
+from frappe.realtime import get_doc_room
+from frappe.utils import cint, flt, getdate
+
+from steelforce_custom.steelforce_custom.dcr.advance_ledger import (
+    get_ledger_payment_entries,
+    get_payment_entry_advance_rows,
+)
+from steelforce_custom.steelforce_custom.dcr.cache import get_payment_entry_branch_days
+from steelforce_custom.steelforce_custom.dcr.engine import get_invoice_facts, get_report_module, parse_pos_profiles
+from steelforce_custom.steelforce_custom.dcr.payment_facts import get_pos_profile_warehouses
+
+
+REALTIME_REPORTS = ("DCR-Report", "New DCR-Report")
+EVENT = "dcr_delta"
+WATCH_KEY = "dcr_realtime_watch"
+WATCH_TTL = 10 * 60
+
+
+def is_enabled():
+    return bool(cint(frappe.conf.get("dcr_realtime_updates", 1)))
+
+
+# -------------------------------------------------
+# WATCHED BRANCHES
+# -------------------------------------------------
+@frappe.whitelist()
+def watch_branches(pos_profiles):
+    """Register the branches an open view shows for WATCH_TTL seconds; returns those the user may watch."""
+    if not is_enabled() or not frappe.has_permission("Sales Invoice", "read"):
+        return []
+
+    allowed = [
+        p for p in parse_pos_profiles(pos_profiles)
+        if frappe.has_permission("POS Profile", "read", doc=p)
+    ]
+    if allowed:
+        key = frappe.cache.make_key(WATCH_KEY)
+        frappe.cache.zadd(key, {p: time.time() + WATCH_TTL for p in allowed})
+        frappe.cache.zremrangebyscore(key, "-inf", time.time())
+        frappe.cache.expire(key, WATCH_TTL)
+
+    return allowed
+
+
+def get_watched_branches():
+    members = frappe.cache.zrangebyscore(frappe.cache.make_key(WATCH_KEY), time.time(), "+inf")
+    return {frappe.safe_decode(m) for m in members}
+
+
+def is_watched(doc, watched):
+    return bool(watched) and not watched.isdisjoint(get_doc_branches(doc))
+
+
+def get_doc_branches(doc):
+    """Branches whose DCR a submit or cancel of `doc` can change."""
+    if doc.doctype == "Payment Entry":
+        return {branch for branch, _business_date in get_payment_entry_branch_days(doc)}
+
+    branches = {doc.pos_profile}
+
+    # the advances it allocates count for the branches of their Sales Orders' warehouses
+    payment_entries = get_ledger_payment_entries(doc)
+    if payment_entries:
+        warehouses = set(frappe.get_all(
+            "DCR Sales Advance",
+            filters={"payment_entry": ("in", payment_entries)},
+            pluck="warehouse",
+            distinct=True,
+        ))
+        branches.update(p for p, warehouse in get_pos_profile_warehouses().items() if warehouse in warehouses)
+
+    return branches
+
+
+# -------------------------------------------------
+# DOC EVENTS
+# -------------------------------------------------
+def snapshot_report_entries(doc, method=None):
+    """before_submit / before_cancel: the entries as they stand, when a view watches."""
+    if is_enabled() and is_watched(doc, get_watched_branches()):
+        doc.flags.dcr_report_entries = get_report_entries(doc, include_self=method == "before_cancel")
+
+
+def publish_report_delta(doc, method=None):
+    """on_submit / on_cancel: the entries after and the publish run in a job once committed."""
+    if doc.flags.dcr_report_entries is None:
+        return
+
+    frappe.enqueue(
+        "steelforce_custom.steelforce_custom.dcr.realtime.publish_delta",
+        queue="short",
+        enqueue_after_commit=True,
+        doctype=doc.doctype,
+        name=doc.name,
+        before=doc.flags.dcr_report_entries,
+    )
+
+
+def publish_delta(doctype, name, before):
+    watched = get_watched_branches()
+    if not watched:
+        return
+
+    after = get_report_entries(frappe.get_doc(doctype, name))
+
+    branch_days = {}
+    for key in before.keys() | after.keys():
+        pos_profile, business_date, report_name, parent, name, invoice = key
+        if pos_profile not in watched:
+            continue
+
+        amount = flt(after.get(key, {}).get("amount", 0) - before.get(key, {}).get("amount", 0), 9)
+        if not amount:
+            continue
+
+        entry = after.get(key) or before[key]
+        branch_days.setdefault((pos_profile, business_date), []).append({
+            "report_name": report_name,
+            "parent": parent,
+            "parent_name": entry["parent_name"],
+            "name": name,
+            "invoice": invoice,
+            "amount": amount,
+            "sales_type": entry["sales_type"],
+            "tender": entry["tender"],
+        })
+
+    for (pos_profile, business_date), changes in branch_days.items():
+        frappe.publish_realtime(
+            EVENT,
+            {"pos_profile": pos_profile, "business_date": business_date, "changes": changes},
+            room=get_doc_room("POS Profile", pos_profile),
+        )
+
+
+# -------------------------------------------------
+# SNAPSHOT
+# -------------------------------------------------
+def get_report_entries(doc, include_self=True):
+    """
+    `{(branch, day, report, parent, name, invoice): entry}` over the invoices
+    and advances `doc` touches. A Sales Invoice about to be submitted has no
+    entries yet, `include_self=False` skips reading it.
+    """
+    entries = {}
+
+    invoices = get_affected_invoices(doc, include_self)
+    if invoices:
+        invoice_rows, pos_map, ref_map = get_invoice_facts(["si.name IN %(invoices)s"], {"invoices": tuple(invoices)})
+        branch_days = {inv.name: (inv.pos_profile, inv.business_date) for inv in invoice_rows}
+
+        for report_name in REALTIME_REPORTS:
+            report_entries = get_report_module(report_name).get_realtime_entries(
+                (invoice_rows, pos_map, ref_map), []
+            )
+            for invoice, rows in report_entries.items():
+                add_entries(entries, *branch_days[invoice], report_name, rows)
+
+    payment_entries = get_ledger_payment_entries(doc)
+    advances = get_payment_entry_advance_rows(payment_entries) if payment_entries else []
+    if advances:
+        # a warehouse's advances count for its first branch, as in the report
+        warehouse_branches = {}
+        for pos_profile, warehouse in get_pos_profile_warehouses().items():
+            warehouse_branches.setdefault(warehouse, pos_profile)
+
+        for adv in advances:
+            if not warehouse_branches.get(adv.warehouse):
+                continue
+
+            for report_name in REALTIME_REPORTS:
+                rows = get_report_module(report_name).get_realtime_entries(([], {}, {}), [adv]).get(None)
+                add_entries(entries, warehouse_branches[adv.warehouse], adv.business_date, report_name, rows or [])
+
+    return entries
+
+
+def get_affected_invoices(doc, include_self):
+    if doc.doctype == "Sales Invoice":
+        return [doc.name] if include_self else []
+
+    return [r.reference_name for r in doc.references if r.reference_doctype == "Sales Invoice"]
+
+
+def add_entries(entries, pos_profile, business_date, report_name, rows):
+    color_parent_name = get_report_module(report_name).color_parent_name
+
+    for e in rows:
+        key = (pos_profile, str(getdate(business_date)), report_name, e["parent"], e["name"], e["invoice"])
+        if key in entries:
+            entries[key]["amount"] += e["amount"] or 0
+        else:
+            entries[key] = {
+                "amount": e["amount"] or 0,
+                "parent_name": color_parent_name(e["parent"]),
+                "sales_type": e["sales_type"],
+                "tender": e["tender"],
+            }
@@ -0,0 +1,121 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Read-replica routing for the DCR report queries.
+
+With `dcr_read_from_replica` set, the DCR reads (report runs, pages,
+background chunks, exports) go to the replica Frappe already knows from
+`replica_host` / `replica_db_port` (and `replica_db_name` /
+`replica_db_password` with `different_credentials_for_replica`), so closing
+reports do not compete with POS submits on the primary. Writes made around
+a report (logs, files) stay on the primary.
+
+Before routing, the replica's `Seconds_Behind_Master` is checked against
+`dcr_replica_max_lag` (seconds, default 30), at most every few seconds. A
+stale, stopped or unreachable replica, or one whose status cannot be read,
+sends the reads back to the primary. For a second local MariaDB instance
+that is not a real replica (e.g. a restored copy of the site), set
+`dcr_replica_max_lag` to -1 to skip the check:
+
+    bench --site test.local set-config replica_host 127.0.0.1
+    bench --site test.local set-config -p replica_db_port 3307
+    bench --site test.local set-config -p dcr_read_from_replica 1
+    bench --site test.local set-config -p dcr_replica_max_lag -1
+
+`test_replica` then also checks the routing against that instance.
+"""
+
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint
+
+
+LAG_CACHE_KEY = "dcr_replica_lag"
+LAG_CHECK_SECONDS = 10
+DEFAULT_MAX_LAG = 30
+
+
+@contextmanager
+def replica_reads():
+    """Run the block's `frappe.db` queries on the replica when it is enabled and fresh."""
+    replica = None
+    if is_replica_enabled():
+        replica = connect_replica()
+
+    if not replica:
+        yield
+        return
+
+    primary = frappe.local.db
+    frappe.local.db = replica
+    try:
+        yield
+    finally:
+        frappe.local.db = primary
+        replica.close()
+
+
+def is_replica_enabled():
+    # already on a replica, e.g. inside a `frappe.read_only()` request
+    if getattr(frappe.local, "primary_db", None):
+        return False
+
+    return bool(frappe.conf.get("dcr_read_from_replica") and frappe.conf.get("replica_host"))
+
+
+def connect_replica():
+    """A fresh enough replica connection, else None."""
+    from frappe.database import get_db
+
+    conf = frappe.conf
+    user, password, db_name = conf.db_name, conf.db_password, conf.db_name
+    if conf.different_credentials_for_replica:
+        user, password, db_name = conf.replica_db_name, conf.replica_db_password, conf.replica_db_name
+
+    try:
+        replica = get_db(
+            host=conf.replica_host,
+            port=conf.replica_db_port,
+            user=user,
+            password=password,
+            cur_db_name=db_name,
+        )
+        replica.connect()
+    except Exception:
+        frappe.logger("dcr").warning("DCR replica unavailable, reading from the primary", exc_info=True)
+        return None
+
+    if is_fresh(replica):
+        return replica
+
+    replica.close()
+    return None
+
+
+def is_fresh(replica):
+    max_lag = cint(frappe.conf.get("dcr_replica_max_lag", DEFAULT_MAX_LAG))
+    if max_lag < 0:
+        return True
+
+    lag = frappe.cache.get_value(LAG_CACHE_KEY)
+    if lag is None:
+        lag = get_replica_lag(replica)
+        frappe.cache.set_value(LAG_CACHE_KEY, lag, expires_in_sec=LAG_CHECK_SECONDS)
+
+    return 0 <= lag <= max_lag
+
+
+def get_replica_lag(replica):
+    """Seconds behind the primary; -1 when not replicating or the status is unreadable."""
+    try:
+        status = replica.sql("SHOW SLAVE STATUS", as_dict=True)
+    except Exception:
+        frappe.logger("dcr").warning("Cannot read the DCR replica status", exc_info=True)
+        return -1
+
+    if not status or status[0].get("Seconds_Behind_Master") is None:
+        return -1
+
+    return cint(status[0]["Seconds_Behind_Master"])
@@ -0,0 +1,51 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Sales channel of a Sales Invoice: Online, Counter or Home Sales.
+
+The channel is resolved once at submit and stored in the indexed
+`sales_channel` column, so reports group on it instead of matching customer
+names per row. It comes from the customer's `sales_channel`, else its
+Customer Group's, else the built-in customer rule.
+"""
+
+import frappe
+
+
+ONLINE_SALES = "Online Sales"
+COUNTER_SALES = "Counter Sales"
+HOME_SALES = "Home Sales"
+SALES_CHANNELS = (ONLINE_SALES, COUNTER_SALES, HOME_SALES)
+
+# built-in rule for customers and groups without a channel
+ONLINE_CUSTOMERS = ("HUNGER STATION", "KETA", "JAHEZ", "TO YOU")
+WALK_IN_CUSTOMER = "Walk-in Customer"
+
+
+def get_sales_channel(customer):
+    channel, customer_group = None, None
+    if customer:
+        channel, customer_group = frappe.get_cached_value(
+            "Customer", customer, ["sales_channel", "customer_group"]
+        ) or (None, None)
+
+    if not channel and customer_group:
+        channel = frappe.get_cached_value("Customer Group", customer_group, "sales_channel")
+
+    return channel or get_default_sales_channel(customer)
+
+
+def get_default_sales_channel(customer):
+    if customer in ONLINE_CUSTOMERS:
+        return ONLINE_SALES
+    if customer == WALK_IN_CUSTOMER:
+        return COUNTER_SALES
+    return HOME_SALES
+
+
+# -------------------------------------------------
+# DOC EVENTS
+# -------------------------------------------------
+def set_sales_channel(doc, method=None):
+    doc.sales_channel = get_sales_channel(doc.customer)
@@ -0,0 +1,107 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import advance_ledger
+
+
+BALANCES = [
+    frappe._dict(
+        payment_entry="ACC-PAY-0001", sales_order="SO-0001", customer="Family Account",
+        warehouse="Branch A - SF", business_date="2026-01-01", mode_of_payment="Cash",
+        mode_type="Cash", allocated_amount=40, outstanding_amount=60,
+    ),
+    frappe._dict(
+        payment_entry="ACC-PAY-0001", sales_order="SO-0002", customer="Family Account",
+        warehouse="Branch B - SF", business_date="2026-01-01", mode_of_payment="Mada",
+        mode_type="Bank", allocated_amount=0, outstanding_amount=25,
+    ),
+]
+
+
+class TestDCRAdvanceLedger(FrappeTestCase):
+    """The ledger rows of a Payment Entry are rewritten from its current references."""
+
+    def setUp(self):
+        self.delete = MagicMock()
+        self.bulk_insert = MagicMock()
+
+        for patcher in (
+            patch.object(advance_ledger.frappe.db, "delete", self.delete),
+            patch.object(advance_ledger.frappe.db, "bulk_insert", self.bulk_insert),
+            patch.object(advance_ledger, "get_sales_channel", return_value="Home Sales"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ledger_payment_entries(self):
+        payment_entry = frappe._dict(doctype="Payment Entry", name="ACC-PAY-0001")
+        invoice = frappe._dict(doctype="Sales Invoice", name="SINV-0001", advances=[
+            frappe._dict(reference_type="Payment Entry", reference_name="ACC-PAY-0001", allocated_amount=40),
+            frappe._dict(reference_type="Payment Entry", reference_name="ACC-PAY-0002", allocated_amount=0),
+            frappe._dict(reference_type="Journal Entry", reference_name="ACC-JV-0001", allocated_amount=10),
+        ])
+
+        self.assertEqual(advance_ledger.get_ledger_payment_entries(payment_entry), ["ACC-PAY-0001"])
+        self.assertEqual(advance_ledger.get_ledger_payment_entries(invoice), ["ACC-PAY-0001"])
+
+    def test_rebuild_rewrites_the_rows(self):
+        with patch.object(advance_ledger, "get_sales_order_advance_balances", return_value=BALANCES):
+            advance_ledger.rebuild_advance_ledger(["ACC-PAY-0001"])
+
+        self.delete.assert_called_once_with("DCR Sales Advance", {"payment_entry": ("in", ["ACC-PAY-0001"])})
+
+        doctype, fields, rows = self.bulk_insert.call_args.args
+        self.assertEqual(doctype, "DCR Sales Advance")
+        rows = [dict(zip(fields, row)) for row in rows]
+
+        self.assertEqual(
+            [(r["sales_order"], r["tender"], r["amount"], r["allocated_amount"], r["outstanding_amount"]) for r in rows],
+            [("SO-0001", "Cash", 100, 40, 60), ("SO-0002", "Card", 25, 0, 25)],
+        )
+        self.assertTrue(all(r["channel"] == "Home Sales" for r in rows))
+
+    def test_cancelled_payment_entry_only_loses_its_rows(self):
+        with patch.object(advance_ledger, "get_sales_order_advance_balances", return_value=[]):
+            advance_ledger.rebuild_advance_ledger(["ACC-PAY-0001"])
+
+        self.delete.assert_called_once()
+        self.bulk_insert.assert_not_called()
+
+    def test_unreconcile_refreshes_the_unlinked_invoices(self):
+        payment_entry = frappe._dict(name="ACC-PAY-0001", references=[
+            frappe._dict(reference_doctype="Sales Invoice", reference_name="SINV-0002"),
+        ])
+        unreconcile = frappe._dict(
+            voucher_type="Payment Entry",
+            voucher_no="ACC-PAY-0001",
+            allocations=[frappe._dict(reference_doctype="Sales Invoice", reference_name="SINV-0001")],
+        )
+
+        with (
+            patch.object(advance_ledger.frappe, "get_doc", return_value=payment_entry),
+            patch.object(advance_ledger, "rebuild_advance_ledger") as rebuild,
+            patch.object(advance_ledger, "queue_vouchers") as queue,
+            patch.object(advance_ledger, "invalidate") as invalidate,
+            patch.object(advance_ledger, "get_payment_entry_branch_days", return_value={("Branch A", "2026-01-01")}),
+            patch.object(advance_ledger, "get_invoice_branch_days", return_value={("Branch B", "2026-01-02")}) as days,
+        ):
+            advance_ledger.update_unreconciled_advances(unreconcile)
+
+        rebuild.assert_called_once_with(["ACC-PAY-0001"])
+        self.assertEqual(
+            sorted(queue.call_args.args[0]),
+            ["Payment Entry::ACC-PAY-0001", "Sales Invoice::SINV-0001", "Sales Invoice::SINV-0002"],
+        )
+        self.assertEqual(sorted(days.call_args.args[0]), ["SINV-0001", "SINV-0002"])
+        invalidate.assert_called_once_with({("Branch A", "2026-01-01"), ("Branch B", "2026-01-02")})
+
+    def test_unreconcile_of_other_vouchers_is_ignored(self):
+        with patch.object(advance_ledger, "rebuild_advance_ledger") as rebuild:
+            advance_ledger.update_unreconciled_advances(frappe._dict(voucher_type="Journal Entry"))
+
+        rebuild.assert_not_called()
@@ -0,0 +1,66 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import background
+
+
+class TestDCRBackgroundRun(FrappeTestCase):
+    """A run merges once, after every chunk, however often its chunks run."""
+
+    def setUp(self):
+        self.run_id = frappe.generate_hash(length=12)
+        self.module = MagicMock()
+        self.module.get_chunk.side_effect = lambda filters: [filters.from_date]
+        self.module.merge_chunks.side_effect = lambda chunks: ([], [c[0] for c in chunks])
+
+        filters = frappe._dict(from_date="2026-01-01", to_date="2026-01-03")
+        background.set_run_value(self.run_id, "run", {
+            "report_name": "DCR-All Branches",
+            "filters": filters,
+            "user": frappe.session.user,
+            "chunks": background.get_chunk_filters(filters),
+        })
+
+        for target in ("get_report_module", "store_result"):
+            patcher = patch.object(background, target, return_value=self.module)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = patch.object(frappe, "publish_realtime")
+        self.publish_realtime = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        frappe.cache.delete_value([
+            background.get_run_key(self.run_id, part) for part in ("run", "result", "done", 0, 1, 2)
+        ])
+        frappe.cache.delete(frappe.cache.make_key(background.get_run_key(self.run_id, "merge")))
+
+    def test_retried_chunk_does_not_complete_the_run(self):
+        background.run_chunk(self.run_id, 0)
+        background.run_chunk(self.run_id, 1)
+        background.run_chunk(self.run_id, 1)
+
+        self.module.merge_chunks.assert_not_called()
+        self.assertIsNone(background.get_run_value(self.run_id, "result"))
+
+        background.run_chunk(self.run_id, 2)
+
+        self.module.merge_chunks.assert_called_once()
+        self.assertEqual(
+            background.get_run_value(self.run_id, "result"),
+            ([], ["2026-01-01", "2026-01-02", "2026-01-03"]),
+        )
+
+    def test_chunk_run_after_the_merge_does_not_merge_again(self):
+        for index in (0, 1, 2, 2):
+            background.run_chunk(self.run_id, index)
+
+        self.module.merge_chunks.assert_called_once()
+        ready = [c for c in self.publish_realtime.call_args_list if c.args[0] == "dcr_report_ready"]
+        self.assertEqual(len(ready), 1)
@@ -0,0 +1,74 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import bootstrap
+
+
+# SELECT ppu.user, pp.name ... ORDER BY pp.modified DESC, ppu.idx
+POS_PROFILE_USERS = [
+    ("cashier@example.com", "Branch B"),
+    ("manager@example.com", "Branch B"),
+    ("manager@example.com", "Branch A"),
+    ("manager@example.com", "Branch B"),
+]
+RESULT = {"columns": [], "result": [{"name": "TOTAL", "amount": 0}]}
+
+
+class TestDCRBootstrap(FrappeTestCase):
+    """The report's first run comes back with the filters that picked it."""
+
+    def setUp(self):
+        frappe.cache.delete_value(bootstrap.CACHE_KEY)
+        self.addCleanup(frappe.cache.delete_value, bootstrap.CACHE_KEY)
+
+    def get_bootstrap(self, report_name, pos_profiles):
+        user_map = {frappe.session.user: pos_profiles}
+        with (
+            patch.object(bootstrap, "get_user_pos_profile_map", return_value=user_map),
+            patch.object(bootstrap, "run", return_value=RESULT) as run,
+        ):
+            return bootstrap.get_bootstrap(report_name, '{"from_date": "2026-01-01"}'), run
+
+    def test_user_pos_profile_map(self):
+        with patch.object(bootstrap.frappe.db, "sql", return_value=POS_PROFILE_USERS) as sql:
+            self.assertEqual(bootstrap.get_user_pos_profiles("manager@example.com"), ["Branch B", "Branch A"])
+            self.assertEqual(bootstrap.get_user_pos_profiles("cashier@example.com"), ["Branch B"])
+            self.assertEqual(bootstrap.get_user_pos_profiles("guest@example.com"), [])
+
+            # built once, until a POS Profile changes
+            sql.assert_called_once()
+            bootstrap.clear_user_pos_profiles()
+            bootstrap.get_user_pos_profiles("manager@example.com")
+            self.assertEqual(sql.call_count, 2)
+
+    def test_first_run_with_the_users_branch(self):
+        for report_name, pos_profile in (
+            ("DCR-Report", ["Branch B"]),
+            ("New DCR-Report", "Branch B"),
+        ):
+            with self.subTest(report_name=report_name):
+                bootstrap_result, run = self.get_bootstrap(report_name, ["Branch B", "Branch A"])
+
+                filters = frappe._dict(from_date="2026-01-01", pos_profile=pos_profile)
+                self.assertEqual(bootstrap_result, {
+                    "filters": filters,
+                    "pos_profiles": ["Branch B", "Branch A"],
+                    "result": RESULT,
+                })
+                run.assert_called_once_with(report_name, filters, is_tree=True, parent_field="parent")
+
+    def test_user_without_branch_gets_no_run(self):
+        bootstrap_result, run = self.get_bootstrap("DCR-Report", [])
+
+        self.assertIsNone(bootstrap_result["result"])
+        self.assertEqual(bootstrap_result["pos_profiles"], [])
+        run.assert_not_called()
+
+    def test_other_reports_have_no_bootstrap(self):
+        with self.assertRaises(Exception):
+            bootstrap.get_bootstrap("DCR-Accounts")
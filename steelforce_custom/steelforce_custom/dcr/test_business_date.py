@@ -0,0 +1,83 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from steelforce_custom.steelforce_custom.dcr import business_date
+
+
+# branch -> business_day_cutoff, None for the default
+CUTOFFS = {"Branch Early": "02:00:00", "Branch Default": None}
+
+
+def get_cached_value(doctype, name, fieldname):
+    return CUTOFFS.get(name)
+
+
+class TestDCRBusinessDate(FrappeTestCase):
+    """A sale before the branch cutoff belongs to the previous business day."""
+
+    def setUp(self):
+        patcher = patch.object(business_date.frappe, "get_cached_value", side_effect=get_cached_value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_invoice_date(self, posting_date, posting_time, pos_profile="Branch Default"):
+        doc = frappe._dict(
+            doctype="Sales Invoice",
+            posting_date=posting_date,
+            posting_time=posting_time,
+            pos_profile=pos_profile,
+        )
+        business_date.set_business_date(doc)
+        return doc.business_date
+
+    def test_cutoff_across_midnight(self):
+        cases = (
+            ("2026-01-01", "23:59:59", "2026-01-01"),
+            ("2026-01-02", "00:00:00", "2026-01-01"),
+            ("2026-01-02", "03:59:59", "2026-01-01"),
+            ("2026-01-02", "04:00:00", "2026-01-02"),
+            ("2026-01-02", "12:00:00", "2026-01-02"),
+        )
+        for posting_date, posting_time, expected in cases:
+            with self.subTest(posting_date=posting_date, posting_time=posting_time):
+                self.assertEqual(self.get_invoice_date(posting_date, posting_time), getdate(expected))
+
+    def test_branch_cutoff(self):
+        self.assertEqual(self.get_invoice_date("2026-01-02", "01:59:59", "Branch Early"), getdate("2026-01-01"))
+        self.assertEqual(self.get_invoice_date("2026-01-02", "02:30:00", "Branch Early"), getdate("2026-01-02"))
+
+    def test_cutoff_across_month_end(self):
+        self.assertEqual(self.get_invoice_date("2026-03-01", "01:30:00"), getdate("2026-02-28"))
+
+    def test_payment_entry_uses_creation_time_on_its_posting_day(self):
+        doc = frappe._dict(
+            doctype="Payment Entry",
+            posting_date="2026-01-02",
+            creation="2026-01-02 01:30:00",
+            references=[],
+        )
+        business_date.set_business_date(doc)
+        self.assertEqual(doc.business_date, getdate("2026-01-01"))
+
+        # back-dated: no time of day to compare, the posting date stands
+        doc.creation = "2026-01-05 01:30:00"
+        business_date.set_business_date(doc)
+        self.assertEqual(doc.business_date, getdate("2026-01-02"))
+
+    def test_payment_entry_takes_the_cutoff_of_the_invoice_branch(self):
+        doc = frappe._dict(
+            doctype="Payment Entry",
+            posting_date="2026-01-02",
+            creation="2026-01-02 03:00:00",
+            references=[frappe._dict(reference_doctype="Sales Invoice", reference_name="SINV-0001")],
+        )
+        with patch.object(business_date.frappe.db, "get_value", return_value="Branch Early"):
+            business_date.set_business_date(doc)
+
+        self.assertEqual(doc.business_date, getdate("2026-01-02"))
@@ -0,0 +1,122 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import cache
+
+
+REPORT_NAME = "DCR Single Flight Test"
+BUSINESS_DATE = "2026-01-01"
+RESULT = ([{"fieldname": "amount"}], [{"name": "Counter Sales - Cash", "amount": 100}])
+
+
+class TestDCRSingleFlight(FrappeTestCase):
+    """Identical cache misses run the report once."""
+
+    def setUp(self):
+        self.filters = frappe._dict(from_date=BUSINESS_DATE, to_date=BUSINESS_DATE)
+        self.key = cache.get_cache_key(REPORT_NAME, self.filters)
+        self.lock = frappe.cache.make_key(f"{cache.LOCK_PREFIX}::{self.key}")
+        self.tearDown()
+
+    def tearDown(self):
+        frappe.cache.delete_value([self.key, cache.get_index_key(cache.ALL_BRANCHES, BUSINESS_DATE)])
+        frappe.cache.delete(self.lock)
+
+    def test_waiter_takes_the_leaders_result(self):
+        # another caller holds the lock and is still running
+        self.assertTrue(frappe.cache.set(self.lock, "leader", nx=True, ex=cache.LOCK_TTL))
+
+        polls = []
+
+        def leader_progress(seconds):
+            polls.append(seconds)
+            # the leader finishes on the second poll: stores, then releases
+            if len(polls) == 2:
+                cache.store_result(self.key, self.filters, RESULT)
+                frappe.cache.delete(self.lock)
+
+        execute = MagicMock(return_value=RESULT)
+        with patch.object(cache.time, "sleep", side_effect=leader_progress):
+            result = cache.run_once(self.key, self.filters, execute)
+
+        execute.assert_not_called()
+        self.assertEqual(len(polls), 2)
+        self.assertEqual(result, frappe.cache.get_value(self.key))
+
+    def test_leader_runs_once_and_releases_the_lock(self):
+        execute = MagicMock(return_value=RESULT)
+        report = cache.cached_report(REPORT_NAME)(execute)
+
+        first = report(self.filters)
+        second = report(self.filters)
+
+        execute.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertIsNone(frappe.cache.get(self.lock))
+
+    def test_failed_leader_lets_the_waiter_run(self):
+        self.assertTrue(frappe.cache.set(self.lock, "leader", nx=True, ex=cache.LOCK_TTL))
+
+        execute = MagicMock(return_value=RESULT)
+        # the leader fails: its lock goes, no result is stored
+        with patch.object(cache.time, "sleep", side_effect=lambda seconds: frappe.cache.delete(self.lock)):
+            result = cache.run_once(self.key, self.filters, execute)
+
+        execute.assert_called_once_with(self.filters)
+        self.assertEqual(result, RESULT)
+
+
+class TestDCRInvalidation(FrappeTestCase):
+    """A submit drops the cached results of its (branch, business day) only."""
+
+    def setUp(self):
+        self.keys = {}
+        for name, pos_profile, from_date, to_date in (
+            ("branch_a_day_1", "Branch A", "2026-01-01", "2026-01-01"),
+            ("branch_b_day_1", "Branch B", "2026-01-01", "2026-01-01"),
+            ("branch_a_day_2", "Branch A", "2026-01-02", "2026-01-02"),
+            ("branch_a_range", "Branch A", "2026-01-01", "2026-01-03"),
+            ("all_branches_day_1", None, "2026-01-01", "2026-01-01"),
+            ("all_branches_day_2", None, "2026-01-02", "2026-01-02"),
+        ):
+            filters = frappe._dict(from_date=from_date, to_date=to_date, pos_profile=pos_profile)
+            self.keys[name] = cache.get_cache_key(REPORT_NAME, filters)
+            cache.store_result(self.keys[name], filters, RESULT)
+
+    def tearDown(self):
+        frappe.cache.delete_value(list(self.keys.values()))
+        frappe.cache.delete_value([
+            cache.get_index_key(branch, business_date)
+            for branch in ("Branch A", "Branch B", cache.ALL_BRANCHES)
+            for business_date in cache.get_dates("2026-01-01", "2026-01-03")
+        ])
+
+    def get_cached(self):
+        return {name for name, key in self.keys.items() if frappe.cache.get_value(key) is not None}
+
+    def test_drops_only_the_touched_branch_day(self):
+        cache.invalidate({("Branch A", "2026-01-01")})
+
+        self.assertEqual(self.get_cached(), {"branch_b_day_1", "branch_a_day_2", "all_branches_day_2"})
+
+    def test_range_result_goes_with_any_of_its_days(self):
+        cache.invalidate({("Branch A", "2026-01-03")})
+
+        self.assertEqual(self.get_cached(), set(self.keys) - {"branch_a_range"})
+
+    def test_invoice_without_branch_drops_all_branch_results_of_its_day(self):
+        cache.invalidate({(None, "2026-01-02")})
+
+        self.assertEqual(self.get_cached(), set(self.keys) - {"all_branches_day_2"})
+
+    def test_data_version_changes_for_the_touched_day(self):
+        before = {d: cache.get_data_version("Branch A", d) for d in ("2026-01-01", "2026-01-02")}
+        cache.invalidate({("Branch A", "2026-01-01")})
+
+        self.assertNotEqual(cache.get_data_version("Branch A", "2026-01-01"), before["2026-01-01"])
+        self.assertEqual(cache.get_data_version("Branch A", "2026-01-02"), before["2026-01-02"])
@@ -0,0 +1,53 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import compact
+
+
+PARENT = "Counter Sales - Cash"
+ROWS = [
+    {"name": f"<span style='color:#000000; font-weight:600'>{PARENT}</span>", "parent": None, "amount": 150, "indent": 0},
+    {"name": "SINV-1", "invoice": "SINV-1", "parent": PARENT, "amount": 100, "indent": 1},
+    {"name": "SINV-2", "invoice": "SINV-2", "parent": PARENT, "amount": 50, "indent": 1},
+    {"name": "<b>Total Cash (Counter + Home)</b>", "amount": 150, "indent": 0},
+]
+
+
+class TestDCRCompactResult(FrappeTestCase):
+    def test_encode_rows(self):
+        encoded = compact.encode_rows(ROWS)
+
+        self.assertEqual(encoded["parent_index"], [-1, 0, 0, -1])
+        self.assertEqual(encoded["styles"], [["span", "color:#000000; font-weight:600"], ["b", ""]])
+        self.assertEqual(encoded["values"]["name"], [PARENT, "SINV-1", "SINV-2", "Total Cash (Counter + Home)"])
+        self.assertEqual(encoded["values"]["name_style"], [0, None, None, 1])
+        self.assertEqual(encoded["values"]["invoice"], [None, "SINV-1", "SINV-2", None])
+
+        # implied by the parent index
+        self.assertNotIn("parent", encoded["values"])
+        self.assertNotIn("indent", encoded["values"])
+
+    def test_parent_and_indent_kept_when_not_implied(self):
+        rows = [{"name": "x", "indent": 2, "parent": "elsewhere"}, {"name": "y", "indent": 0}]
+        encoded = compact.encode_rows(rows)
+
+        self.assertEqual(encoded["values"]["indent"], [2, 0])
+        self.assertEqual(encoded["values"]["parent"], ["elsewhere", None])
+
+    def test_run_report_compacts_only_on_request(self):
+        def run_report(report_name, header):
+            with patch.object(compact, "run", return_value={"columns": [], "result": list(ROWS)}), \
+                    patch.dict(frappe.conf, {"dcr_compact_results": 1}), \
+                    patch.object(frappe, "get_request_header", return_value=header, create=True):
+                return compact.run_report(report_name, {})
+
+        result = run_report("DCR-Report", "1")["result"]
+        self.assertEqual(result, [{"compact": compact.encode_rows(ROWS)}])
+
+        self.assertEqual(run_report("DCR-Report", None)["result"], ROWS)
+        self.assertEqual(run_report("DCR-Accounts", "1")["result"], ROWS)
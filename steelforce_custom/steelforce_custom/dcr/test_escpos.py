@@ -0,0 +1,119 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import io
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from PIL import Image
+
+from steelforce_custom.steelforce_custom.dcr import cache, escpos
+
+
+POS_PROFILE = "DCR Slip Test Branch"
+BUSINESS_DATE = "2026-01-01"
+DATA = [
+    {"name": "<b>Counter Sales - Cash</b>", "amount": 150, "indent": 0},
+    {"name": "SINV-0001", "amount": 100, "indent": 1},
+    {"name": "SINV-0002", "amount": 50, "indent": 1},
+    {"name": "Home Sales - Card", "amount": 80, "indent": 0},
+    {"name": "SINV-0003", "amount": 80, "indent": 1},
+    {"name": "Total Cash", "amount": 150, "indent": 0},
+    {"name": "Total Card", "amount": 80, "indent": 0},
+    {"name": "TOTAL", "amount": 230, "indent": 0},
+]
+
+
+class TestDCRSlipRender(FrappeTestCase):
+    def setUp(self):
+        patcher = patch.object(escpos, "get_logo_raster", return_value=b"")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_amount_line_fills_the_paper_width(self):
+        self.assertEqual(escpos.amount_line("Total Cash", 150), b"Total Cash" + b" " * 32 + b"150.00\n")
+
+        # a long label is cut, the amount never is
+        line = escpos.amount_line("Counter Sales - " + "X" * 60, 1234567.5)
+        self.assertEqual(len(line), escpos.LINE_WIDTH + 1)
+        self.assertTrue(line.endswith(b" 1234567.50\n"))
+
+    def test_slip_lists_parents_and_totals(self):
+        filters = frappe._dict(pos_profile=POS_PROFILE, from_date=BUSINESS_DATE, to_date=BUSINESS_DATE)
+        slip = escpos.render_slip(filters, DATA)
+
+        self.assertTrue(slip.startswith(escpos.INIT))
+        self.assertTrue(slip.endswith(escpos.FEED_AND_CUT))
+        self.assertIn(escpos.amount_line("Total Sales (With VAT)", 230), slip)
+        self.assertIn(escpos.amount_line("Counter Sales - Cash", 150), slip)
+        self.assertIn(escpos.amount_line("Home Sales - Card", 80), slip)
+        self.assertIn(escpos.amount_line("TOTAL", 230), slip)
+        # invoice rows stay on the screen report
+        self.assertNotIn(b"SINV-", slip)
+
+
+class TestDCRSlipLogo(FrappeTestCase):
+    def make_raster(self, image):
+        content = io.BytesIO()
+        image.save(content, "PNG")
+        file_doc = MagicMock(get_content=MagicMock(return_value=content.getvalue()))
+
+        with (
+            patch.object(escpos.frappe.db, "get_value", return_value="logo.png"),
+            patch.object(escpos.frappe, "get_doc", return_value=file_doc),
+        ):
+            return escpos.make_logo_raster("/files/logo.png")
+
+    def test_raster_burns_the_dark_dots(self):
+        # 10 x 2: the first dot of each row dark, padded to 16 dots
+        image = Image.new("RGB", (10, 2), "white")
+        image.putpixel((0, 0), (0, 0, 0))
+        image.putpixel((0, 1), (0, 0, 0))
+
+        raster = self.make_raster(image)
+
+        self.assertEqual(raster[:8], escpos.GS + b"v0\x00" + b"\x02\x00" + b"\x02\x00")
+        self.assertEqual(raster[8:], b"\x80\x00\x80\x00\n")
+
+    def test_transparent_logo_prints_white(self):
+        raster = self.make_raster(Image.new("RGBA", (8, 1), (0, 0, 0, 0)))
+
+        self.assertEqual(raster[8:], b"\x00\n")
+
+    def test_missing_logo(self):
+        with patch.object(escpos.frappe.db, "get_value", return_value=None):
+            self.assertEqual(escpos.make_logo_raster("/files/missing.png"), b"")
+
+
+class TestDCRSlipCache(FrappeTestCase):
+    """A reprint is a cache hit until a submit touches the branch's day."""
+
+    def setUp(self):
+        self.module = MagicMock()
+        self.module.execute.return_value = ([], DATA)
+        report = MagicMock(is_permitted=MagicMock(return_value=True))
+
+        for patcher in (
+            patch.object(escpos, "get_logo_raster", return_value=b""),
+            patch.object(escpos, "get_report_module", return_value=self.module),
+            patch.object(escpos.frappe, "get_doc", return_value=report),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # a new data version: no slip left from an earlier run
+        cache.invalidate({(POS_PROFILE, BUSINESS_DATE)})
+
+    def test_reprint_and_invalidation(self):
+        first = escpos.get_slip("DCR-Report", POS_PROFILE, BUSINESS_DATE)
+        self.assertEqual(escpos.get_slip("DCR-Report", POS_PROFILE, BUSINESS_DATE), first)
+        self.module.execute.assert_called_once()
+
+        cache.invalidate({(POS_PROFILE, BUSINESS_DATE)})
+        escpos.get_slip("DCR-Report", POS_PROFILE, BUSINESS_DATE)
+        self.assertEqual(self.module.execute.call_count, 2)
+
+    def test_other_reports_have_no_slip(self):
+        with self.assertRaises(Exception):
+            escpos.get_slip("DCR-Accounts", POS_PROFILE, BUSINESS_DATE)
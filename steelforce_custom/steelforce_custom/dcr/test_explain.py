@@ -0,0 +1,44 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days
+
+from steelforce_custom.steelforce_custom.dcr import generator
+from steelforce_custom.steelforce_custom.dcr.explain import get_full_scans, get_plan_failures
+
+
+TO_DATE = "2026-01-31"
+DAYS = 7
+BRANCH = f"{generator.PREFIX} Branch 1"
+
+
+class TestDCRQueryPlans(FrappeTestCase):
+    """The DCR report queries plan index reads over a generated dataset."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.filters = {
+            "from_date": add_days(TO_DATE, -(DAYS - 1)),
+            "to_date": TO_DATE,
+            "pos_profile": BRANCH,
+        }
+
+        # the generator commits; a site that ran the test before keeps its data
+        if not frappe.db.exists("Sales Invoice", {
+            "docstatus": 1,
+            "pos_profile": BRANCH,
+            "business_date": ("between", [cls.filters["from_date"], TO_DATE]),
+        }):
+            generator.generate(invoices=5000, branches=2, days=DAYS, to_date=TO_DATE)
+
+    def test_reports_use_indexes(self):
+        self.assertEqual(get_plan_failures(self.filters), [])
+
+    def test_full_index_scan_is_flagged(self):
+        # InnoDB counts through the smallest index, reading all of it
+        scans = get_full_scans("SELECT COUNT(*) FROM `tabSales Invoice`")
+
+        self.assertEqual([row.type for row in scans], ["index"])
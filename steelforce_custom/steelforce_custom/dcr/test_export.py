@@ -0,0 +1,62 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import csv
+import os
+import tempfile
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from openpyxl import load_workbook
+
+from steelforce_custom.steelforce_custom.dcr import export
+
+
+COLUMNS = [
+    {"label": "Invoice", "fieldname": "invoice", "fieldtype": "Link"},
+    {"label": "Branch", "fieldname": "pos_profile", "fieldtype": "Link"},
+    {"label": "Invoice Amount", "fieldname": "grand_total", "fieldtype": "Currency"},
+]
+ROWS = [
+    {"invoice": "SINV-0002", "pos_profile": "Branch A", "grand_total": 115.5},
+    {"invoice": "SINV-0001", "pos_profile": None, "grand_total": 0},
+]
+
+
+def iter_rows():
+    # the export reads an unbuffered cursor: the rows can be walked once only
+    for row in ROWS:
+        yield frappe._dict(row, extra="not a column")
+
+
+class TestDCRExport(FrappeTestCase):
+    """The streamed files hold the header and every row, in column order."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_write_csv(self):
+        path = os.path.join(self.tmp.name, "export.csv")
+        export.write_csv(path, COLUMNS, iter_rows())
+
+        with open(path, newline="", encoding="utf-8") as f:
+            self.assertEqual(list(csv.reader(f)), [
+                ["Invoice", "Branch", "Invoice Amount"],
+                ["SINV-0002", "Branch A", "115.5"],
+                ["SINV-0001", "", "0"],
+            ])
+
+    def test_write_xlsx(self):
+        path = os.path.join(self.tmp.name, "export.xlsx")
+        export.write_xlsx(path, "DCR-Accounts Report over a long range", COLUMNS, iter_rows())
+
+        wb = load_workbook(path, read_only=True)
+        # sheet names are limited to 31 characters
+        self.assertEqual(wb.sheetnames, ["DCR-Accounts Report over a long"])
+        self.assertEqual(list(wb.active.iter_rows(values_only=True)), [
+            ("Invoice", "Branch", "Invoice Amount"),
+            ("SINV-0002", "Branch A", 115.5),
+            ("SINV-0001", None, 0),
+        ])
+        wb.close()
@@ -0,0 +1,144 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import contextlib
+import datetime
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from steelforce_custom.steelforce_custom.dcr import pagination
+
+
+def make_row(posting_date, posting_time, invoice, grand_total=10):
+    hours, minutes, seconds = (int(part) for part in posting_time.split(":"))
+    return frappe._dict(
+        posting_date=getdate(posting_date),
+        posting_time=datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds),
+        invoice=invoice,
+        grand_total=grand_total,
+    )
+
+
+# newest first; ties on date and time are broken by name
+ROWS = [
+    make_row("2026-01-02", "10:00:00", "SINV-0007"),
+    make_row("2026-01-02", "10:00:00", "SINV-0006"),
+    make_row("2026-01-02", "10:00:00", "SINV-0005"),
+    make_row("2026-01-02", "09:30:00", "SINV-0009"),
+    make_row("2026-01-02", "09:00:00", "SINV-0004"),
+    make_row("2026-01-01", "23:00:00", "SINV-0008"),
+    make_row("2026-01-01", "23:00:00", "SINV-0003"),
+    make_row("2026-01-01", "08:00:00", "SINV-0002"),
+]
+COLUMNS = [{"label": "Invoice Amount", "fieldname": "grand_total", "fieldtype": "Currency"}]
+
+
+def get_key(row):
+    return (row.posting_date, row.posting_time, row.invoice)
+
+
+def get_query(filters, cursor=None, page_length=None):
+    # the row query of a DCR-Accounts report, run by `sql` below
+    values = {"page_length": page_length}
+    if cursor:
+        pagination.get_keyset_condition(cursor, values)
+    return "ROWS", values
+
+
+def sql(query, values=None, as_dict=False):
+    """The rows query, or the totals over it, evaluated on ROWS."""
+    rows = sorted(ROWS, key=get_key, reverse=True)
+
+    if "COUNT(*)" in query:
+        return [frappe._dict(invoices=len(rows), grand_total=sum(r.grand_total for r in rows))]
+
+    if values.get("after_date"):
+        after = make_row(values["after_date"], values["after_time"], values["after_name"])
+        rows = [r for r in rows if get_key(r) < get_key(after)]
+
+    return rows[:values["page_length"]] if values["page_length"] else rows
+
+
+class TestDCRPageCursor(FrappeTestCase):
+    def test_cursor_round_trip(self):
+        cursor = pagination.encode_cursor(ROWS[3])
+        values = {}
+
+        self.assertEqual(pagination.get_keyset_condition(cursor, values), pagination.KEYSET_CONDITION)
+        self.assertEqual(values, {"after_date": "2026-01-02", "after_time": "9:30:00", "after_name": "SINV-0009"})
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(Exception):
+            pagination.decode_cursor("not a cursor")
+
+
+class TestDCRPages(FrappeTestCase):
+    """Walking the cursors returns every row once, in report order."""
+
+    def setUp(self):
+        module = MagicMock(get_query=get_query, get_columns=MagicMock(return_value=COLUMNS))
+        report = MagicMock(is_permitted=MagicMock(return_value=True))
+
+        for patcher in (
+            patch.object(pagination, "get_report_module", return_value=module),
+            patch.object(pagination, "replica_reads", contextlib.nullcontext),
+            patch.object(pagination.frappe, "get_doc", return_value=report),
+            patch.object(pagination.frappe.db, "sql", side_effect=sql),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_pages(self, page_length):
+        pages, cursor = [], None
+        while True:
+            page = pagination.get_page("DCR-Accounts", "{}", cursor=cursor, page_length=page_length)
+            pages.append(page)
+            cursor = page["cursor"]
+            if not cursor:
+                return pages
+
+    def test_keyset_order_across_pages(self):
+        for page_length in (1, 2, 3, len(ROWS), len(ROWS) + 1):
+            with self.subTest(page_length=page_length):
+                pages = self.get_pages(page_length)
+                rows = [row.invoice for page in pages for row in page["result"]]
+
+                self.assertEqual(rows, [row.invoice for row in ROWS])
+                self.assertEqual(len(pages), -(-len(ROWS) // page_length))
+
+    def test_first_page_carries_columns_and_totals(self):
+        first, *rest = self.get_pages(3)
+
+        self.assertEqual(first["columns"], COLUMNS)
+        self.assertEqual(
+            [card["value"] for card in first["report_summary"]],
+            [len(ROWS), sum(row.grand_total for row in ROWS)],
+        )
+        self.assertTrue(all("columns" not in page for page in rest))
+
+
+class TestDCRKeysetCondition(FrappeTestCase):
+    """The SQL predicate selects exactly the rows after the cursor."""
+
+    def test_rows_after_each_cursor(self):
+        derived = " UNION ALL ".join(
+            f"SELECT DATE('{row.posting_date}') AS posting_date, TIME('{row.posting_time}') AS posting_time,"
+            f" '{row.invoice}' AS name"
+            for row in ROWS
+        )
+
+        for index, row in enumerate(ROWS):
+            with self.subTest(after=row.invoice):
+                values = {}
+                condition = pagination.get_keyset_condition(pagination.encode_cursor(row), values)
+                names = frappe.db.sql_list(f"""
+                    SELECT si.name
+                    FROM ({derived}) si
+                    WHERE {condition}
+                    ORDER BY si.posting_date DESC, si.posting_time DESC, si.name DESC
+                """, values)
+
+                self.assertEqual(names, [r.invoice for r in ROWS[index + 1:]])
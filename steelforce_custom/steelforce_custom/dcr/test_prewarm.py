@@ -0,0 +1,91 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import datetime
+from unittest.mock import MagicMock, call, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from steelforce_custom.steelforce_custom.dcr import business_date, prewarm
+
+
+# branch -> business_day_cutoff, None for the default 04:00
+CUTOFFS = {"Branch Early": "02:00:00", "Branch Default": None}
+
+
+class TestDCRPrewarmSchedule(FrappeTestCase):
+    """A branch day is warmed once its cutoff has passed, all branches once the last one has."""
+
+    def closed_days_at(self, now):
+        with (
+            patch.object(prewarm, "now_datetime", return_value=datetime.datetime.fromisoformat(now)),
+            patch.object(prewarm.frappe, "get_all", return_value=list(CUTOFFS)),
+            patch.object(business_date.frappe, "get_cached_value", side_effect=lambda dt, name, f: CUTOFFS[name]),
+            patch.object(prewarm, "queue_prewarm") as queue_prewarm,
+        ):
+            prewarm.prewarm_closed_days()
+
+        return queue_prewarm.call_args_list
+
+    def test_between_the_cutoffs(self):
+        self.assertEqual(self.closed_days_at("2026-01-02 03:00:00"), [
+            call("Branch Early", getdate("2026-01-01")),
+            call("Branch Default", getdate("2025-12-31")),
+        ])
+
+    def test_after_the_last_cutoff(self):
+        self.assertEqual(self.closed_days_at("2026-01-02 05:00:00"), [
+            call("Branch Early", getdate("2026-01-01")),
+            call("Branch Default", getdate("2026-01-01")),
+            call(None, getdate("2026-01-01")),
+        ])
+
+    def test_disabled(self):
+        with patch.dict(frappe.conf, {"dcr_prewarm_reports": 0}):
+            self.assertEqual(self.closed_days_at("2026-01-02 05:00:00"), [])
+
+
+class TestDCRPrewarmDay(FrappeTestCase):
+    def setUp(self):
+        self.modules = {}
+        for patcher in (
+            patch.object(prewarm, "get_report_module", side_effect=lambda name: self.modules.setdefault(name, MagicMock())),
+            patch.object(prewarm, "sync_payment_facts"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.done_keys = [prewarm.get_done_key(p, "2026-01-01") for p in ("Branch Early", None)]
+        frappe.cache.delete_value(self.done_keys)
+        self.addCleanup(frappe.cache.delete_value, self.done_keys)
+
+    def get_filters(self):
+        return {name: module.execute.call_args.args[0] for name, module in self.modules.items()}
+
+    def test_branch_day_runs_every_report(self):
+        prewarm.prewarm_day("Branch Early", "2026-01-01")
+
+        self.assertEqual(self.get_filters(), {
+            "DCR-Report": {"from_date": "2026-01-01", "to_date": "2026-01-01", "pos_profile": ["Branch Early"]},
+            "New DCR-Report": {"from_date": "2026-01-01", "to_date": "2026-01-01", "pos_profile": "Branch Early"},
+            "DCR-All Branches": {"from_date": "2026-01-01", "to_date": "2026-01-01", "pos_profile": ["Branch Early"]},
+        })
+        self.assertTrue(frappe.cache.get_value(self.done_keys[0]))
+
+    def test_all_branches_day(self):
+        prewarm.prewarm_day(None, "2026-01-01")
+
+        self.assertEqual(self.get_filters(), {
+            "DCR-All Branches": {"from_date": "2026-01-01", "to_date": "2026-01-01"},
+        })
+
+    def test_warmed_day_is_not_queued_again(self):
+        with patch.object(prewarm.frappe, "enqueue") as enqueue:
+            prewarm.queue_prewarm("Branch Early", getdate("2026-01-01"))
+            enqueue.assert_called_once()
+
+            prewarm.prewarm_day("Branch Early", "2026-01-01")
+            prewarm.queue_prewarm("Branch Early", getdate("2026-01-01"))
+            enqueue.assert_called_once()
@@ -0,0 +1,48 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import realtime
+
+
+class TestDCRRealtimeWatch(FrappeTestCase):
+    """A submit or cancel is only snapshotted for a view watching one of its branches."""
+
+    def test_invoice_without_advances(self):
+        doc = frappe._dict(doctype="Sales Invoice", pos_profile="Saihat", advances=[])
+
+        self.assertTrue(realtime.is_watched(doc, {"Saihat", "Qatif"}))
+        self.assertFalse(realtime.is_watched(doc, {"Qatif"}))
+        self.assertFalse(realtime.is_watched(doc, set()))
+
+    def test_payment_entry_branches(self):
+        doc = frappe._dict(doctype="Payment Entry", references=[])
+        branch_days = {("Qatif", "2026-01-01"), ("Dammam", "2026-01-02")}
+
+        with patch.object(realtime, "get_payment_entry_branch_days", return_value=branch_days):
+            self.assertTrue(realtime.is_watched(doc, {"Dammam"}))
+            self.assertFalse(realtime.is_watched(doc, {"Saihat"}))
+
+    def test_nothing_watched_resolves_nothing(self):
+        doc = frappe._dict(doctype="Payment Entry", references=[])
+
+        with patch.object(realtime, "get_payment_entry_branch_days") as get_branch_days:
+            self.assertFalse(realtime.is_watched(doc, set()))
+
+        get_branch_days.assert_not_called()
+
+    def test_unwatched_submit_takes_no_snapshot(self):
+        doc = frappe._dict(doctype="Sales Invoice", pos_profile="Saihat", advances=[], flags=frappe._dict())
+
+        with patch.object(realtime, "get_watched_branches", return_value={"Qatif"}), \
+                patch.object(realtime, "get_report_entries") as get_report_entries, \
+                patch.object(frappe, "enqueue") as enqueue:
+            realtime.snapshot_report_entries(doc, "before_submit")
+            realtime.publish_report_delta(doc, "on_submit")
+
+        get_report_entries.assert_not_called()
+        enqueue.assert_not_called()
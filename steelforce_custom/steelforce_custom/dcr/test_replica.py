@@ -0,0 +1,122 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import time
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import cint
+
+from steelforce_custom.steelforce_custom.dcr import replica
+
+
+REPLICATION_WAIT = 10
+
+
+class TestDCRReplicaReads(FrappeTestCase):
+    def setUp(self):
+        frappe.cache.delete_value(replica.LAG_CACHE_KEY)
+        self.addCleanup(frappe.cache.delete_value, replica.LAG_CACHE_KEY)
+
+    def run_with_lag(self, lag, **conf):
+        """The db `frappe.db` points to inside `replica_reads()`, and the replica connection."""
+        fake_replica = MagicMock()
+        conf = {"dcr_read_from_replica": 1, "replica_host": "replica.local", **conf}
+
+        with (
+            patch.dict(frappe.conf, conf),
+            patch("frappe.database.get_db", return_value=fake_replica),
+            patch.object(replica, "get_replica_lag", return_value=lag),
+        ):
+            with replica.replica_reads():
+                used = frappe.local.db
+
+        return used, fake_replica
+
+    def test_fresh_replica_is_used(self):
+        primary = frappe.local.db
+        used, fake_replica = self.run_with_lag(5)
+
+        self.assertIs(used, fake_replica)
+        self.assertIs(frappe.local.db, primary)
+        fake_replica.close.assert_called_once()
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        primary = frappe.local.db
+        used, fake_replica = self.run_with_lag(120)
+
+        self.assertIs(used, primary)
+        fake_replica.close.assert_called_once()
+
+    def test_stopped_replica_falls_back_to_primary(self):
+        used, _fake_replica = self.run_with_lag(-1)
+        self.assertIs(used, frappe.local.db)
+
+    def test_zero_max_lag_needs_a_caught_up_replica(self):
+        used, fake_replica = self.run_with_lag(1, dcr_replica_max_lag=0)
+        self.assertIsNot(used, fake_replica)
+
+        frappe.cache.delete_value(replica.LAG_CACHE_KEY)
+        used, fake_replica = self.run_with_lag(0, dcr_replica_max_lag=0)
+        self.assertIs(used, fake_replica)
+
+    def test_lag_check_can_be_skipped(self):
+        used, fake_replica = self.run_with_lag(-1, dcr_replica_max_lag=-1)
+        self.assertIs(used, fake_replica)
+
+
+class TestDCRReplicaConnection(FrappeTestCase):
+    """Routing against the second MariaDB instance of `replica_host`, see dcr/replica.py."""
+
+    def setUp(self):
+        if not frappe.conf.get("replica_host"):
+            self.skipTest("replica_host is not set: point it at a second local MariaDB instance to run this test")
+
+        frappe.cache.delete_value(replica.LAG_CACHE_KEY)
+        self.addCleanup(frappe.cache.delete_value, replica.LAG_CACHE_KEY)
+
+        # written and committed through the primary
+        self.marker = f"dcr_replica_test_{frappe.generate_hash(length=8)}"
+        frappe.db.set_default(self.marker, "primary")
+        frappe.db.commit()
+        self.addCleanup(self.remove_marker)
+
+    def remove_marker(self):
+        frappe.db.delete("DefaultValue", {"parent": "__default", "defkey": self.marker})
+        frappe.db.commit()
+
+    def test_reads_are_served_by_the_replica(self):
+        primary = frappe.db
+        primary_server = get_server()
+
+        with patch.dict(frappe.conf, {"dcr_read_from_replica": 1}):
+            with replica.replica_reads():
+                served_by = frappe.db
+                server = get_server()
+                marker = self.read_marker()
+
+        self.assertIsNot(served_by, primary)
+        self.assertNotEqual(server, primary_server)
+
+        if cint(frappe.conf.get("dcr_replica_max_lag")) < 0:
+            # a copy of the site, not replicating: the primary's write is not there
+            self.assertIsNone(marker)
+        else:
+            self.assertEqual(marker, "primary")
+
+    def read_marker(self):
+        """The marker as the current connection sees it, given a replica time to catch up."""
+        deadline = time.monotonic() + (REPLICATION_WAIT if cint(frappe.conf.get("dcr_replica_max_lag")) >= 0 else 0)
+
+        while True:
+            # a fresh snapshot each poll, a repeatable read would never see the row arrive
+            frappe.db.rollback()
+            marker = frappe.db.get_value("DefaultValue", {"parent": "__default", "defkey": self.marker}, "defvalue")
+            if marker is not None or time.monotonic() >= deadline:
+                return marker
+            time.sleep(0.5)
+
+
+def get_server():
+    return tuple(frappe.db.sql("SELECT @@hostname, @@port, @@server_id")[0])
@@ -0,0 +1,54 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import sales_channel
+
+
+CUSTOMERS = {
+    "Catering Client": ("Online Sales", "Commercial"),
+    "Office Account": (None, "Corporate"),
+    "HUNGER STATION": (None, "Commercial"),
+    "Walk-in Customer": (None, None),
+    "Family Account": (None, "Individual"),
+}
+CUSTOMER_GROUPS = {"Corporate": "Counter Sales", "Commercial": None, "Individual": None}
+
+
+def get_cached_value(doctype, name, fieldname):
+    if doctype == "Customer":
+        return CUSTOMERS.get(name)
+    return CUSTOMER_GROUPS.get(name)
+
+
+class TestDCRSalesChannel(FrappeTestCase):
+    """Customer channel first, then its group's, then the built-in rule."""
+
+    def setUp(self):
+        patcher = patch.object(sales_channel.frappe, "get_cached_value", side_effect=get_cached_value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resolution_order(self):
+        cases = (
+            ("Catering Client", sales_channel.ONLINE_SALES),
+            ("Office Account", sales_channel.COUNTER_SALES),
+            ("HUNGER STATION", sales_channel.ONLINE_SALES),
+            ("Walk-in Customer", sales_channel.COUNTER_SALES),
+            ("Family Account", sales_channel.HOME_SALES),
+            ("Unknown Customer", sales_channel.HOME_SALES),
+            (None, sales_channel.HOME_SALES),
+        )
+        for customer, expected in cases:
+            with self.subTest(customer=customer):
+                self.assertEqual(sales_channel.get_sales_channel(customer), expected)
+
+    def test_set_on_submit(self):
+        doc = frappe._dict(doctype="Sales Invoice", customer="Office Account")
+        sales_channel.set_sales_channel(doc)
+
+        self.assertEqual(doc.sales_channel, sales_channel.COUNTER_SALES)
@@ -0,0 +1,52 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr.test_vectorized import (
+    ADVANCES,
+    INVOICES,
+    POS_MAP,
+    PROFILES,
+    REF_MAP,
+    SO_WAREHOUSES,
+    WAREHOUSES,
+    normalize,
+)
+from steelforce_custom.steelforce_custom.report.dcr_report import dcr_report
+
+
+class TestDCRDayFolding(FrappeTestCase):
+    """Folding the facts a business day at a time builds the tree of folding them all at once."""
+
+    def setUp(self):
+        self.fact_rows = dcr_report.get_payment_fact_rows(INVOICES, POS_MAP, REF_MAP, WAREHOUSES, SO_WAREHOUSES)
+
+        # the invoices spread over three days, a later day holding earlier names
+        invoices = sorted({f.invoice for f in self.fact_rows}, reverse=True)
+        days = {}
+        for f in self.fact_rows:
+            days.setdefault(invoices.index(f.invoice) % 3, []).append(f)
+
+        self.folded = dcr_report.FoldedEntries()
+        for day in sorted(days):
+            self.folded.add_day(dcr_report.FactEntries(days[day]))
+
+    def test_branch_trees(self):
+        for pos_profile in PROFILES:
+            with self.subTest(pos_profile=pos_profile):
+                advances = [a for a in ADVANCES if a.warehouse == WAREHOUSES[pos_profile]]
+                rows = [f for f in self.fact_rows if f.pos_profile == pos_profile]
+
+                self.assertEqual(
+                    normalize(dcr_report.get_tree(self.folded.for_branch(pos_profile), advances)),
+                    normalize(dcr_report.get_tree(dcr_report.FactEntries(rows), advances)),
+                )
+
+    def test_multiple_branches(self):
+        self.assertEqual(
+            normalize(dcr_report.get_branch_tree(PROFILES, WAREHOUSES, self.folded, ADVANCES)),
+            normalize(dcr_report.get_branch_tree(
+                PROFILES, WAREHOUSES, dcr_report.FactEntries(self.fact_rows), ADVANCES
+            )),
+        )
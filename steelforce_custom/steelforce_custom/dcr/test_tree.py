@@ -0,0 +1,68 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import json
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import tree
+
+
+COLUMNS = [{"fieldname": "name"}, {"fieldname": "amount"}]
+DATA = [
+    {"name": "Counter Sales - Cash", "parent": None, "amount": 150, "indent": 0},
+    {"name": "SINV-1", "invoice": "SINV-1", "parent": "Counter Sales - Cash", "amount": 100, "indent": 1},
+    {"name": "SINV-2", "invoice": "SINV-2", "parent": "Counter Sales - Cash", "amount": 50, "indent": 1},
+    {"name": "Home Sales - Credit Sale", "parent": None, "amount": 20, "indent": 0},
+    {"name": "SINV-3", "invoice": "SINV-3", "parent": "Home Sales - Credit Sale", "amount": 20, "indent": 1},
+    {"name": "<b>TOTAL</b>", "amount": 170, "indent": 0},
+]
+FILTERS = {"from_date": "2026-01-01", "to_date": "2026-01-31"}
+
+
+class TestDCRSummaryFirst(FrappeTestCase):
+    def setUp(self):
+        self.execute = MagicMock(return_value=(COLUMNS, [dict(row) for row in DATA]))
+        self.report = MagicMock(execute=self.execute)
+
+        report_doc = MagicMock()
+        report_doc.is_permitted.return_value = True
+
+        for patcher in (
+            patch.object(tree, "get_report_module", return_value=self.report),
+            patch.object(frappe, "get_doc", return_value=report_doc),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_children(self, row, **kwargs):
+        return tree.get_children(
+            "DCR-Report", json.dumps(FILTERS), row["lazy_key"], row["name"], **kwargs
+        )
+
+    def test_summary_collapses_invoice_children(self):
+        _columns, rows = tree.summary_first(self.execute)(dict(FILTERS, summary_only=1))
+
+        self.assertEqual([row["name"] for row in rows], ["Counter Sales - Cash", "Home Sales - Credit Sale", "<b>TOTAL</b>"])
+        self.assertEqual([row.get("lazy_children") for row in rows], [2, 1, None])
+        self.assertEqual([row.get("lazy_key") for row in rows], [0, 3, None])
+
+    def test_expand_reads_the_stored_tree(self):
+        _columns, rows = tree.summary_first(self.execute)(dict(FILTERS, summary_only=1))
+        self.execute.reset_mock()
+
+        children = self.get_children(rows[0], lazy_tree=rows[0]["lazy_tree"])
+
+        self.assertEqual(children, DATA[1:3])
+        self.execute.assert_not_called()
+
+    def test_expired_tree_runs_the_report(self):
+        _columns, rows = tree.summary_first(self.execute)(dict(FILTERS, summary_only=1))
+        self.execute.reset_mock()
+
+        children = self.get_children(rows[1], lazy_tree="expired")
+
+        self.assertEqual(children, DATA[4:5])
+        self.execute.assert_called_once()
@@ -0,0 +1,170 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import unittest
+
+from frappe import _dict
+from frappe.tests.utils import FrappeTestCase
+
+from steelforce_custom.steelforce_custom.dcr import vectorized
+from steelforce_custom.steelforce_custom.report.dcr_report import dcr_report
+
+
+PROFILES = ["Dammam", "Qatif", "Saihat"]
+WAREHOUSES = {"Saihat": "WH-S", "Qatif": "WH-Q", "Dammam": None}
+SO_WAREHOUSES = {"SO-1": "WH-Q", "SO-2": "WH-S", "SO-3": "WH-Q"}
+MODE_TYPES = {"Cash": "Cash", "Cash-Saihat": "Cash", "Card": "Bank", "Mada": "Bank", "Tabby": "Bank"}
+
+
+def invoice(name, pos_profile, channel, grand_total, change_amount=0, is_return=0):
+    return _dict(
+        name=name,
+        pos_profile=pos_profile,
+        sales_channel=channel,
+        grand_total=grand_total,
+        change_amount=change_amount,
+        is_return=is_return,
+    )
+
+
+def pos(mode_of_payment, amount):
+    return _dict(mode_of_payment=mode_of_payment, mode_type=MODE_TYPES[mode_of_payment], amount=amount)
+
+
+def ref(payment_entry, mode_of_payment, amount, sales_order=None):
+    return _dict(
+        payment_entry=payment_entry,
+        mode_of_payment=mode_of_payment,
+        mode_type=MODE_TYPES[mode_of_payment],
+        amount=amount,
+        advance_voucher_type="Sales Order" if sales_order else None,
+        advance_voucher_no=sales_order,
+    )
+
+
+def advance(payment_entry, sales_order, warehouse, mode_of_payment, amount, channel="Home Sales"):
+    return _dict(
+        payment_entry=payment_entry,
+        sales_order=sales_order,
+        warehouse=warehouse,
+        mode_of_payment=mode_of_payment,
+        tender="Cash" if MODE_TYPES[mode_of_payment] == "Cash" else "Card",
+        amount=amount,
+        channel=channel,
+    )
+
+
+INVOICES = [
+    # change taken from cash, card kept
+    invoice("S-1", "Saihat", "Counter Sales", 115, change_amount=5),
+    # cash split over two cash modes
+    invoice("S-2", "Saihat", "Counter Sales", 100, change_amount=10),
+    # negative change
+    invoice("S-3", "Saihat", "Home Sales", 100, change_amount=-5),
+    # returns, signed negative; stored negative ones settle nothing
+    invoice("S-4", "Saihat", "Counter Sales", 40, change_amount=5, is_return=1),
+    invoice("S-5", "Saihat", "Online Sales", 30, is_return=1),
+    invoice("S-7", "Saihat", "Counter Sales", -40, is_return=1),
+    # a mode netting negative over POS and Payment Entry
+    invoice("S-6", "Saihat", "Online Sales", 80),
+    # valid advance, advance of another branch's warehouse, credit balance
+    invoice("Q-1", "Qatif", "Home Sales", 200),
+    invoice("Q-2", "Qatif", "Home Sales", 70),
+    # a branch without a warehouse: no advance is valid
+    invoice("D-1", "Dammam", "Counter Sales", 90),
+]
+
+POS_MAP = {
+    "S-1": [pos("Cash-Saihat", 100), pos("Card", 20)],
+    "S-2": [pos("Cash-Saihat", 60), pos("Cash", 50)],
+    "S-3": [pos("Cash", 95)],
+    "S-4": [pos("Cash-Saihat", 40)],
+    "S-7": [pos("Cash-Saihat", -40)],
+    "S-5": [pos("Mada", 30)],
+    "S-6": [pos("Mada", 50), pos("Tabby", 80)],
+    "D-1": [pos("Cash", 40)],
+}
+
+REF_MAP = {
+    "S-3": [ref("PE-3", "Card", 10)],
+    "S-6": [ref("PE-6", "Mada", -60)],
+    "Q-1": [ref("PE-1", "Card", 100, "SO-1"), ref("PE-2", "Cash", 50, "SO-2")],
+    "D-1": [ref("PE-4", "Mada", 50, "SO-1")],
+}
+
+ADVANCES = [
+    # allocated to Q-1 above: counted under the invoice only
+    advance("PE-1", "SO-1", "WH-Q", "Card", 100),
+    # not invoiced yet
+    advance("PE-5", "SO-3", "WH-Q", "Cash", 40),
+    advance("PE-7", "SO-2", "WH-S", "Card", 25, channel="Online Sales"),
+]
+
+
+def normalize(tree):
+    data, totals = tree
+    rows = [
+        (row["name"], round(row["amount"], 2), row.get("invoice"), row.get("indent"), row.get("parent"))
+        for row in data
+    ]
+    return rows, {key: round(value, 2) for key, value in totals.items()}
+
+
+@unittest.skipIf(vectorized.np is None, "NumPy is not installed")
+class TestVectorizedParity(FrappeTestCase):
+    """The NumPy backend builds the same DCR-Report tree as the row-by-row path."""
+
+    def setUp(self):
+        self.fact_rows = dcr_report.get_payment_fact_rows(INVOICES, POS_MAP, REF_MAP, WAREHOUSES, SO_WAREHOUSES)
+        self.fact_arrays = vectorized.get_payment_fact_arrays(
+            INVOICES, POS_MAP, REF_MAP, WAREHOUSES, SO_WAREHOUSES
+        )
+
+    def get_branch_rows(self, pos_profile):
+        return [f for f in self.fact_rows if f.pos_profile == pos_profile]
+
+    def get_branch_advances(self, pos_profile):
+        return [a for a in ADVANCES if WAREHOUSES[pos_profile] and a.warehouse == WAREHOUSES[pos_profile]]
+
+    def test_live_branch_trees(self):
+        for pos_profile in PROFILES:
+            with self.subTest(pos_profile=pos_profile):
+                advances = self.get_branch_advances(pos_profile)
+                expected = dcr_report.get_tree(dcr_report.FactEntries(self.get_branch_rows(pos_profile)), advances)
+
+                self.assertTrue(expected[0])
+                self.assertEqual(
+                    normalize(dcr_report.get_tree(self.fact_arrays.for_branch(pos_profile), advances)),
+                    normalize(expected),
+                )
+
+    def test_stored_branch_trees(self):
+        for pos_profile in PROFILES:
+            with self.subTest(pos_profile=pos_profile):
+                advances = self.get_branch_advances(pos_profile)
+                rows = self.get_branch_rows(pos_profile)
+
+                self.assertEqual(
+                    normalize(dcr_report.get_tree(vectorized.get_fact_arrays(rows), advances)),
+                    normalize(dcr_report.get_tree(dcr_report.FactEntries(rows), advances)),
+                )
+
+    def test_multiple_branches(self):
+        expected = dcr_report.get_branch_tree(
+            PROFILES, WAREHOUSES, dcr_report.FactEntries(self.fact_rows), ADVANCES
+        )
+
+        self.assertEqual(
+            normalize(dcr_report.get_branch_tree(PROFILES, WAREHOUSES, self.fact_arrays, ADVANCES)),
+            normalize(expected),
+        )
+
+    def test_fixtures_cover_the_settlement_cases(self):
+        data, _totals = dcr_report.get_tree(dcr_report.FactEntries(self.fact_rows), ADVANCES)
+        labels = " | ".join(row["name"] for row in data)
+
+        for label in ("Counter Sales - Return", "Sales Advance", "Credit Sale", "Online Sales - Tabby"):
+            self.assertIn(label, labels)
+
+        # the negative Mada of S-6 is dropped, so no Online Sales - Mada row
+        self.assertNotIn("Online Sales - Mada", labels)
@@ -0,0 +1,106 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+Summary-first mode of the DCR tree reports.
+
+With the `summary_only` filter a report returns its parent and total rows
+only; a parent whose children are all invoice rows carries their count
+(`lazy_children`) and its position in the full tree (`lazy_key`) instead.
+The children of the collapsed parents are kept in Redis, one hash field per
+parent under the run's `lazy_tree` id, so `get_children` returns one parent's
+rows on expand without running the report again. An expired tree falls back
+to a run (a cache hit unless a submit invalidated it).
+"""
+
+import functools
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from steelforce_custom.steelforce_custom.dcr.engine import get_report_module
+
+
+LAZY_REPORTS = ("DCR-Report", "New DCR-Report", "DCR-All Branches", "Test1")
+LAZY_TREE_PREFIX = "dcr_lazy_tree"
+LAZY_TREE_TTL = 60 * 60
+
+
+def summary_first(execute):
+    """Return only the summary of `execute(filters)` when `summary_only` is set."""
+
+    @functools.wraps(execute)
+    def wrapper(filters=None):
+        filters = frappe._dict(filters or {})
+        if not cint(filters.get("summary_only")):
+            return execute(filters)
+
+        result = list(execute(frappe._dict(filters, summary_only=0)))
+        result[1] = collapse_children(result[1])
+        return result
+
+    return wrapper
+
+
+@frappe.whitelist()
+def get_children(report_name, filters, lazy_key, parent_name, lazy_tree=None):
+    """The invoice rows under one collapsed parent of a summary-only run."""
+    if report_name not in LAZY_REPORTS:
+        frappe.throw(_("{0} has no summary-first mode").format(report_name))
+
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("You don't have access to Report: {0}").format(report_name), frappe.PermissionError)
+
+    index = cint(lazy_key)
+    if lazy_tree:
+        children = frappe.cache.hget(get_lazy_tree_key(lazy_tree), str(index))
+        if children is not None:
+            return children
+
+    filters = frappe._dict(frappe.parse_json(filters), summary_only=0)
+    data = get_report_module(report_name).execute(filters)[1]
+
+    if index >= len(data) or data[index].get("name") != parent_name:
+        frappe.throw(_("The report has changed since it was loaded, please refresh it"))
+
+    return get_child_rows(data, index)
+
+
+def collapse_children(data):
+    """The rows with invoice-only children collapsed, those children stored for `get_children`."""
+    rows = []
+    lazy_tree = frappe.generate_hash(length=12)
+    key = get_lazy_tree_key(lazy_tree)
+    index = 0
+
+    while index < len(data):
+        row = data[index]
+        children = get_child_rows(data, index)
+
+        if children and all(c.get("indent") == (row.get("indent") or 0) + 1 for c in children):
+            frappe.cache.hset(key, str(index), children)
+            rows.append(dict(row, lazy_key=index, lazy_children=len(children), lazy_tree=lazy_tree))
+            index += len(children) + 1
+        else:
+            rows.append(row)
+            index += 1
+
+    frappe.cache.expire(frappe.cache.make_key(key), LAZY_TREE_TTL)
+    return rows
+
+
+def get_lazy_tree_key(lazy_tree):
+    # per user: the id alone does not give another user the rows
+    return f"{LAZY_TREE_PREFIX}::{frappe.session.user}::{lazy_tree}"
+
+
+def get_child_rows(data, index):
+    """Rows below `data[index]` up to the next row at its level or above."""
+    indent = data[index].get("indent") or 0
+
+    end = index + 1
+    while end < len(data) and (data[end].get("indent") or 0) > indent:
+        end += 1
+
+    return data[index + 1:end]
@@ -0,0 +1,386 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+"""
+NumPy backend of the DCR-Report classification.
+
+The fetched facts are loaded once into column arrays, amounts as integer
+minor units so sums do not drift. The per-invoice settlement (valid
+advances, change taken from cash POS-first, modes kept when they net
+positive, credit balance), the grouping into parent rows and every sum then
+run as array operations. The result is the tree `engine.build_tree` builds
+from the row-by-row path, amounts equal to the currency precision.
+
+Enabled with the `dcr_vectorized_backend` site config when NumPy is
+installed; otherwise DCR-Report keeps the pure Python path.
+"""
+
+import frappe
+from frappe.utils import cint, flt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# fact kinds, in the order the row-by-row path emits them for an invoice
+ADVANCE, CASH, MODE, CREDIT = 0, 1, 2, 3
+POS, PAYMENT_ENTRY = 0, 1
+NO_TENDER, CASH_TENDER, CARD_TENDER = 0, 1, 2
+
+# rank of a fact inside its invoice: kind, then source, then row position
+KIND_STEP = 1 << 34
+SOURCE_STEP = 1 << 32
+
+
+def is_enabled():
+    return np is not None and bool(frappe.conf.get("dcr_vectorized_backend"))
+
+
+def get_scale():
+    return 10 ** (cint(frappe.get_precision("Sales Invoice", "grand_total")) or 2)
+
+
+def to_minor(values, scale):
+    return np.rint(np.array([flt(v) for v in values], dtype=np.float64) * scale).astype(np.int64)
+
+
+def group_sum(index, values, size):
+    out = np.zeros(size, dtype=np.int64)
+    np.add.at(out, index, values)
+    return out
+
+
+class StringTable:
+    """Interned strings (and None) behind the integer codes of the arrays."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, values):
+        codes = self.codes
+        encoded = np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.int64)
+        self.values = list(codes)
+        return encoded
+
+    def __getitem__(self, code):
+        return self.values[code] if code >= 0 else None
+
+
+class FactArrays:
+    """Settlement facts as columns, one position per fact."""
+
+    COLUMNS = (
+        "inv", "rank", "invoice", "pos_profile", "channel", "is_return",
+        "kind", "mode", "sales_order", "payment_entry", "tender_cash", "amount",
+    )
+
+    def __init__(self, strings, scale, **columns):
+        self.strings = strings
+        self.scale = scale
+        for column in self.COLUMNS:
+            setattr(self, column, columns[column])
+
+    def __len__(self):
+        return len(self.amount)
+
+    def take(self, index):
+        return FactArrays(
+            self.strings, self.scale, **{c: getattr(self, c)[index] for c in self.COLUMNS}
+        )
+
+    def for_branch(self, pos_profile):
+        return self.take(self.pos_profile == self.strings.codes.get(pos_profile, -2))
+
+
+# -------------------------------------------------
+# LOAD
+# -------------------------------------------------
+def get_payment_fact_arrays(invoices, pos_map, ref_map, warehouses, so_warehouses):
+    """
+    `engine.get_payment_facts` for every invoice at once. An allocated Sales
+    Order advance is valid when the order's warehouse is the branch's.
+    """
+    strings = StringTable()
+    scale = get_scale()
+
+    grand = to_minor([inv.grand_total for inv in invoices], scale)
+    change = to_minor([inv.change_amount for inv in invoices], scale)
+    is_return = np.array([bool(inv.is_return) for inv in invoices], dtype=bool)
+    multiplier = np.where(is_return & (grand > 0), -1, 1)
+    invoice = strings.encode([inv.name for inv in invoices])
+    pos_profile = strings.encode([inv.pos_profile for inv in invoices])
+    channel = strings.encode([inv.sales_channel for inv in invoices])
+
+    # payment rows, references before POS payments as the row-by-row path reads
+    # them; a row's position is its order inside the invoice
+    refs = [(i, r) for i, inv in enumerate(invoices) for r in ref_map.get(inv.name, ())]
+    payments = refs + [(i, p) for i, inv in enumerate(invoices) for p in pos_map.get(inv.name, ())]
+
+    inv_warehouse = [warehouses.get(inv.pos_profile) for inv in invoices]
+    ref_advance = [
+        r.advance_voucher_type == "Sales Order"
+        and bool(inv_warehouse[i])
+        and so_warehouses.get(r.advance_voucher_no) == inv_warehouse[i]
+        for i, r in refs
+    ]
+
+    p_inv = np.array([i for i, _r in payments], dtype=np.int64)
+    p_source = np.repeat(np.array([PAYMENT_ENTRY, POS]), [len(refs), len(payments) - len(refs)])
+    p_seq = np.arange(len(payments), dtype=np.int64)
+    p_mode = strings.encode([r.mode_of_payment for _i, r in payments])
+    p_cash = np.array([r.mode_type == "Cash" for _i, r in payments], dtype=bool)
+    p_amount = to_minor([r.amount for _i, r in payments], scale)
+    p_advance = np.zeros(len(payments), dtype=bool)
+    p_advance[:len(refs)] = ref_advance
+    p_so = np.where(p_advance, strings.encode([r.get("advance_voucher_no") for _i, r in payments]), -1)
+    p_pe = strings.encode([r.get("payment_entry") for _i, r in payments])
+
+    n = len(invoices)
+    facts = []
+
+    # ---- ADVANCES ----
+    adv = np.flatnonzero(p_advance)
+    advance_total = group_sum(p_inv[adv], p_amount[adv], n)
+    facts.append(dict(
+        inv=p_inv[adv], kind=ADVANCE, sub=p_seq[adv], mode=p_mode[adv], sales_order=p_so[adv],
+        payment_entry=p_pe[adv], tender_cash=p_cash[adv], amount=p_amount[adv] * multiplier[p_inv[adv]],
+    ))
+
+    # ---- CASH, CHANGE DEDUCTED ONCE (POS FIRST, NOT FOR RETURNS) ----
+    cash = np.flatnonzero(~p_advance & p_cash)
+    cash = cash[np.lexsort((p_seq[cash], p_source[cash], p_inv[cash]))]
+    cash_inv = p_inv[cash]
+    cash_amount = p_amount[cash]
+
+    positive = np.maximum(cash_amount, 0)
+    first_of_invoice = np.r_[True, cash_inv[1:] != cash_inv[:-1]] if len(cash) else np.zeros(0, dtype=bool)
+    before = np.cumsum(positive) - positive
+    before -= before[first_of_invoice][np.cumsum(first_of_invoice) - 1]
+
+    cash_paid = group_sum(cash_inv, cash_amount, n)
+    apply = ~is_return & (cash_paid > 0) & (change != 0)
+    row_change = change[cash_inv]
+    deduct = np.where(
+        row_change >= 0,
+        np.clip(row_change - before, 0, positive),
+        np.where(first_of_invoice, row_change, 0),
+    )
+    cash_amount = cash_amount - np.where(apply[cash_inv], deduct, 0)
+    cash_paid = np.where(apply, np.maximum(cash_paid - change, 0), cash_paid)
+
+    emit = (cash_paid[cash_inv] > 0) & (cash_amount != 0)
+    cash, cash_inv, cash_amount = cash[emit], cash_inv[emit], cash_amount[emit]
+    facts.append(dict(
+        inv=cash_inv, kind=CASH, sub=p_source[cash] * SOURCE_STEP + p_seq[cash], mode=p_mode[cash],
+        sales_order=np.full(len(cash), -1), payment_entry=p_pe[cash], tender_cash=np.ones(len(cash), dtype=bool),
+        amount=cash_amount * multiplier[cash_inv],
+    ))
+
+    # ---- OTHER MODES PER SOURCE, KEPT WHEN THE MODE NETS POSITIVE ----
+    other = np.flatnonzero(~p_advance & ~p_cash)
+    groups, first, inverse = np.unique(
+        np.stack([p_inv[other], p_source[other], p_mode[other]], axis=1).reshape(-1, 3),
+        axis=0, return_index=True, return_inverse=True,
+    )
+    group_amount = group_sum(inverse.reshape(-1), p_amount[other], len(groups))
+    first = other[first]
+
+    _modes, mode_of_group = np.unique(groups[:, [0, 2]], axis=0, return_inverse=True)
+    mode_of_group = mode_of_group.reshape(-1)
+    mode_total = group_sum(mode_of_group, group_amount, len(_modes))
+    other_total = group_sum(groups[:, 0], group_amount, n)
+
+    emit = mode_total[mode_of_group] > 0
+    group_inv = groups[emit, 0]
+    facts.append(dict(
+        inv=group_inv, kind=MODE, sub=p_seq[first[emit]], mode=groups[emit, 2],
+        sales_order=np.full(len(group_inv), -1), payment_entry=p_pe[first[emit]],
+        tender_cash=np.zeros(len(group_inv), dtype=bool), amount=group_amount[emit] * multiplier[group_inv],
+    ))
+
+    # ---- CREDIT ----
+    balance = grand - advance_total - cash_paid - other_total
+    credit = np.flatnonzero(balance > 0)
+    facts.append(dict(
+        inv=credit, kind=CREDIT, sub=np.zeros(len(credit), dtype=np.int64), mode=np.full(len(credit), -1),
+        sales_order=np.full(len(credit), -1), payment_entry=np.full(len(credit), -1),
+        tender_cash=np.zeros(len(credit), dtype=bool), amount=balance[credit] * multiplier[credit],
+    ))
+
+    fact_inv = np.concatenate([f["inv"] for f in facts]).astype(np.int64)
+    return FactArrays(
+        strings,
+        scale,
+        inv=fact_inv,
+        rank=np.concatenate([f["kind"] * KIND_STEP + f["sub"] for f in facts]).astype(np.int64),
+        invoice=invoice[fact_inv],
+        pos_profile=pos_profile[fact_inv],
+        channel=channel[fact_inv],
+        is_return=is_return[fact_inv],
+        kind=np.concatenate([np.full(len(f["inv"]), f["kind"]) for f in facts]).astype(np.int64),
+        mode=np.concatenate([f["mode"] for f in facts]).astype(np.int64),
+        sales_order=np.concatenate([f["sales_order"] for f in facts]).astype(np.int64),
+        payment_entry=np.concatenate([f["payment_entry"] for f in facts]).astype(np.int64),
+        tender_cash=np.concatenate([f["tender_cash"] for f in facts]).astype(bool),
+        amount=np.concatenate([f["amount"] for f in facts]).astype(np.int64),
+    )
+
+
+def get_fact_arrays(fact_rows):
+    """Stored `DCR Payment Fact` rows (ordered by invoice) as columns."""
+    strings = StringTable()
+    scale = get_scale()
+
+    invoice = strings.encode([f.invoice for f in fact_rows])
+    source = [f.source for f in fact_rows]
+    tender_cash = np.array([f.tender == "Cash" for f in fact_rows], dtype=bool)
+    kind = np.array([
+        ADVANCE if s == "Advance" else CREDIT if s == "Credit" else CASH if cash else MODE
+        for s, cash in zip(source, tender_cash)
+    ], dtype=np.int64)
+
+    new_invoice = np.r_[True, invoice[1:] != invoice[:-1]] if len(invoice) else np.zeros(0, dtype=bool)
+
+    return FactArrays(
+        strings,
+        scale,
+        inv=np.cumsum(new_invoice) - 1,
+        rank=np.arange(len(fact_rows), dtype=np.int64),
+        invoice=invoice,
+        pos_profile=strings.encode([f.pos_profile for f in fact_rows]),
+        channel=strings.encode([f.channel for f in fact_rows]),
+        is_return=np.array([bool(f.is_return) for f in fact_rows], dtype=bool),
+        kind=kind,
+        mode=strings.encode([f.mode_of_payment for f in fact_rows]),
+        sales_order=np.where(kind == ADVANCE, strings.encode([f.sales_order for f in fact_rows]), -1),
+        payment_entry=strings.encode([f.payment_entry for f in fact_rows]),
+        tender_cash=tender_cash,
+        amount=to_minor([f.amount for f in fact_rows], scale),
+    )
+
+
+# -------------------------------------------------
+# TREE
+# -------------------------------------------------
+def build_fact_tree(facts, advances, color_parent_name=None):
+    """`engine.build_tree(get_entries(fact_rows, advances))` of DCR-Report, on the arrays."""
+    strings, scale = facts.strings, facts.scale
+    f = facts.take(np.lexsort((facts.rank, facts.inv)))
+
+    # ---- PARENT LABEL PER FACT (ONE STRING PER DISTINCT COMBINATION) ----
+    combos, combo_of = np.unique(
+        np.stack([f.channel, f.is_return.astype(np.int64), f.kind, f.mode], axis=1).reshape(-1, 4),
+        axis=0, return_inverse=True,
+    )
+    parent_ids = {}
+    combo_parent = np.array([
+        parent_ids.setdefault(get_parent_label(strings, *combo), len(parent_ids))
+        for combo in combos.tolist()
+    ], dtype=np.int64)
+    fact_parent = combo_parent[combo_of.reshape(-1)]
+
+    # ---- ENTRIES: (parent, invoice, name) IN FIRST-SEEN ORDER ----
+    name = np.where(f.kind == ADVANCE, f.sales_order, -1)
+    keys, first, inverse = np.unique(
+        np.stack([fact_parent, f.invoice, name], axis=1).reshape(-1, 3),
+        axis=0, return_index=True, return_inverse=True,
+    )
+    entry_amount = group_sum(inverse.reshape(-1), f.amount, len(keys))
+    order = np.argsort(first, kind="stable")
+    keys, first, entry_amount = keys[order], first[order], entry_amount[order]
+
+    tender = np.where(
+        f.kind == CASH, CASH_TENDER,
+        np.where(f.kind == MODE, CARD_TENDER, np.where((f.kind == ADVANCE) & f.tender_cash, CASH_TENDER, NO_TENDER)),
+    )
+    is_advance = f.kind[first] == ADVANCE
+    entries = [
+        (parent, strings[invoice_name if not advance else so], None if advance else strings[invoice_name],
+            amount, strings[channel], entry_tender)
+        for (parent, invoice_name, so), advance, amount, channel, entry_tender in zip(
+            keys.tolist(), is_advance.tolist(), entry_amount.tolist(),
+            f.channel[first].tolist(), tender[first].tolist(),
+        )
+    ]
+
+    # ---- UNALLOCATED ADVANCES (NOT YET INVOICED) ----
+    allocated = {strings[c] for c in np.unique(f.payment_entry[f.kind == ADVANCE]).tolist()}
+    unallocated = {}
+    for adv in advances:
+        if adv.payment_entry in allocated:
+            continue
+
+        label = f"{adv.channel} - Sales Advance - {adv.mode_of_payment}"
+        unallocated[(adv.payment_entry, adv.sales_order)] = (
+            parent_ids.setdefault(label, len(parent_ids)), adv.sales_order, None,
+            int(round(flt(adv.amount) * scale)), adv.channel,
+            CASH_TENDER if adv.tender == "Cash" else NO_TENDER,
+        )
+    entries.extend(unallocated.values())
+
+    return get_tree_rows(entries, parent_ids, scale, color_parent_name)
+
+
+def get_tree_rows(entries, parent_ids, scale, color_parent_name):
+    labels = list(parent_ids)
+    entry_parent = np.array([e[0] for e in entries], dtype=np.int64)
+    entry_amount = np.array([e[3] for e in entries], dtype=np.int64)
+
+    parent_amount = group_sum(entry_parent, entry_amount, len(labels))
+    parent_rank = np.empty(len(labels), dtype=np.int64)
+    parent_rank[sorted(range(len(labels)), key=lambda p: labels[p])] = np.arange(len(labels))
+
+    data = []
+    totals = frappe._dict(grand_total=0, total_cash=0, total_card=0)
+    current = None
+
+    for index in np.argsort(parent_rank[entry_parent], kind="stable").tolist():
+        parent, name, invoice, amount, channel, tender = entries[index]
+
+        if parent != current:
+            current = parent
+            label = labels[parent]
+            amt = int(parent_amount[parent]) / scale
+
+            data.append({
+                "name": color_parent_name(label) if color_parent_name else label,
+                "parent": None,
+                "amount": amt,
+                "indent": 0,
+            })
+
+            totals.grand_total += amt
+            # the first entry of a parent decides its Counter + Home bucket
+            if channel in ("Counter Sales", "Home Sales"):
+                if tender == CASH_TENDER:
+                    totals.total_cash += amt
+                elif tender == CARD_TENDER:
+                    totals.total_card += amt
+
+        if not amount:
+            continue
+
+        data.append({
+            "name": name,
+            "invoice": invoice,
+            "parent": labels[parent],
+            "amount": amount / scale,
+            "indent": 1,
+        })
+
+    return data, totals
+
+
+def get_parent_label(strings, channel, is_return, kind, mode):
+    sales_type = f"{strings[channel]} - Return" if is_return else f"{strings[channel]}"
+
+    if kind == ADVANCE:
+        return f"{sales_type} - Sales Advance - {strings[mode]}"
+    if kind == CREDIT:
+        return f"{sales_type} - Credit Sale"
+    if kind == CASH:
+        return f"{sales_type} - Cash"
+    return f"{sales_type} - {strings[mode]}"
@@ -0,0 +1,44 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from steelforce_custom.steelforce_custom.dcr.mode_of_payment import clear_mode_of_payment_map
+
+
+class DCRModeofPaymentMap(Document):
+	def validate(self):
+		self.validate_duplicate()
+
+	def validate_duplicate(self):
+		"""A mode is mapped either once for all branches or once per branch, never both."""
+		branches = frappe.get_all(
+			"DCR Mode of Payment Map",
+			filters={"mode_of_payment": self.mode_of_payment, "name": ("!=", self.name)},
+			pluck="pos_profile",
+		)
+		if not branches:
+			return
+
+		if not self.pos_profile:
+			frappe.throw(_("{0} is already mapped for some branches").format(self.mode_of_payment))
+
+		if not all(branches):
+			frappe.throw(_("{0} is already mapped for all branches").format(self.mode_of_payment))
+
+		if self.pos_profile in branches:
+			frappe.throw(
+				_("{0} is already mapped for {1}").format(self.mode_of_payment, self.pos_profile)
+			)
+
+	def on_update(self):
+		clear_mode_of_payment_map()
+
+	def on_trash(self):
+		clear_mode_of_payment_map()
+
+
+def on_doctype_update():
+	frappe.db.add_index("DCR Mode of Payment Map", ["mode_of_payment", "pos_profile"])
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class DCRPaymentFact(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("DCR Payment Fact", ["pos_profile", "business_date"])
+	frappe.db.add_index("DCR Payment Fact", ["warehouse", "business_date"])
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class DCRSalesAdvance(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("DCR Sales Advance", ["warehouse", "business_date"])
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, siva and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ReportProfileLog(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Report Profile Log", ["report_name", "creation"])
@@ -2,42 +2,23 @@
 # For license information, please see license.txt
 
 import frappe
+from frappe.utils import cint
 
+from steelforce_custom.steelforce_custom.dcr.cache import cached_report
+from steelforce_custom.steelforce_custom.dcr.mode_of_payment import get_payment_pivot
+from steelforce_custom.steelforce_custom.dcr.pagination import get_keyset_condition
 
+
+@cached_report("DCR-Accounts")
 def execute(filters=None):
     filters = filters or {}
 
-    conditions = []
-    values = {}
-
-    # -------------------------
-    # DATE FILTER
-    # -------------------------
-    if filters.get("from_date") and filters.get("to_date"):
-        conditions.append("si.posting_date BETWEEN %(from_date)s AND %(to_date)s")
-        values["from_date"] = filters["from_date"]
-        values["to_date"] = filters["to_date"]
-
-    # -------------------------
-    # POS PROFILE MULTI SELECT
-    # -------------------------
-    if filters.get("pos_profile"):
-        pos_profiles = filters.get("pos_profile")
-
-        if isinstance(pos_profiles, str):
-            pos_profiles = [p.strip() for p in pos_profiles.split(",") if p.strip()]
-
-        conditions.append("si.pos_profile IN %(pos_profiles)s")
-        values["pos_profiles"] = tuple(pos_profiles)
+    query, values = get_query(filters)
+    return get_columns(), frappe.db.sql(query, values, as_dict=True)
 
-    where_clause = " AND ".join(conditions)
-    if where_clause:
-        where_clause = " AND " + where_clause
 
-    # -------------------------
-    # COLUMNS
-    # -------------------------
-    columns = [
+def get_columns():
+    return [
         {"label": "Date", "fieldname": "posting_date", "fieldtype": "Date", "width": 110},
         {
             "label": "Branch",
@@ -72,49 +53,85 @@ def execute(filters=None):
         {"label": "TO YOU", "fieldname": "to_you", "fieldtype": "Currency", "width": 120},
     ]
 
+
+def get_query(filters, cursor=None, page_length=None):
+    """
+    The row query and its values, shared by execute, the streaming export
+    and the paginated mode (keyset `cursor`, `page_length` rows).
+    """
+    conditions = []
+    values = {}
+
+    # -------------------------
+    # BUSINESS DAY FILTER
+    # -------------------------
+    if filters.get("from_date") and filters.get("to_date"):
+        conditions.append("si.business_date BETWEEN %(from_date)s AND %(to_date)s")
+        values["from_date"] = filters["from_date"]
+        values["to_date"] = filters["to_date"]
+
+    # -------------------------
+    # POS PROFILE MULTI SELECT
+    # -------------------------
+    if filters.get("pos_profile"):
+        pos_profiles = filters.get("pos_profile")
+
+        if isinstance(pos_profiles, str):
+            pos_profiles = [p.strip() for p in pos_profiles.split(",") if p.strip()]
+
+        conditions.append("si.pos_profile IN %(pos_profiles)s")
+        values["pos_profiles"] = tuple(pos_profiles)
+
+    # -------------------------
+    # PAGINATED MODE: KEYSET AFTER THE LAST ROW
+    # -------------------------
+    if cursor:
+        conditions.append(get_keyset_condition(cursor, values))
+
+    limit_clause = f"LIMIT {cint(page_length)}" if page_length else ""
+
+    where_clause = " AND ".join(conditions)
+    if where_clause:
+        where_clause = " AND " + where_clause
+
     # -------------------------
     # DATA QUERY
     # -------------------------
-    data = frappe.db.sql(f"""
+    query = f"""
         SELECT
             si.posting_date,
+            si.posting_time,
             si.pos_profile,
             si.name AS invoice,
             si.grand_total,
 
             /* WALK-IN CASH */
             CASE
-                WHEN si.customer = 'Walk-in Customer'
-                 AND EXISTS (
-                    SELECT 1 FROM `tabSales Invoice Payment` p
-                    WHERE p.parent = si.name AND p.mode_of_payment LIKE 'Cash%%'
-                 )
-                THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(card.card_amount,0)
+                WHEN si.sales_channel = 'Counter Sales'
+                 AND pay.has_cash
+                THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(pay.card_amount,0)
                 ELSE 0
             END AS walkin_cash,
 
             /* WALK-IN CARD */
             CASE
-                WHEN si.customer = 'Walk-in Customer'
-                THEN IFNULL(card.card_amount,0)
+                WHEN si.sales_channel = 'Counter Sales'
+                THEN IFNULL(pay.card_amount,0)
                 ELSE 0
             END AS walkin_card,
 
             /* HOME CASH */
             CASE
-                WHEN si.customer NOT IN ('HUNGER STATION','KETA','JAHEZ','TO YOU','Walk-in Customer')
-                 AND EXISTS (
-                    SELECT 1 FROM `tabSales Invoice Payment` p
-                    WHERE p.parent = si.name AND p.mode_of_payment LIKE 'Cash%%'
-                 )
-                THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(card.card_amount,0)
+                WHEN si.sales_channel = 'Home Sales'
+                 AND pay.has_cash
+                THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(pay.card_amount,0)
                 ELSE 0
             END AS home_cash,
 
             /* HOME CARD */
             CASE
-                WHEN si.customer NOT IN ('HUNGER STATION','KETA','JAHEZ','TO YOU','Walk-in Customer')
-                THEN IFNULL(card.card_amount,0)
+                WHEN si.sales_channel = 'Home Sales'
+                THEN IFNULL(pay.card_amount,0)
                 ELSE 0
             END AS home_card,
 
@@ -126,17 +143,14 @@ def execute(filters=None):
 
         FROM `tabSales Invoice` si
 
-        LEFT JOIN (
-            SELECT parent, SUM(amount) AS card_amount
-            FROM `tabSales Invoice Payment`
-            WHERE mode_of_payment = 'Card'
-            GROUP BY parent
-        ) card ON card.parent = si.name
+        /* POS PAYMENTS, ONE PIVOT ROW PER INVOICE (DCR Mode of Payment Map) */
+        LEFT JOIN ({get_payment_pivot(where_clause)}) pay ON pay.parent = si.name
 
         WHERE si.docstatus = 1
         {where_clause}
 
-        ORDER BY si.posting_date DESC, si.name DESC
-    """, values, as_dict=True)
+        ORDER BY si.posting_date DESC, si.posting_time DESC, si.name DESC
+        {limit_clause}
+    """
 
-    return columns, data
+    return query, values
@@ -26,6 +26,23 @@ frappe.query_reports["DCR-Accounts Report"] = {
             get_data: function (txt) {
                 return frappe.db.get_link_options("POS Profile", txt);
             }
+        },
+        {
+            fieldname: "profile",
+            label: __("Profile"),
+            fieldtype: "Check",
+            hidden: 1
         }
-    ]
+    ],
+
+    onload: function (report) {
+        /* LONG RANGES: BRANCH × DAY CHUNKS ON THE WORKERS */
+        steelforce_custom.dcr.add_background_button(report);
+
+        /* LONG RANGES: STREAMED CSV / XLSX FILE */
+        steelforce_custom.dcr.add_export_button(report);
+
+        /* LONG RANGES: KEYSET PAGES INSTEAD OF EVERY ROW */
+        steelforce_custom.dcr.add_pagination(report);
+    }
 };
@@ -2,24 +2,58 @@
 # For license information, please see license.txt
 
 import frappe
+from frappe.utils import cint
 
+from steelforce_custom.steelforce_custom.dcr.cache import cached_report
+from steelforce_custom.steelforce_custom.dcr.mode_of_payment import get_payment_pivot
+from steelforce_custom.steelforce_custom.dcr.pagination import get_keyset_condition
 
+
+@cached_report("DCR-Accounts Report")
 def execute(filters=None):
     filters = filters or {}
+    return get_columns(), get_chunk(filters)
+
+
+def get_columns():
+    return [
+        {"label": "Date", "fieldname": "posting_date", "fieldtype": "Date", "width": 110},
+        {"label": "Branch", "fieldname": "pos_profile", "fieldtype": "Link", "options": "POS Profile", "width": 80},
+        {"label": "Invoice", "fieldname": "invoice", "fieldtype": "Link", "options": "Sales Invoice", "width": 120},
+        {"label": "Invoice Amount", "fieldname": "grand_total", "fieldtype": "Currency", "width": 140},
+
+        {"label": "Walk-in Cash", "fieldname": "walkin_cash", "fieldtype": "Currency", "width": 120},
+        {"label": "Walk-in Card", "fieldname": "walkin_card", "fieldtype": "Currency", "width": 120},
+
+        {"label": "Home Cash", "fieldname": "home_cash", "fieldtype": "Currency", "width": 120},
+        {"label": "Home Card", "fieldname": "home_card", "fieldtype": "Currency", "width": 120},
+        {"label": "Home Credit", "fieldname": "home_credit", "fieldtype": "Currency", "width": 120},
+
+        {"label": "HUNGER STATION", "fieldname": "hunger_station", "fieldtype": "Currency", "width": 150},
+        {"label": "KEETA", "fieldname": "keeta", "fieldtype": "Currency", "width": 120},
+        {"label": "JAHEZ", "fieldname": "jahez", "fieldtype": "Currency", "width": 120},
+        {"label": "TO YOU", "fieldname": "to_you", "fieldtype": "Currency", "width": 120},
+    ]
 
+
+def get_chunk(filters):
+    query, values = get_query(filters)
+    return frappe.db.sql(query, values, as_dict=True)
+
+
+def get_query(filters, cursor=None, page_length=None):
+    """
+    The row query and its values, shared by execute, chunks, the streaming
+    export and the paginated mode (keyset `cursor`, `page_length` rows).
+    """
     conditions = []
     values = {}
 
     # -------------------------
-    # BUSINESS DAY (03:00 → 03:00)
+    # BUSINESS DAY (PER BRANCH CUTOFF)
     # -------------------------
     if filters.get("from_date") and filters.get("to_date"):
-        conditions.append("""
-            TIMESTAMP(si.posting_date, si.posting_time) BETWEEN
-            TIMESTAMP(%(from_date)s, '03:00:00')
-            AND
-            TIMESTAMP(DATE_ADD(%(to_date)s, INTERVAL 1 DAY), '03:00:00')
-        """)
+        conditions.append("si.business_date BETWEEN %(from_date)s AND %(to_date)s")
         values["from_date"] = filters["from_date"]
         values["to_date"] = filters["to_date"]
 
@@ -36,38 +70,25 @@ def execute(filters=None):
             conditions.append("si.pos_profile IN %(pos_profiles)s")
             values["pos_profiles"] = tuple(pos_profiles)
 
-    where_clause = " AND ".join(conditions)
-    if where_clause:
-        where_clause = " AND " + where_clause
-
     # -------------------------
-    # COLUMNS
+    # PAGINATED MODE: KEYSET AFTER THE LAST ROW
     # -------------------------
-    columns = [
-        {"label": "Date", "fieldname": "posting_date", "fieldtype": "Date", "width": 110},
-        {"label": "Branch", "fieldname": "pos_profile", "fieldtype": "Link", "options": "POS Profile", "width": 80},
-        {"label": "Invoice", "fieldname": "invoice", "fieldtype": "Link", "options": "Sales Invoice", "width": 120},
-        {"label": "Invoice Amount", "fieldname": "grand_total", "fieldtype": "Currency", "width": 140},
+    if cursor:
+        conditions.append(get_keyset_condition(cursor, values))
 
-        {"label": "Walk-in Cash", "fieldname": "walkin_cash", "fieldtype": "Currency", "width": 120},
-        {"label": "Walk-in Card", "fieldname": "walkin_card", "fieldtype": "Currency", "width": 120},
+    limit_clause = f"LIMIT {cint(page_length)}" if page_length else ""
 
-        {"label": "Home Cash", "fieldname": "home_cash", "fieldtype": "Currency", "width": 120},
-        {"label": "Home Card", "fieldname": "home_card", "fieldtype": "Currency", "width": 120},
-        {"label": "Home Credit", "fieldname": "home_credit", "fieldtype": "Currency", "width": 120},
-
-        {"label": "HUNGER STATION", "fieldname": "hunger_station", "fieldtype": "Currency", "width": 150},
-        {"label": "KEETA", "fieldname": "keeta", "fieldtype": "Currency", "width": 120},
-        {"label": "JAHEZ", "fieldname": "jahez", "fieldtype": "Currency", "width": 120},
-        {"label": "TO YOU", "fieldname": "to_you", "fieldtype": "Currency", "width": 120},
-    ]
+    where_clause = " AND ".join(conditions)
+    if where_clause:
+        where_clause = " AND " + where_clause
 
     # -------------------------
     # DATA QUERY
     # -------------------------
-    data = frappe.db.sql(f"""
+    query = f"""
         SELECT
             si.posting_date,
+            si.posting_time,
             si.pos_profile,
             si.name AS invoice,
             si.grand_total,
@@ -76,29 +97,16 @@ def execute(filters=None):
                WALK-IN CASH (POS)
             ==========================*/
             CASE
-                WHEN si.customer = 'Walk-in Customer'
-                 AND (
-                     (si.pos_profile = 'Saihat' AND EXISTS (
-                         SELECT 1 FROM `tabSales Invoice Payment`
-                         WHERE parent = si.name AND mode_of_payment = 'Cash-Saihat'
-                     ))
-                  OR (si.pos_profile = 'Faisaliya' AND EXISTS (
-                         SELECT 1 FROM `tabSales Invoice Payment`
-                         WHERE parent = si.name AND mode_of_payment = 'Cash-FA'
-                     ))
-                  OR (si.pos_profile = 'Doha' AND EXISTS (
-                         SELECT 1 FROM `tabSales Invoice Payment`
-                         WHERE parent = si.name AND mode_of_payment = 'Cash-Doha'
-                     ))
-                 )
-                THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(card.card_amount,0)
+                WHEN si.sales_channel = 'Counter Sales'
+                 AND pay.has_cash
+                THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(pay.card_amount,0)
                 ELSE 0
             END AS walkin_cash,
 
             /* WALK-IN CARD */
             CASE
-                WHEN si.customer = 'Walk-in Customer'
-                THEN IFNULL(card.card_amount,0)
+                WHEN si.sales_channel = 'Counter Sales'
+                THEN IFNULL(pay.card_amount,0)
                 ELSE 0
             END AS walkin_card,
 
@@ -106,30 +114,17 @@ def execute(filters=None):
                HOME CASH (POS OR PAYMENT ENTRY)
             ==========================*/
             CASE
-                WHEN si.customer NOT IN ('HUNGER STATION','KETA','JAHEZ','TO YOU','Walk-in Customer')
+                WHEN si.sales_channel = 'Home Sales'
                  AND (
                      /* POS CASH */
-                     (
-                         (si.pos_profile = 'Saihat' AND EXISTS (
-                             SELECT 1 FROM `tabSales Invoice Payment`
-                             WHERE parent = si.name AND mode_of_payment = 'Cash-Saihat'
-                         ))
-                      OR (si.pos_profile = 'Faisaliya' AND EXISTS (
-                             SELECT 1 FROM `tabSales Invoice Payment`
-                             WHERE parent = si.name AND mode_of_payment = 'Cash-FA'
-                         ))
-                      OR (si.pos_profile = 'Doha' AND EXISTS (
-                             SELECT 1 FROM `tabSales Invoice Payment`
-                             WHERE parent = si.name AND mode_of_payment = 'Cash-Doha'
-                         ))
-                     )
+                     pay.has_cash
                      /* PAYMENT ENTRY CASH */
                      OR pe_pay.mop = 'Cash'
                  )
                 THEN
                     CASE
-                        WHEN IFNULL(card.card_amount,0) > 0
-                        THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(card.card_amount,0)
+                        WHEN IFNULL(pay.card_amount,0) > 0
+                        THEN (IFNULL(si.paid_amount,0) - IFNULL(si.change_amount,0)) - IFNULL(pay.card_amount,0)
                         ELSE IFNULL(pe_pay.paid_amount, si.grand_total)
                     END
                 ELSE 0
@@ -139,15 +134,15 @@ def execute(filters=None):
                HOME CARD (POS OR PAYMENT ENTRY)
             ==========================*/
             CASE
-                WHEN si.customer NOT IN ('HUNGER STATION','KETA','JAHEZ','TO YOU','Walk-in Customer')
+                WHEN si.sales_channel = 'Home Sales'
                  AND (
-                     IFNULL(card.card_amount,0) > 0
+                     IFNULL(pay.card_amount,0) > 0
                      OR pe_pay.mop = 'Card'
                  )
                 THEN
                     CASE
-                        WHEN IFNULL(card.card_amount,0) > 0
-                        THEN card.card_amount
+                        WHEN IFNULL(pay.card_amount,0) > 0
+                        THEN pay.card_amount
                         ELSE IFNULL(pe_pay.paid_amount, si.grand_total)
                     END
                 ELSE 0
@@ -157,15 +152,8 @@ def execute(filters=None):
                HOME CREDIT (ONLY IF NO POS & NO PE)
             ==========================*/
             CASE
-                WHEN si.customer NOT IN ('HUNGER STATION','KETA','JAHEZ','TO YOU','Walk-in Customer')
-                 AND NOT EXISTS (
-                    SELECT 1 FROM `tabSales Invoice Payment`
-                    WHERE parent = si.name
-                      AND mode_of_payment IN (
-                          'Cash-Saihat','Cash-FA','Cash-Doha',
-                          'Card-SA','Card-FA','Card-DO'
-                      )
-                 )
+                WHEN si.sales_channel = 'Home Sales'
+                 AND NOT IFNULL(pay.has_tender, 0)
                  AND pe_pay.invoice IS NULL
                 THEN si.grand_total
                 ELSE 0
@@ -181,19 +169,8 @@ def execute(filters=None):
 
         FROM `tabSales Invoice` si
 
-        /* -------- POS CARD AMOUNT -------- */
-        LEFT JOIN (
-            SELECT
-                sip.parent AS invoice,
-                SUM(sip.amount) AS card_amount
-            FROM `tabSales Invoice Payment` sip
-            JOIN `tabSales Invoice` si2 ON si2.name = sip.parent
-            WHERE
-                (si2.pos_profile = 'Saihat' AND sip.mode_of_payment IN ('Card-SA','Card-FA'))
-                OR (si2.pos_profile = 'Faisaliya' AND sip.mode_of_payment = 'Card-FA')
-                OR (si2.pos_profile = 'Doha' AND sip.mode_of_payment IN ('Card-DO','Card-FA'))
-            GROUP BY sip.parent
-        ) card ON card.invoice = si.name
+        /* -------- POS PAYMENTS, ONE PIVOT ROW PER INVOICE (DCR Mode of Payment Map) -------- */
+        LEFT JOIN ({get_payment_pivot(where_clause)}) pay ON pay.parent = si.name
 
         /* -------- PAYMENT ENTRY (FOR HOME CREDIT) -------- */
         LEFT JOIN (
@@ -201,20 +178,24 @@ def execute(filters=None):
                 per.reference_name AS invoice,
 
                 CASE
-                    WHEN MAX(pe.mode_of_payment) LIKE 'Cash%%' THEN 'Cash'
-                    WHEN MAX(pe.mode_of_payment) LIKE 'Card%%'
-                      OR MAX(pe.mode_of_payment) LIKE 'Mada%%'
-                      OR MAX(pe.mode_of_payment) LIKE 'Visa%%'
-                        THEN 'Card'
-                    ELSE MAX(pe.mode_of_payment)
+                    WHEN MAX(mop_map.category = 'Cash') THEN 'Cash'
+                    WHEN MAX(mop_map.category = 'Card') THEN 'Card'
                 END AS mop,
 
                 SUM(per.allocated_amount) AS paid_amount
 
-            FROM `tabPayment Entry Reference` per
+            /* only the references of the invoices in range */
+            FROM `tabSales Invoice` si
+            JOIN `tabPayment Entry Reference` per
+                ON per.reference_doctype = 'Sales Invoice'
+                AND per.reference_name = si.name
             JOIN `tabPayment Entry` pe ON pe.name = per.parent
-            WHERE per.reference_doctype = 'Sales Invoice'
+            LEFT JOIN `tabDCR Mode of Payment Map` mop_map
+                ON mop_map.mode_of_payment = pe.mode_of_payment
+                AND (mop_map.pos_profile = si.pos_profile OR IFNULL(mop_map.pos_profile, '') = '')
+            WHERE si.docstatus = 1
               AND pe.docstatus = 1
+              {where_clause}
             GROUP BY per.reference_name
         ) pe_pay ON pe_pay.invoice = si.name
 
@@ -222,8 +203,17 @@ def execute(filters=None):
         {where_clause}
 
         ORDER BY
-            TIMESTAMP(si.posting_date, si.posting_time) DESC,
+            si.posting_date DESC,
+            si.posting_time DESC,
             si.name DESC
-    """, values, as_dict=True)
+        {limit_clause}
+    """
+
+    return query, values
+
 
-    return columns, data
+def merge_chunks(chunks):
+    """Rows of all background chunks, in the interactive report's order."""
+    data = [row for chunk in chunks for row in chunk]
+    data.sort(key=lambda r: (r.posting_date, r.posting_time, r.invoice), reverse=True)
+    return get_columns(), data
@@ -26,6 +26,18 @@ frappe.query_reports["DCR-All Branches"] = {
             get_data: function (txt) {
                 return frappe.db.get_link_options("POS Profile", txt);
             }
+        },
+        {
+            fieldname: "summary_only",
+            label: __("Summary Only"),
+            fieldtype: "Check",
+            default: 0
+        },
+        {
+            fieldname: "profile",
+            label: __("Profile"),
+            fieldtype: "Check",
+            hidden: 1
         }
     ],
 
@@ -33,8 +45,11 @@ frappe.query_reports["DCR-All Branches"] = {
     name_field: "name",
     parent_field: "parent",
     initial_depth: 0,
+    formatter: steelforce_custom.dcr.tree_formatter,
 
     onload: function (report) {
+        steelforce_custom.dcr.setup_lazy_tree(report);
+        steelforce_custom.dcr.setup_compact(report);
 
         /* SAFE PRINT BUTTON */
         report.page.add_inner_button(__("Print"), function () {
@@ -43,6 +58,9 @@ frappe.query_reports["DCR-All Branches"] = {
             });
         });
 
+        /* LONG RANGES: BRANCH × DAY CHUNKS ON THE WORKERS */
+        steelforce_custom.dcr.add_background_button(report);
+
         // ✅ Show ALL branches by default (no auto filter)
     }
 };
@@ -1,9 +1,19 @@
 # Copyright (c) 2025, siva and contributors
 # For license information, please see license.txt
 
-import frappe
-from frappe.utils import getdate, add_days
-from datetime import datetime, time
+from steelforce_custom.steelforce_custom.dcr.cache import cached_report
+from steelforce_custom.steelforce_custom.dcr.engine import (
+    CREDIT_SALE,
+    build_tree,
+    get_entries,
+    get_invoice_facts,
+    get_summary_rows,
+    make_entry,
+    parse_pos_profiles,
+    split_pos_payments,
+)
+from steelforce_custom.steelforce_custom.dcr.mode_of_payment import CASH, get_category
+from steelforce_custom.steelforce_custom.dcr.tree import summary_first
 
 
 def color_parent_name(name):
@@ -16,223 +26,90 @@ def color_parent_name(name):
     return name
 
 
+@summary_first
+@cached_report("DCR-All Branches")
 def execute(filters=None):
     filters = filters or {}
+    return get_columns(), get_data(get_chunk(filters))
 
+
+def get_columns():
+    return [
+        {"fieldname": "name", "label": "Sales Type / Mode of Payment / Invoice", "fieldtype": "Data", "width": 360},
+        {"fieldname": "amount", "label": "Amount", "fieldtype": "Currency", "width": 180},
+        {"fieldname": "invoice", "label": "Invoice", "fieldtype": "Link", "options": "Sales Invoice", "width": 260},
+    ]
+
+
+def get_chunk(filters):
+    """Tree entries of the filtered invoices; one background chunk or the whole run."""
     from_date = filters.get("from_date")
     to_date = filters.get("to_date")
-    pos_profiles = filters.get("pos_profile")   # MULTI SELECT
+    pos_profiles = parse_pos_profiles(filters.get("pos_profile"))   # MULTI SELECT
 
     # -------------------------------------------------
-    # 🔹 BUSINESS DAY WINDOW (03:00 → 03:00)
+    # 🔹 BUSINESS DAY (PER BRANCH CUTOFF)
     # -------------------------------------------------
-    from_datetime = datetime.combine(getdate(from_date), time(3, 0, 0))
-    to_datetime = datetime.combine(add_days(getdate(to_date), 1), time(3, 0, 0))
+    conditions = ["si.business_date BETWEEN %(from_date)s AND %(to_date)s"]
+    values = {
+        "from_date": from_date,
+        "to_date": to_date,
+    }
 
     # -------------------------------------------------
     # 🔹 POS PROFILE CONDITION (MULTI)
     # -------------------------------------------------
-    pos_condition = ""
-    pos_values = {}
-
     if pos_profiles:
-        if isinstance(pos_profiles, str):
-            pos_profiles = [p.strip() for p in pos_profiles.split(",") if p.strip()]
-
-        if pos_profiles:
-            pos_condition = " AND si.pos_profile IN %(pos_profiles)s "
-            pos_values["pos_profiles"] = tuple(pos_profiles)
+        conditions.append("si.pos_profile IN %(pos_profiles)s")
+        values["pos_profiles"] = tuple(pos_profiles)
 
     # -------------------------------------------------
-    # COLUMNS
+    # 🔹 FACTS (ONE PASS)
     # -------------------------------------------------
-    columns = [
-        {"fieldname": "name", "label": "Sales Type / Mode of Payment / Invoice", "fieldtype": "Data", "width": 360},
-        {"fieldname": "amount", "label": "Amount", "fieldtype": "Currency", "width": 180},
-        {"fieldname": "invoice", "label": "Invoice", "fieldtype": "Link", "options": "Sales Invoice", "width": 260},
-    ]
+    facts = get_invoice_facts(conditions, values, payment_entries=False)
+    return get_entries(facts, classify)
 
-    data = []
-    grand_total = 0
-    total_cash_counter_home = 0
-    total_card_counter_home = 0
 
-    # -------------------------------------------------
-    # 🔹 PARENT LEVEL
-    # -------------------------------------------------
-    parents = frappe.db.sql(f"""
-        SELECT
-            CONCAT(
-                CASE
-                    WHEN si.customer IN ('HUNGER STATION','KETA','JAHEZ','TO YOU')
-                        THEN 'Online Sales'
-                    WHEN si.customer = 'Walk-in Customer'
-                        THEN 'Counter Sales'
-                    ELSE 'Home Sales'
-                END,
-                ' - ',
-                IFNULL(sip.mode_of_payment, 'Credit Sale'),
-                IF(si.is_return = 1, ' (Return)', '')
-            ) AS parent_name,
-
-            si.is_return,
-
-            SUM(
-                CASE
-                    WHEN si.is_return = 1
-                        THEN si.grand_total
-
-                    WHEN sip.mode_of_payment IS NULL
-                        THEN si.grand_total
-
-                    WHEN sip.mode_of_payment LIKE 'Cash%%'
-                        THEN
-                            IFNULL(si.paid_amount, 0)
-                            - IFNULL(si.change_amount, 0)
-                            - IFNULL((
-                                SELECT SUM(p.amount)
-                                FROM `tabSales Invoice Payment` p
-                                WHERE p.parent = si.name
-                                  AND p.mode_of_payment NOT LIKE 'Cash%%'
-                            ), 0)
-
-                    ELSE sip.amount
-                END
-            ) AS amount
-
-        FROM `tabSales Invoice` si
-        LEFT JOIN `tabSales Invoice Payment` sip
-            ON sip.parent = si.name
-            AND sip.parenttype = 'Sales Invoice'
-            AND sip.parentfield = 'payments'
-
-        WHERE
-            si.docstatus = 1
-            {pos_condition}
-            AND TIMESTAMP(si.posting_date, si.posting_time)
-                BETWEEN %(from_datetime)s AND %(to_datetime)s
-
-        GROUP BY parent_name, si.is_return
-        ORDER BY parent_name
-    """, {
-        "from_datetime": from_datetime,
-        "to_datetime": to_datetime,
-        **pos_values
-    }, as_dict=True)
+def merge_chunks(chunks):
+    """Same output as one interactive run over the union of the chunks."""
+    entries = [e for chunk in chunks for e in chunk]
+    entries.sort(key=lambda e: e["invoice"] or "")
+    return get_columns(), get_data(entries)
 
-    # -------------------------------------------------
-    # 🔹 BUILD TREE
-    # -------------------------------------------------
-    for p in parents:
-        data.append({
-            "name": color_parent_name(p.parent_name),
-            "parent": None,
-            "amount": p.amount,
-            "indent": 0
-        })
-
-        grand_total += p.amount or 0
-
-        sales_type = p.parent_name.split(" - ")[0]
-        mode_only = p.parent_name.split(" - ")[-1].replace(" (Return)", "")
-
-        # 🔹 Total Cash / Card (Counter + Home only)
-        if sales_type in ("Counter Sales", "Home Sales"):
-            if mode_only.startswith("Cash"):
-                total_cash_counter_home += p.amount or 0
-            elif mode_only not in ("Credit Sale",):
-                total_card_counter_home += p.amount or 0
-
-        invoices = frappe.db.sql(f"""
-            SELECT
-                si.name,
-
-                CASE
-                    WHEN si.is_return = 1
-                        THEN si.grand_total
-
-                    WHEN %(mode)s = 'Credit Sale'
-                        THEN si.grand_total
-
-                    WHEN %(mode)s LIKE 'Cash%%'
-                        THEN
-                            IFNULL(si.paid_amount, 0)
-                            - IFNULL(si.change_amount, 0)
-                            - IFNULL((
-                                SELECT SUM(p.amount)
-                                FROM `tabSales Invoice Payment` p
-                                WHERE p.parent = si.name
-                                  AND p.mode_of_payment NOT LIKE 'Cash%%'
-                            ), 0)
-
-                    ELSE sip.amount
-                END AS amount
-
-            FROM `tabSales Invoice` si
-            LEFT JOIN `tabSales Invoice Payment` sip
-                ON sip.parent = si.name
-                AND sip.parenttype = 'Sales Invoice'
-                AND sip.parentfield = 'payments'
-                AND sip.mode_of_payment = %(mode)s
-
-            WHERE
-                si.docstatus = 1
-                {pos_condition}
-                AND TIMESTAMP(si.posting_date, si.posting_time)
-                    BETWEEN %(from_datetime)s AND %(to_datetime)s
-                AND si.is_return = %(is_return)s
-
-                AND (
-                    si.is_return = 1
-                    OR (
-                        (%(mode)s = 'Credit Sale' AND sip.name IS NULL)
-                        OR sip.mode_of_payment = %(mode)s
-                    )
-                )
-
-                AND (
-                    (%(sales_type)s = 'Online Sales'
-                        AND si.customer IN ('HUNGER STATION','KETA','JAHEZ','TO YOU'))
-                    OR (%(sales_type)s = 'Counter Sales'
-                        AND si.customer = 'Walk-in Customer')
-                    OR (%(sales_type)s = 'Home Sales'
-                        AND si.customer NOT IN (
-                            'HUNGER STATION','KETA','JAHEZ','TO YOU','Walk-in Customer'))
-                )
-
-            ORDER BY si.name
-        """, {
-            "from_datetime": from_datetime,
-            "to_datetime": to_datetime,
-            "is_return": p.is_return,
-            "mode": mode_only,
-            "sales_type": sales_type,
-            **pos_values
-        }, as_dict=True)
-
-        for inv in invoices:
-            if inv.amount and inv.amount != 0:
-                data.append({
-                    "name": inv.name,
-                    "invoice": inv.name,
-                    "parent": p.parent_name,
-                    "amount": inv.amount,
-                    "indent": 1
-                })
 
+def get_data(entries):
     # -------------------------------------------------
-    # 🔹 FINAL SUMMARY
+    # 🔹 TREE + FINAL SUMMARY
     # -------------------------------------------------
-    vat_amount = round(grand_total * 0.15 / 1.15, 2)
-    total_wo_vat = round(grand_total - vat_amount, 2)
+    data, totals = build_tree(entries, color_parent_name)
+    data.extend(get_summary_rows(totals))
+
+    return data
+
+
+def is_cash(mode_of_payment, pos_profile):
+    return get_category(mode_of_payment, pos_profile) == CASH
+
+
+def classify(inv, pos_rows, ref_rows):
+    """POS payments only; returns carry the refunded amount per mode."""
+    sales_type = inv.sales_channel
+    suffix = " (Return)" if inv.is_return else ""
+
+    if not pos_rows:
+        amounts = {CREDIT_SALE: inv.grand_total}
+    elif inv.is_return and len(pos_rows) == 1:
+        amounts = {pos_rows[0].mode_of_payment: inv.grand_total}
+    else:
+        amounts = split_pos_payments(inv, pos_rows, lambda p: is_cash(p.mode_of_payment, inv.pos_profile))
 
-    data.extend([
-        {"name": "<b>Total Cash (Counter + Home)</b>", "amount": total_cash_counter_home, "indent": 0},
-        {"name": "<b>Total Card (Counter + Home)</b>", "amount": total_card_counter_home, "indent": 0},
+    entries = []
+    for mode, amount in amounts.items():
+        if mode == CREDIT_SALE:
+            tender = None
+        else:
+            tender = "cash" if is_cash(mode, inv.pos_profile) else "card"
 
-        {"name": "<b>Total W/O VAT</b>", "amount": total_wo_vat, "indent": 0},
-        {"name": "<b>Total VAT (15%)</b>", "amount": vat_amount, "indent": 0},
-        {"name": "<b style='font-size:14px'>TOTAL</b>", "amount": grand_total, "indent": 0},
-    ])
+        entries.append(make_entry(f"{sales_type} - {mode}{suffix}", inv, amount, sales_type, tender))
 
-    return columns, data
+    return entries
@@ -1,7 +1,7 @@
 // Copyright (c) 2025, siva and contributors
 // For license information, please see license.txt
 
-frappe.query_reports["DCR Report"] = {
+frappe.query_reports["DCR-Report"] = {
     filters: [
         {
             fieldname: "from_date",
@@ -20,8 +20,23 @@ frappe.query_reports["DCR Report"] = {
         {
             fieldname: "pos_profile",
             label: __("POS Profile"),
-            fieldtype: "Link",
-            options: "POS Profile"
+            fieldtype: "MultiSelectList",
+            options: "POS Profile",
+            get_data: function (txt) {
+                return frappe.db.get_link_options("POS Profile", txt);
+            }
+        },
+        {
+            fieldname: "summary_only",
+            label: __("Summary Only"),
+            fieldtype: "Check",
+            default: 0
+        },
+        {
+            fieldname: "profile",
+            label: __("Profile"),
+            fieldtype: "Check",
+            hidden: 1
         }
     ],
 
@@ -29,8 +44,13 @@ frappe.query_reports["DCR Report"] = {
     name_field: "name",
     parent_field: "parent",
     initial_depth: 0,
+    formatter: steelforce_custom.dcr.tree_formatter,
+    after_datatable_render: steelforce_custom.dcr.watch_shown_branches,
 
     onload: function (report) {
+        steelforce_custom.dcr.setup_lazy_tree(report);
+        steelforce_custom.dcr.setup_compact(report);
+        steelforce_custom.dcr.setup_realtime(report);
 
         /* ----------------------------------------------------
            Add SAFE Print Button (prevents orientation error)
@@ -41,23 +61,12 @@ frappe.query_reports["DCR Report"] = {
             });
         });
 
+        steelforce_custom.dcr.add_slip_buttons(report);
+
         /* ----------------------------------------------------
-           Auto-set POS Profile linked to logged-in user
+           Auto-set POS Profile linked to logged-in user, with the
+           first result in the same request
         -----------------------------------------------------*/
-        frappe.db.get_list("POS Profile", {
-            filters: [
-                ["POS Profile User", "user", "=", frappe.session.user]
-            ],
-            fields: ["name"],
-            limit: 1
-        }).then(function (r) {
-            if (!r || !r.length) {
-                frappe.msgprint(__("No POS Profile linked to this user"));
-                return;
-            }
-
-            report.get_filter("pos_profile").set_value(r[0].name);
-            report.refresh();
-        });
+        return steelforce_custom.dcr.bootstrap_report(report);
     }
 };
@@ -1,31 +1,48 @@
 # Copyright (c) 2025, siva and contributors
 
+from itertools import groupby
+from operator import itemgetter
+
 import frappe
-from frappe.utils import getdate, add_days
-from datetime import datetime, time
+
+from steelforce_custom.steelforce_custom.dcr import vectorized
+from steelforce_custom.steelforce_custom.dcr.advance_ledger import get_sales_advance_rows
+from steelforce_custom.steelforce_custom.dcr.cache import cached_report
+from steelforce_custom.steelforce_custom.dcr.engine import (
+    build_tree,
+    get_invoice_facts,
+    get_payment_facts,
+    get_summary_rows,
+    parse_pos_profiles,
+    stream_invoice_facts,
+)
+from steelforce_custom.steelforce_custom.dcr.payment_facts import (
+    get_advance_fact_rows,
+    get_invoice_fact_rows,
+    get_pos_profile_warehouses,
+    get_sales_order_warehouses,
+)
+from steelforce_custom.steelforce_custom.dcr.tree import summary_first
 
 
 def color_parent_name(name):
     return f"<span style='color:#000000; font-weight:600'>{name}</span>"
 
 
+@summary_first
+@cached_report("DCR-Report")
 def execute(filters=None):
     filters = filters or {}
 
     from_date = filters.get("from_date")
     to_date = filters.get("to_date")
-    pos_profile = filters.get("pos_profile")
-
-    # -------------------------------------------------
-    # POS PROFILE WAREHOUSE
-    # -------------------------------------------------
-    pos_warehouse = frappe.db.get_value("POS Profile", pos_profile, "warehouse")
+    pos_profiles = sorted(parse_pos_profiles(filters.get("pos_profile")))   # MULTI SELECT
 
     # -------------------------------------------------
-    # BUSINESS DAY WINDOW (03:00 → 03:00)
+    # POS PROFILE WAREHOUSES
     # -------------------------------------------------
-    from_datetime = datetime.combine(getdate(from_date), time(4, 0, 0))
-    to_datetime = datetime.combine(add_days(getdate(to_date), 1), time(4, 0, 0))
+    warehouses = get_pos_profile_warehouses()
+    pos_warehouses = {warehouses.get(p) for p in pos_profiles} - {None}
 
     columns = [
         {"fieldname": "name", "label": "Sales Type / Mode / Doc", "fieldtype": "Data", "width": 360},
@@ -33,290 +50,366 @@ def execute(filters=None):
         {"fieldname": "invoice", "label": "Invoice", "fieldtype": "Link", "options": "Sales Invoice", "width": 200},
     ]
 
-    data = []
-    grand_total = 0
-    total_cash_counter_home = 0
-    total_card_counter_home = 0
-
     # -------------------------------------------------
-    # CASH MODE NAMES (SAFE)
+    # FACTS: STORED (DCR Payment Fact) OR LIVE, ONE PASS FOR ALL BRANCHES
+    # (column arrays on the NumPy backend, else live invoices are streamed by day)
     # -------------------------------------------------
-    cash_modes = frappe.get_all(
-        "Mode of Payment",
-        filters={"type": "Cash"},
-        pluck="name"
-    )
+    use_arrays = vectorized.is_enabled()
+
+    if not pos_profiles:
+        fact_rows, advances = [], []
+    elif frappe.conf.get("dcr_read_payment_facts"):
+        fact_rows = get_invoice_fact_rows(pos_profiles, from_date, to_date)
+        advances = get_advance_fact_rows(pos_warehouses, from_date, to_date)
+        if use_arrays:
+            fact_rows = vectorized.get_fact_arrays(fact_rows)
+    elif use_arrays:
+        fact_rows, advances = get_live_fact_arrays(pos_profiles, warehouses, pos_warehouses, from_date, to_date)
+    else:
+        # read before the stream holds the connection
+        advances = get_sales_advance_rows(pos_warehouses, from_date, to_date)
+        fact_rows = get_streamed_fact_entries(pos_profiles, warehouses, from_date, to_date)
 
     # -------------------------------------------------
-    # 1️⃣ INVOICES
+    # BUILD TREE
     # -------------------------------------------------
-    invoices = frappe.db.sql("""
-        SELECT
-            si.name,
-            si.customer,
-            si.grand_total,
-            si.is_return,
-            IFNULL(si.change_amount, 0) AS change_amount
-        FROM `tabSales Invoice` si
-        WHERE
-            si.docstatus = 1
-            AND si.pos_profile = %(pos_profile)s
-            AND TIMESTAMP(si.posting_date, si.posting_time)
-                BETWEEN %(from_datetime)s AND %(to_datetime)s
-    """, {
-        "pos_profile": pos_profile,
-        "from_datetime": from_datetime,
-        "to_datetime": to_datetime,
-    }, as_dict=True)
-
-    invoice_map = {i.name: i for i in invoices}
-    invoice_names = tuple(invoice_map.keys()) or ("",)
+    if len(pos_profiles) > 1:
+        data, totals = get_branch_tree(pos_profiles, warehouses, fact_rows, advances)
+    else:
+        data, totals = get_tree(fact_rows, advances)
 
     # -------------------------------------------------
-    # 2️⃣ PAYMENT ENTRY REFERENCES (ALLOCATED TO INVOICES)
+    # SUMMARY (CONSOLIDATED OVER THE BRANCHES)
     # -------------------------------------------------
-    refs = frappe.db.sql("""
-        SELECT
-            per.reference_name AS invoice,
-            per.reference_doctype,
-            per.allocated_amount,
-            per.advance_voucher_type,
-            per.advance_voucher_no,
-            pe.mode_of_payment,
-            pe.name AS payment_entry
-        FROM `tabPayment Entry Reference` per
-        JOIN `tabPayment Entry` pe ON pe.name = per.parent
-        WHERE
-            pe.docstatus = 1
-            AND per.reference_name IN %(invoices)s
-            AND per.reference_doctype = 'Sales Invoice'
-    """, {"invoices": invoice_names}, as_dict=True)
-
-    ref_map = {}
-    allocated_pe_set = set()
-    
-    # Track ALL Payment Entries with Sales Order advances in date range
-    all_advances = frappe.db.sql("""
-        SELECT DISTINCT
-            pe.name AS payment_entry,
-            per.reference_name AS sales_order,
-            per.allocated_amount AS so_allocated_amount,
-            pe.mode_of_payment,
-            so.customer
-        FROM `tabPayment Entry` pe
-        JOIN `tabPayment Entry Reference` per ON per.parent = pe.name
-        JOIN `tabSales Order` so ON so.name = per.reference_name
-        WHERE
-            pe.docstatus = 1
-            AND pe.payment_type = 'Receive'
-            AND per.reference_doctype = 'Sales Order'
-            AND so.set_warehouse = %(pos_warehouse)s
-            AND pe.posting_date BETWEEN %(from_date)s AND %(to_date)s
-    """, {
-        "pos_warehouse": pos_warehouse,
+    data.extend(get_summary_rows(totals))
+
+    return columns, data
+
+
+def get_streamed_fact_entries(pos_profiles, warehouses, from_date, to_date):
+    """
+    Facts of the branches' invoices folded in straight off the invoice stream,
+    one business day at a time: a day's entries are folded into the per-parent
+    children and dropped before the next day is read, so besides the result
+    rows only one day's entries are held.
+    """
+    folded_entries = FoldedEntries()
+
+    stream = stream_invoice_facts([
+        "si.pos_profile IN %(pos_profiles)s",
+        "si.business_date BETWEEN %(from_date)s AND %(to_date)s",
+    ], {
+        "pos_profiles": tuple(pos_profiles),
         "from_date": from_date,
         "to_date": to_date,
-    }, as_dict=True)
-    
-    # Build a map of all advances by payment_entry
-    advance_map = {}
-    for a in all_advances:
-        advance_map[a.payment_entry] = a
-    
-    # Collect unique Sales Orders from advance_voucher_no for warehouse validation
-    so_names = set()
-    for r in refs:
-        if r.advance_voucher_type == "Sales Order" and r.advance_voucher_no:
-            so_names.add(r.advance_voucher_no)
-    
-    # Fetch Sales Orders with matching warehouse
-    valid_so_set = set()
-    if so_names:
-        valid_sos = frappe.db.sql("""
-            SELECT name 
-            FROM `tabSales Order` 
-            WHERE name IN %(so_names)s 
-            AND set_warehouse = %(pos_warehouse)s
-        """, {"so_names": tuple(so_names), "pos_warehouse": pos_warehouse}, as_dict=True)
-        valid_so_set = {so.name for so in valid_sos}
-    
-    # Build ref_map and allocated_pe_set
-    for r in refs:
-        ref_map.setdefault(r.invoice, []).append(r)
-        # Mark this PE as allocated if it has a valid Sales Order advance
-        if r.advance_voucher_type == "Sales Order" and r.advance_voucher_no in valid_so_set:
-            allocated_pe_set.add(r.payment_entry)
+    })
 
+    for _business_date, day in groupby(stream, key=lambda invoice_facts: invoice_facts[0].business_date):
+        day_entries = FactEntries()
+
+        for inv, pos_rows, ref_rows in day:
+            warehouse = warehouses.get(inv.pos_profile)
+            facts = get_payment_facts(
+                inv,
+                pos_rows,
+                ref_rows,
+                lambda r: bool(warehouse) and r.sales_order_warehouse == warehouse,
+            )
+
+            for f in facts:
+                f.update(
+                    invoice=inv.name,
+                    pos_profile=inv.pos_profile,
+                    channel=inv.sales_channel,
+                    is_return=inv.is_return,
+                )
+                day_entries.add(f)
+
+        folded_entries.add_day(day_entries)
+
+    return folded_entries
 
-    # -------------------------------------------------
-    # 3️⃣ POS PAYMENTS
-    # -------------------------------------------------
-    pos_payments = frappe.db.sql("""
-        SELECT
-            sip.parent AS invoice,
-            sip.mode_of_payment,
-            SUM(sip.amount) AS amount
-        FROM `tabSales Invoice Payment` sip
-        WHERE sip.parent IN %(invoices)s
-        GROUP BY sip.parent, sip.mode_of_payment
-    """, {"invoices": invoice_names}, as_dict=True)
-
-    pos_map = {}
-    for p in pos_payments:
-        pos_map.setdefault(p.invoice, []).append(p)
 
+def get_live_fact_arrays(pos_profiles, warehouses, pos_warehouses, from_date, to_date):
     # -------------------------------------------------
-    # NORMALIZE PER INVOICE
+    # 1️⃣ INVOICES, POS PAYMENTS, PAYMENT ENTRY REFERENCES
     # -------------------------------------------------
-    normalized = []
-
-    def get_sales_type(customer):
-        if customer in ("HUNGER STATION", "KETA", "JAHEZ", "TO YOU"):
-            return "Online Sales"
-        if customer == "Walk-in Customer":
-            return "Counter Sales"
-        return "Home Sales"
-
-    for inv_name, inv in invoice_map.items():
-        sales_type = get_sales_type(inv.customer)
-        
-        # For returns, use negative amounts and separate category
-        if inv.is_return:
-            sales_type = f"{sales_type} - Return"
-            # If grand_total is already negative, don't multiply again
-            multiplier = -1 if inv.grand_total > 0 else 1
-        else:
-            multiplier = 1
-
-        advance_total = 0
-        cash_paid = 0
-        other_paid = {}
-
-        # ---- PAYMENT ENTRY ----
-        for r in ref_map.get(inv_name, []):
-            # Check if this payment entry is a sales advance (using advance_voucher fields)
-            if r.advance_voucher_type == "Sales Order" and r.advance_voucher_no in valid_so_set:
-                # This is a Sales Order advance with matching warehouse
-                # Note: Sales advances are NOT negative even for returns (they're deductions)
-                normalized.append({
-                    "parent": f"{sales_type} - Sales Advance - {r.mode_of_payment}",
-                    "name": r.advance_voucher_no,
-                    "amount": r.allocated_amount * multiplier,
-                })
-                advance_total += r.allocated_amount
-            else:
-                # Regular payment entry (not advance)
-                if r.mode_of_payment in cash_modes:
-                    cash_paid += r.allocated_amount
-                else:
-                    other_paid[r.mode_of_payment] = other_paid.get(r.mode_of_payment, 0) + r.allocated_amount
-
-        # ---- POS PAYMENTS ----
-        for p in pos_map.get(inv_name, []):
-            if p.mode_of_payment in cash_modes:
-                cash_paid += p.amount
-            else:
-                other_paid[p.mode_of_payment] = other_paid.get(p.mode_of_payment, 0) + p.amount
-
-        # ---- APPLY CHANGE (ONCE, CASH ONLY) ----
-        # Don't apply change for returns
-        if not inv.is_return and cash_paid > 0 and inv.change_amount:
-            cash_paid = max(cash_paid - inv.change_amount, 0)
-
-        # ---- EMIT CASH ----
-        if cash_paid > 0:
-            normalized.append({
-                "parent": f"{sales_type} - Cash",
-                "name": inv_name,
-                "invoice": inv_name,
-                "amount": cash_paid * multiplier,
-            })
-
-        # ---- EMIT OTHER MODES ----
-        for mop, amt in other_paid.items():
-            if amt > 0:
-                normalized.append({
-                    "parent": f"{sales_type} - {mop}",
-                    "name": inv_name,
-                    "invoice": inv_name,
-                    "amount": amt * multiplier,
-                })
-
-        # ---- CREDIT ----
-        balance = inv.grand_total - advance_total - cash_paid - sum(other_paid.values())
-        if balance > 0:
-            normalized.append({
-                "parent": f"{sales_type} - Credit Sale",
-                "name": inv_name,
-                "invoice": inv_name,
-                "amount": balance * multiplier,
-            })
+    invoices, pos_map, ref_map = get_invoice_facts([
+        "si.pos_profile IN %(pos_profiles)s",
+        "si.business_date BETWEEN %(from_date)s AND %(to_date)s",
+    ], {
+        "pos_profiles": tuple(pos_profiles),
+        "from_date": from_date,
+        "to_date": to_date,
+    })
 
     # -------------------------------------------------
-    # 4️⃣ UNALLOCATED ADVANCES (NOT YET INVOICED)
+    # 2️⃣ SALES ADVANCES OF THE WAREHOUSES IN RANGE (DCR Sales Advance)
     # -------------------------------------------------
-    for pe_name, adv in advance_map.items():
-        # Skip if this payment entry was already allocated to an invoice in this report
-        if pe_name in allocated_pe_set:
-            continue
-        
-        sales_type = get_sales_type(adv.customer)
-        normalized.append({
-            "parent": f"{sales_type} - Sales Advance - {adv.mode_of_payment}",
-            "name": adv.sales_order,
-            "amount": adv.so_allocated_amount,
-        })
+    advances = get_sales_advance_rows(pos_warehouses, from_date, to_date)
 
     # -------------------------------------------------
-    # BUILD TREE
+    # 3️⃣ WAREHOUSES OF THE SALES ORDERS OF ALLOCATED ADVANCES
     # -------------------------------------------------
-    parents = {}
-    for r in normalized:
-        parents.setdefault(r["parent"], []).append(r)
-
-    for parent, items in sorted(parents.items()):
-        amt = sum(i["amount"] for i in items)
-
-        data.append({"name": color_parent_name(parent), "amount": amt, "indent": 0})
-        grand_total += amt
-
-        # Split parent to extract sales type and mode
-        parts = parent.split(" - ")
-        base_sales_type = parts[0]
-        
-        # Check if it's a return (e.g., "Counter Sales - Return - Cash")
-        if len(parts) > 2 and parts[1] == "Return":
-            mode_only = " - ".join(parts[2:])
-        else:
-            mode_only = " - ".join(parts[1:])
-
-        # Calculate totals for Counter Sales and Home Sales (including returns)
-        if base_sales_type in ("Counter Sales", "Home Sales"):
-            if "Cash" in mode_only:
-                total_cash_counter_home += amt
-            elif "Sales Advance" not in mode_only and mode_only != "Credit Sale":
-                total_card_counter_home += amt
-
-        for i in items:
-            data.append({
-                "name": i["name"],
-                "invoice": i.get("invoice"),
-                "amount": i["amount"],
-                "indent": 1,
-            })
+    so_warehouses = get_sales_order_warehouses(ref_map)
 
     # -------------------------------------------------
-    # SUMMARY
+    # NORMALIZE ALL INVOICES AT ONCE
     # -------------------------------------------------
-    vat_amount = round(grand_total * 0.15 / 1.15, 2)
-    total_wo_vat = round(grand_total - vat_amount, 2)
+    return vectorized.get_payment_fact_arrays(invoices, pos_map, ref_map, warehouses, so_warehouses), advances
+
+
+def get_payment_fact_rows(invoices, pos_map, ref_map, warehouses, so_warehouses):
+    """Payment facts of the invoices; an advance counts when its Sales Order is for the branch's warehouse."""
+    fact_rows = []
+    for inv in invoices:
+        warehouse = warehouses.get(inv.pos_profile)
+        facts = get_payment_facts(
+            inv,
+            pos_map.get(inv.name, []),
+            ref_map.get(inv.name, []),
+            lambda r, warehouse=warehouse: bool(warehouse)
+            and so_warehouses.get(r.advance_voucher_no) == warehouse,
+        )
+
+        for f in facts:
+            f.update(
+                invoice=inv.name,
+                pos_profile=inv.pos_profile,
+                channel=inv.sales_channel,
+                is_return=inv.is_return,
+            )
+            fact_rows.append(f)
+
+    return fact_rows
+
+
+def get_branch_tree(pos_profiles, warehouses, fact_rows, advances):
+    """
+    One subtree per branch: a branch row over that branch's tree and summary,
+    the same rows a single-branch run shows. Totals are summed over branches.
+    """
+    if isinstance(fact_rows, (vectorized.FactArrays, FactEntries, FoldedEntries)):
+        branch_facts = {p: fact_rows.for_branch(p) for p in pos_profiles}
+    else:
+        branch_facts = {}
+        for f in fact_rows:
+            branch_facts.setdefault(f.pos_profile, []).append(f)
+
+    # branches sharing a warehouse: its advances count once, for the first one
+    warehouse_branches = {}
+    for pos_profile in pos_profiles:
+        if warehouses.get(pos_profile):
+            warehouse_branches.setdefault(warehouses[pos_profile], pos_profile)
+
+    branch_advances = {}
+    for adv in advances:
+        branch_advances.setdefault(warehouse_branches.get(adv.warehouse), []).append(adv)
 
-    data.extend([
-        {"name": "<b>Total Cash (Counter + Home)</b>", "amount": total_cash_counter_home},
-        {"name": "<b>Total Card (Counter + Home)</b>", "amount": total_card_counter_home},
-        {"name": "<b>Total W/O VAT</b>", "amount": total_wo_vat},
-        {"name": "<b>Total VAT (15%)</b>", "amount": vat_amount},
-        {"name": "<b style='font-size:14px'>TOTAL</b>", "amount": grand_total},
-    ])
+    data = []
+    totals = frappe._dict(grand_total=0, total_cash=0, total_card=0)
 
-    return columns, data
+    for pos_profile in pos_profiles:
+        rows, branch_totals = get_tree(branch_facts.get(pos_profile, []), branch_advances.get(pos_profile, []))
+        rows.extend(get_summary_rows(branch_totals))
+
+        data.append({
+            "name": f"<b>{pos_profile}</b>",
+            "parent": None,
+            "amount": branch_totals.grand_total,
+            "indent": 0,
+        })
+        for row in rows:
+            row["indent"] += 1
+            row["parent"] = row.get("parent") or pos_profile
+        data.extend(rows)
+
+        for key in totals:
+            totals[key] += branch_totals[key]
+
+    return data, totals
+
+
+def get_tree(fact_rows, advances):
+    if isinstance(fact_rows, vectorized.FactArrays):
+        return vectorized.build_fact_tree(fact_rows, advances, color_parent_name)
+
+    if isinstance(fact_rows, FoldedEntries):
+        return fact_rows.get_tree(advances)
+
+    if not isinstance(fact_rows, FactEntries):
+        fact_rows = FactEntries(fact_rows)
+
+    return build_tree(fact_rows.get_entries(advances), color_parent_name, sort_key=str)
+
+
+def get_entries(fact_rows, advances):
+    """Label facts with their parent row; cash of one invoice is a single child."""
+    return FactEntries(fact_rows).get_entries(advances)
+
+
+class FactEntries:
+    """The entries of `get_entries`, folded in one fact at a time and kept per branch."""
+
+    def __init__(self, fact_rows=()):
+        self.branches = {}
+        for f in fact_rows:
+            self.add(f)
+
+    def add(self, f):
+        entries, allocated_pe_set = self.branches.setdefault(f.pos_profile, ({}, set()))
+        sales_type = f"{f.channel} - Return" if f.is_return else f.channel
+
+        name, invoice = f.invoice, f.invoice
+        if f.source == "Advance":
+            parent = f"{sales_type} - Sales Advance - {f.mode_of_payment}"
+            name, invoice = f.sales_order, None
+            tender = "cash" if f.tender == "Cash" else None
+            allocated_pe_set.add(f.payment_entry)
+        elif f.source == "Credit":
+            parent = f"{sales_type} - Credit Sale"
+            tender = None
+        elif f.tender == "Cash":
+            parent = f"{sales_type} - Cash"
+            tender = "cash"
+        else:
+            parent = f"{sales_type} - {f.mode_of_payment}"
+            tender = "card"
+
+        key = (parent, f.invoice, name)
+        if key in entries:
+            entries[key]["amount"] += f.amount
+        else:
+            entries[key] = {
+                "parent": parent,
+                "name": name,
+                "invoice": invoice,
+                "amount": f.amount,
+                "sales_type": f.channel,
+                "tender": tender,
+            }
+
+    def for_branch(self, pos_profile):
+        branch = FactEntries()
+        if pos_profile in self.branches:
+            branch.branches[pos_profile] = self.branches[pos_profile]
+        return branch
+
+    def get_entries(self, advances):
+        entries = []
+        allocated_pe_set = set()
+        for branch_entries, branch_allocated in self.branches.values():
+            entries.extend(branch_entries.items())
+            allocated_pe_set |= branch_allocated
+
+        # children in invoice order, however the facts arrived
+        entries = dict(sorted(entries, key=lambda item: item[0][1]))
+
+        # -------------------------------------------------
+        # 4️⃣ UNALLOCATED ADVANCES (NOT YET INVOICED)
+        # -------------------------------------------------
+        for adv in advances:
+            # Skip if this payment entry was already allocated to an invoice in this report
+            if adv.payment_entry in allocated_pe_set:
+                continue
+
+            entries[(adv.payment_entry, adv.sales_order)] = {
+                "parent": f"{adv.channel} - Sales Advance - {adv.mode_of_payment}",
+                "name": adv.sales_order,
+                "invoice": None,
+                "amount": adv.amount,
+                "sales_type": adv.channel,
+                "tender": "cash" if adv.tender == "Cash" else None,
+            }
+
+        return list(entries.values())
+
+
+class FoldedEntries:
+    """
+    Entries of whole business days folded into their parents, kept per branch
+    as `{parent: [sales_type, tender, children]}` with plain tuple children
+    `(fact invoice, invoice, name, amount)`. An invoice's entries all fall on
+    its own day, so a day folds in complete and its entries can be dropped.
+    """
+
+    def __init__(self):
+        self.branches = {}
+
+    def add_day(self, fact_entries):
+        for pos_profile, (entries, allocated) in fact_entries.branches.items():
+            parents, allocated_pe_set = self.branches.setdefault(pos_profile, ({}, set()))
+            allocated_pe_set |= allocated
+
+            for (_parent, fact_invoice, _name), e in entries.items():
+                parent = parents.setdefault(e["parent"], [e["sales_type"], e["tender"], []])
+                parent[2].append((fact_invoice, e["invoice"], e["name"], e["amount"]))
+
+    def for_branch(self, pos_profile):
+        branch = FoldedEntries()
+        if pos_profile in self.branches:
+            branch.branches[pos_profile] = self.branches[pos_profile]
+        return branch
+
+    def get_tree(self, advances):
+        """`build_tree` over the folded parents, children in invoice order and the unallocated advances last."""
+        parents = {}
+        allocated_pe_set = set()
+        for branch_parents, branch_allocated in self.branches.values():
+            for parent, (sales_type, tender, children) in branch_parents.items():
+                parents.setdefault(parent, [sales_type, tender, []])[2].extend(children)
+            allocated_pe_set |= branch_allocated
+
+        for _sales_type, _tender, children in parents.values():
+            children.sort(key=itemgetter(0))
+
+        # one child per Payment Entry × Sales Order, as in `get_entries`
+        advance_children = {}
+        for adv in advances:
+            if adv.payment_entry not in allocated_pe_set:
+                advance_children[(adv.payment_entry, adv.sales_order)] = adv
+
+        for adv in advance_children.values():
+            parent = f"{adv.channel} - Sales Advance - {adv.mode_of_payment}"
+            parent = parents.setdefault(parent, [adv.channel, "cash" if adv.tender == "Cash" else None, []])
+            parent[2].append((None, None, adv.sales_order, adv.amount))
+
+        data = []
+        totals = frappe._dict(grand_total=0, total_cash=0, total_card=0)
+
+        for parent in sorted(parents, key=str):
+            sales_type, tender, children = parents[parent]
+            amt = sum(amount or 0 for *_fact_invoice_name, amount in children)
+
+            data.append({"name": color_parent_name(parent), "parent": None, "amount": amt, "indent": 0})
+
+            totals.grand_total += amt
+            if sales_type in ("Counter Sales", "Home Sales"):
+                if tender == "cash":
+                    totals.total_cash += amt
+                elif tender == "card":
+                    totals.total_card += amt
+
+            for _fact_invoice, invoice, name, amount in children:
+                if amount:
+                    data.append({"name": name, "invoice": invoice, "parent": parent, "amount": amount, "indent": 1})
+
+        return data, totals
+
+
+def get_realtime_entries(facts, advances):
+    """Entries per invoice, and of the unallocated advances under None, for the realtime deltas."""
+    invoices, pos_map, ref_map = facts
+
+    entries = {}
+    if invoices:
+        fact_rows = get_payment_fact_rows(
+            invoices, pos_map, ref_map, get_pos_profile_warehouses(), get_sales_order_warehouses(ref_map)
+        )
+        for inv in invoices:
+            entries[inv.name] = get_entries([f for f in fact_rows if f.invoice == inv.name], [])
+
+    if advances:
+        entries[None] = get_entries([], advances)
+
+    return entries
@@ -23,6 +23,18 @@ frappe.query_reports["New DCR-Report"] = {
             label: __("POS Profile"),
             fieldtype: "Link",
             options: "POS Profile"
+        },
+        {
+            fieldname: "summary_only",
+            label: __("Summary Only"),
+            fieldtype: "Check",
+            default: 0
+        },
+        {
+            fieldname: "profile",
+            label: __("Profile"),
+            fieldtype: "Check",
+            hidden: 1
         }
     ],
 
@@ -30,8 +42,13 @@ frappe.query_reports["New DCR-Report"] = {
     name_field: "name",
     parent_field: "parent",
     initial_depth: 0,
+    formatter: steelforce_custom.dcr.tree_formatter,
+    after_datatable_render: steelforce_custom.dcr.watch_shown_branches,
 
     onload: function (report) {
+        steelforce_custom.dcr.setup_lazy_tree(report);
+        steelforce_custom.dcr.setup_compact(report);
+        steelforce_custom.dcr.setup_realtime(report);
 
         /* ----------------------------------------------------
            Add SAFE Print Button (prevents orientation error)
@@ -42,23 +59,12 @@ frappe.query_reports["New DCR-Report"] = {
             });
         });
 
+        steelforce_custom.dcr.add_slip_buttons(report);
+
         /* ----------------------------------------------------
-           Auto-set POS Profile linked to logged-in user
+           Auto-set POS Profile linked to logged-in user, with the
+           first result in the same request
         -----------------------------------------------------*/
-        frappe.db.get_list("POS Profile", {
-            filters: [
-                ["POS Profile User", "user", "=", frappe.session.user]
-            ],
-            fields: ["name"],
-            limit: 1
-        }).then(function (r) {
-            if (!r || !r.length) {
-                frappe.msgprint(__("No POS Profile linked to this user"));
-                return;
-            }
-
-            report.get_filter("pos_profile").set_value(r[0].name);
-            report.refresh();
-        });
+        return steelforce_custom.dcr.bootstrap_report(report);
     }
 };
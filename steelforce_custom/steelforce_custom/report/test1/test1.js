@@ -19,6 +19,18 @@ frappe.query_reports["Test1"] = {
             label: __("POS Profile"),
             fieldtype: "Link",
             options: "POS Profile",
+        },
+        {
+            fieldname: "summary_only",
+            label: __("Summary Only"),
+            fieldtype: "Check",
+            default: 0
+        },
+        {
+            fieldname: "profile",
+            label: __("Profile"),
+            fieldtype: "Check",
+            hidden: 1
         }
     ],
 
@@ -26,24 +38,12 @@ frappe.query_reports["Test1"] = {
     name_field: "name",
     parent_field: "parent",
     initial_depth: 0,
+    formatter: steelforce_custom.dcr.tree_formatter,
 
     onload: function (report) {
-        frappe.db.get_list("POS Profile", {
-            filters: [
-                ["POS Profile User", "user", "=", frappe.session.user]
-            ],
-            fields: ["name"],
-            limit: 1
-        }).then(r => {
-            if (!r || !r.length) {
-                frappe.msgprint(__("No POS Profile linked to this user"));
-                return;
-            }
-
-            const pos_profile = r[0].name;
+        steelforce_custom.dcr.setup_lazy_tree(report);
+        steelforce_custom.dcr.setup_compact(report);
 
-            report.get_filter("pos_profile").set_value(pos_profile);
-            report.refresh();
-        });
+        return steelforce_custom.dcr.bootstrap_report(report);
     }
 };
@@ -1,5 +1,17 @@
-import frappe
+from steelforce_custom.steelforce_custom.dcr.cache import cached_report
+from steelforce_custom.steelforce_custom.dcr.engine import (
+    CREDIT_SALE,
+    build_tree,
+    get_entries,
+    get_invoice_facts,
+    make_entry,
+    split_pos_payments,
+)
+from steelforce_custom.steelforce_custom.dcr.tree import summary_first
 
+
+@summary_first
+@cached_report("Test1")
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -34,124 +46,40 @@ def execute(filters=None):
         }
     ]
 
-    data = []
-
     # -------------------------------------------------
-    # 🔹 PARENTS → SALES TYPE + MODE OF PAYMENT
+    # 🔹 FACTS (ONE PASS) → SALES TYPE + MODE OF PAYMENT
     # -------------------------------------------------
-    parents = frappe.db.sql("""
-        SELECT
-            CASE
-                WHEN si.is_return = 1 THEN
-                    CONCAT(
-                        CASE
-                            WHEN si.customer = 'Home Sales Customer'
-                                THEN 'Home Sales'
-                            WHEN si.customer = 'Walk-in Customer'
-                                THEN 'Counter Sales'
-                            ELSE
-                                'Online Sales'
-                        END,
-                        ' - ',
-                        IFNULL(sip.mode_of_payment, 'Credit Sale'),
-                        ' (Return)'
-                    )
-                ELSE
-                    CONCAT(
-                        CASE
-                            WHEN si.customer = 'Home Sales Customer'
-                                THEN 'Home Sales'
-                            WHEN si.customer = 'Walk-in Customer'
-                                THEN 'Counter Sales'
-                            ELSE
-                                'Online Sales'
-                        END,
-                        ' - ',
-                        IFNULL(sip.mode_of_payment, 'Credit Sale')
-                    )
-            END AS parent_name,
-
-            si.is_return,
-
-            SUM(
-                CASE
-                    WHEN sip.mode_of_payment IS NULL
-                        THEN IFNULL(si.grand_total, 0)
-                    ELSE IFNULL(sip.amount, 0) - IFNULL(si.change_amount, 0)
-                END
-            ) AS amount
-
-        FROM `tabSales Invoice` si
-        LEFT JOIN `tabSales Invoice Payment` sip
-            ON sip.parent = si.name
-            AND sip.parenttype = 'Sales Invoice'
-            AND sip.parentfield = 'payments'
-
-        WHERE
-            si.docstatus = 1
-            AND si.is_pos = 1
-            AND si.pos_profile = %(pos_profile)s
-            AND si.posting_date BETWEEN %(from_date)s AND %(to_date)s
-
-        GROUP BY parent_name, si.is_return
-        ORDER BY si.is_return ASC
-    """, {
+    facts = get_invoice_facts([
+        "si.is_pos = 1",
+        "si.pos_profile = %(pos_profile)s",
+        "si.business_date BETWEEN %(from_date)s AND %(to_date)s",
+    ], {
         "from_date": from_date,
         "to_date": to_date,
         "pos_profile": pos_profile
-    }, as_dict=True)
+    }, payment_entries=False)
 
     # -------------------------------------------------
-    # BUILD TREE
+    # BUILD TREE (sales first, returns after)
     # -------------------------------------------------
-    for p in parents:
-        # 🔹 Parent row (plain text, NOT a link)
-        data.append({
-            "name": p.parent_name,
-            "parent": None,
-            "amount": p.amount,
-            "indent": 0
-        })
+    data, totals = build_tree(
+        get_entries(facts, classify),
+        sort_key=lambda parent: (parent.endswith(" (Return)"), parent.casefold()),
+    )
 
-        # -------------------------------------------------
-        # 🔹 CHILDREN → SALES INVOICES (CLICKABLE)
-        # -------------------------------------------------
-        invoices = frappe.db.sql("""
-            SELECT
-                si.name,
-                si.grand_total
-            FROM `tabSales Invoice` si
-            LEFT JOIN `tabSales Invoice Payment` sip
-                ON sip.parent = si.name
-                AND sip.parenttype = 'Sales Invoice'
-                AND sip.parentfield = 'payments'
-            WHERE
-                si.docstatus = 1
-                AND si.is_pos = 1
-                AND si.pos_profile = %(pos_profile)s
-                AND si.posting_date BETWEEN %(from_date)s AND %(to_date)s
-                AND si.is_return = %(is_return)s
-                AND (
-                    (%(mode)s LIKE '%%Credit Sale%%' AND sip.name IS NULL)
-                    OR IFNULL(sip.mode_of_payment, 'Credit Sale') = %(mode_only)s
-                )
-            ORDER BY si.name
-        """, {
-            "from_date": from_date,
-            "to_date": to_date,
-            "pos_profile": pos_profile,
-            "is_return": p.is_return,
-            "mode": p.parent_name,
-            "mode_only": p.parent_name.split(' - ')[-1].replace(' (Return)', '')
-        }, as_dict=True)
+    return columns, data
 
-        for inv in invoices:
-            data.append({
-                "name": inv.name,          # shown text
-                "invoice": inv.name,       # actual clickable link
-                "parent": p.parent_name,
-                "amount": inv.grand_total,
-                "indent": 1
-            })
 
-    return columns, data
+def classify(inv, pos_rows, ref_rows):
+    sales_type = inv.sales_channel
+    suffix = " (Return)" if inv.is_return else ""
+
+    if pos_rows:
+        amounts = split_pos_payments(inv, pos_rows, lambda p: p.mode_type == "Cash")
+    else:
+        amounts = {CREDIT_SALE: inv.grand_total or 0}
+
+    return [
+        make_entry(f"{sales_type} - {mode}{suffix}", inv, amount, sales_type, None)
+        for mode, amount in amounts.items()
+    ]